@@ -0,0 +1 @@
+"""Performance benchmarks for the compressor (not part of the package)."""
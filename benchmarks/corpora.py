@@ -0,0 +1,77 @@
+"""Synthetic corpora for the benchmarks, of varying size and entropy.
+
+All of them are generated from a fixed seed (without reading anything from
+the machine), so the same corpus is produced on every run, and results can be
+compared between releases.
+"""
+import random
+import string
+
+_SEED = 42
+
+
+def _vocabulary(rng: random.Random, size: int = 20000) -> list:
+    return ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 12))) for _ in range(size)]
+
+
+def dictionary_words(size: int) -> str:
+    """Words of a vocabulary, one per line (low entropy, like natural language)."""
+    rng = random.Random(_SEED)
+    vocabulary = _vocabulary(rng)
+    lines, length = [], 0
+    while length < size:
+        word = rng.choice(vocabulary)
+        lines.append(word)
+        length += len(word) + 1
+    return "\n".join(lines)[:size]
+
+
+def logs(size: int) -> str:
+    """Application logs: repetitive structure, with timestamps and ids."""
+    rng = random.Random(_SEED)
+    levels = ("INFO", "INFO", "INFO", "DEBUG", "WARNING", "ERROR")
+    messages = (
+        "request processed in {}ms",
+        "connection from 10.0.{}.{} accepted",
+        "cache miss for key user:{}",
+        "retrying job {} (attempt {})",
+    )
+    lines, length = [], 0
+    while length < size:
+        message = rng.choice(messages).format(*(rng.randint(0, 999) for _ in range(2)))
+        line = f"2024-01-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00 " \
+               f"{rng.choice(levels)} [worker-{rng.randint(1, 16)}] {message}"
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)[:size]
+
+
+def random_text(size: int) -> str:
+    """Uniformly random printable characters (high entropy)."""
+    rng = random.Random(_SEED)
+    alphabet = string.ascii_letters + string.digits + string.punctuation + " \n"
+    return "".join(rng.choices(alphabet, k=size))
+
+
+def skewed_alphabet(size: int) -> str:
+    """A few characters with exponentially decreasing frequencies, which
+    produces very long codes."""
+    rng = random.Random(_SEED)
+    alphabet = string.ascii_letters
+    weights = [2.0 ** -i for i in range(len(alphabet))]
+    return "".join(rng.choices(alphabet, weights=weights, k=size))
+
+
+CORPORA = {
+    "words": dictionary_words,
+    "logs": logs,
+    "random": random_text,
+    "skewed": skewed_alphabet,
+}
+
+SIZES = {
+    "100K": 100 * 1024,
+    "1M": 1024 * 1024,
+    "10M": 10 * 1024 * 1024,
+    "100M": 100 * 1024 * 1024,
+}
@@ -0,0 +1,204 @@
+"""Run the benchmarks, and save (or compare against) a JSON baseline.
+
+Each benchmark runs on a fresh process, so the peak of memory (RSS) reported
+is the one of that benchmark alone. Examples::
+
+    $ python -m benchmarks.run --sizes 100K 1M --output baseline.json
+    $ python -m benchmarks.run --sizes 100K 1M --compare baseline.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Optional
+
+from benchmarks.corpora import CORPORA, SIZES
+from compressor import lib, vectorized
+from compressor.constants import BUFF_SIZE, MAX_BLOCK_SIZE, VERSION
+from compressor.container import canonical_codes
+from compressor.core import (
+    _decode_block,
+    code_lengths,
+    create_tree_code,
+    encode_block,
+    encoding_codes,
+    process_frequencies,
+    process_line_compression,
+)
+from compressor.decoder import DecodeTable
+
+MB = 1024 * 1024
+
+
+def _codes(text: str) -> dict:
+    return canonical_codes(code_lengths(create_tree_code(process_frequencies(text))))
+
+
+def _chunks(text: str, size: int = BUFF_SIZE) -> List[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def bench_compress_file(source: str, text: str, workdir: str) -> dict:
+    target = os.path.join(workdir, "compressed")
+    start = time.perf_counter()
+    lib.compress_file(source, target)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "ratio": os.path.getsize(target) / os.path.getsize(source)}
+
+
+def bench_extract_file(source: str, text: str, workdir: str) -> dict:
+    target = os.path.join(workdir, "compressed")
+    lib.compress_file(source, target)
+    start = time.perf_counter()
+    lib.extract_file(target, os.path.join(workdir, "extracted"))
+    return {"seconds": time.perf_counter() - start}
+
+
+def bench_create_tree_code(source: str, text: str, workdir: str) -> dict:
+    freqs = process_frequencies(text)
+    start = time.perf_counter()
+    create_tree_code(freqs)
+    return {"seconds": time.perf_counter() - start, "symbols": len(set(text))}
+
+
+def bench_process_line_compression(source: str, text: str, workdir: str) -> dict:
+    codes = encoding_codes(_codes(text))
+    chunks, output = _chunks(text), io.BytesIO()
+    start = time.perf_counter()
+    for chunk in chunks:
+        process_line_compression(chunk, output, codes)
+    return {"seconds": time.perf_counter() - start}
+
+
+def bench_decode_block(source: str, text: str, workdir: str) -> dict:
+    table = _codes(text)
+    codes = encoding_codes(table)
+    decoder = DecodeTable({str(code, encoding="utf-8"): char for char, code in table.items()})
+    blocks = [(encode_block(chunk, codes)[8:], len(chunk)) for chunk in _chunks(text)]
+    start = time.perf_counter()
+    for content, length in blocks:
+        _decode_block(content, decoder, length)
+    return {"seconds": time.perf_counter() - start}
+
+
+def bench_vector_encode(source: str, text: str, workdir: str) -> dict:
+    """The NumPy encoder, on the largest blocks, with its speedup over the
+    pure-Python one."""
+    codes = encoding_codes(_codes(text))
+    chunks, encode = _chunks(text, MAX_BLOCK_SIZE), vectorized.VectorEncoder(codes).encode
+    start = time.perf_counter()
+    for chunk in chunks:
+        encode_block(chunk, codes)
+    python_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for chunk in chunks:
+        encode(chunk)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "speedup": python_seconds / seconds}
+
+
+BENCHMARKS = {
+    "compress_file": bench_compress_file,
+    "extract_file": bench_extract_file,
+    "create_tree_code": bench_create_tree_code,
+    "process_line_compression": bench_process_line_compression,
+    "decode_block": bench_decode_block,
+}
+if vectorized.AVAILABLE:
+    BENCHMARKS["vector_encode"] = bench_vector_encode
+
+
+def _run_case(benchmark: str, corpus: str, size: str, repeat: int) -> dict:
+    """Run a benchmark on a corpus (in the current process), keeping the
+    best time of the repetitions."""
+    text = CORPORA[corpus](SIZES[size])
+    with tempfile.TemporaryDirectory() as workdir:
+        source = os.path.join(workdir, "source")
+        with open(source, "w", encoding="utf-8") as corpus_file:
+            corpus_file.write(text)
+        runs = [BENCHMARKS[benchmark](source, text, workdir) for _ in range(repeat)]
+
+    result = min(runs, key=lambda run: run["seconds"])
+    result.update(
+        benchmark=benchmark,
+        corpus=corpus,
+        size=size,
+        mb_per_s=len(text.encode("utf-8")) / MB / result["seconds"] if result["seconds"] else None,
+        peak_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    )
+    return result
+
+
+def run(benchmarks: List[str], corpora: List[str], sizes: List[str], repeat: int) -> List[dict]:
+    results = []
+    for benchmark in benchmarks:
+        for corpus in corpora:
+            for size in sizes:
+                with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+                    result = executor.submit(_run_case, benchmark, corpus, size, repeat).result()
+                results.append(result)
+                print(_format(result), file=sys.stderr)
+    return results
+
+
+def _format(result: dict, baseline: Optional[dict] = None) -> str:
+    line = f"{result['benchmark']:<26}{result['corpus']:<8}{result['size']:>5}  " \
+           f"{result['seconds']:9.4f}s {result['mb_per_s'] or 0:9.2f} MB/s " \
+           f"{result['peak_rss_kb'] / 1024:8.1f} MB RSS"
+    if "ratio" in result:
+        line += f"  ratio {result['ratio']:.3f}"
+    if "speedup" in result:
+        line += f"  speedup x{result['speedup']:.1f}"
+    if baseline:
+        change = (result["seconds"] - baseline["seconds"]) / baseline["seconds"] * 100
+        line += f"  ({change:+.1f}% time)"
+    return line
+
+
+def compare(results: List[dict], baseline_file: str) -> None:
+    with open(baseline_file, encoding="utf-8") as baseline_json:
+        baseline = {
+            (entry["benchmark"], entry["corpus"], entry["size"]): entry
+            for entry in json.load(baseline_json)["results"]
+        }
+    for result in results:
+        print(_format(result, baseline.get((result["benchmark"], result["corpus"], result["size"]))))
+
+
+def main(args=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the compressor")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--corpora", nargs="+", choices=CORPORA, default=list(CORPORA))
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=["100K", "1M"])
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions (the best one is kept)")
+    parser.add_argument("--output", help="Save the results as a JSON baseline")
+    parser.add_argument("--compare", help="JSON baseline to compare the results against")
+    options = parser.parse_args(args)
+
+    results = run(options.benchmarks, options.corpora, options.sizes, options.repeat)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as output:
+            json.dump(
+                {
+                    "version": VERSION,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                output,
+                indent=2,
+            )
+    if options.compare:
+        compare(results, options.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
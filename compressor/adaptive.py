@@ -0,0 +1,101 @@
+"""compressor.adaptive
+
+Adaptive tables, for content whose frequencies change along the file (like
+logs mixing JSON, stack traces, and encoded payloads), which a single table
+for the whole file compresses poorly.
+
+The blocks are taken in groups of ``ADAPTIVE_GROUP_BLOCKS``, and each group
+is encoded either with a new table, built from its own frequencies, or with
+one of the tables of the previous groups, referred by its id. A new table is
+only added when the bits it saves on the group pay for the bytes it takes on
+the compressed file. Otherwise, the cheapest of the recently used tables
+that has a code for every character of the group is used again.
+"""
+from array import array
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from compressor import stats, vectorized
+from compressor.constants import ADAPTIVE_CANDIDATES, ADAPTIVE_GROUP_BLOCKS, BYTE, ENC
+from compressor.container import TablePlan, canonical_codes
+from compressor.core import counts_code_lengths
+Lengths = Dict[Union[str, int], int]
+
+
+def plan_tables(
+    open_stream: Callable[[int], Any],
+    block_size: int,
+    binary: bool = False,
+    max_code_length: Optional[int] = None,
+    group_size: int = ADAPTIVE_GROUP_BLOCKS,
+) -> Tuple[TablePlan, int]:
+    """
+    Read the content by groups of <group_size> blocks, and choose the table
+    for each one.
+
+    Like the frequencies for a single table, only a group at the time is
+    held in memory (along with the code lengths of the tables chosen).
+
+    :param open_stream:     Called with a chunk size, returns the content
+                            streamed by chunks of it (like ``StreamFile``).
+    :param block_size:      Characters (or bytes) on each block.
+    :param binary:          If True, the content is binary.
+    :param max_code_length: Maximum length (in bits) of the codes.
+    :param group_size:      Blocks sharing the same table.
+    :return: The plan with the tables, and the length of the file
+             (checksum).
+    """
+    count = vectorized.count_symbols if vectorized.AVAILABLE else Counter
+    tables = []  # type: List[Lengths]
+    table_ids = array("I")
+    recent = []  # type: List[int]
+    checksum = 0
+    with open_stream(block_size * group_size) as source:
+        for chunk in source:
+            checksum += len(chunk)
+            counts = count(chunk)
+            lengths = counts_code_lengths(counts, max_code_length)
+            table_id = _choose_table(counts, lengths, tables, recent, binary)
+            if table_id == len(tables):
+                tables.append(lengths)
+            table_ids.append(table_id)
+            if stats.enabled():
+                stats.code_statistics(counts, tables[table_id])
+            # keep the most recently used tables first
+            if table_id in recent:
+                recent.remove(table_id)
+            recent.insert(0, table_id)
+            del recent[ADAPTIVE_CANDIDATES:]
+
+    return TablePlan([canonical_codes(lengths) for lengths in tables], table_ids, group_size), checksum
+
+
+def _choose_table(counts: dict, lengths: Lengths, tables: List[Lengths], recent: List[int], binary: bool) -> int:
+    """
+    Id of the table to use for a group with <counts>: one of the <recent>
+    ones, if they take fewer bits than the new <lengths> for the group (the
+    table itself included), or ``len(tables)`` for adding the new one.
+    """
+    best_id = len(tables)
+    best_cost = sum(freq * lengths[char] for char, freq in counts.items()) + BYTE * _table_size(lengths, binary)
+    for table_id in recent:
+        cost = _encoding_cost(counts, tables[table_id])
+        if cost is not None and cost <= best_cost:
+            best_id, best_cost = table_id, cost
+    return best_id
+
+
+def _encoding_cost(counts: dict, lengths: Lengths) -> Optional[int]:
+    """Bits for encoding <counts> with the codes of <lengths>, or None if a
+    character has no code on them.
+    """
+    try:
+        return sum(freq * lengths[char] for char, freq in counts.items())
+    except KeyError:
+        return None
+
+
+def _table_size(lengths: Lengths, binary: bool) -> int:
+    """Bytes taken by a table on the file (see ``compressor.container.save_table``)."""
+    chars = len(lengths) if binary else len("".join(lengths).encode(ENC))  # type: ignore
+    return 2 * 4 + chars + len(lengths)
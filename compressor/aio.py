@@ -0,0 +1,99 @@
+"""compressor.aio
+
+``asyncio`` versions of the functions of ``compressor.lib``, for using them
+from an event loop without blocking it.
+
+The work (reading, encoding or decoding, and writing) is run on an executor,
+so the loop keeps serving other tasks meanwhile, and many files can be
+processed at once::
+
+    >>> await compress_file_async("app.log", "app.log.comp")
+    >>> async for chunk in extract_chunks("app.log.comp"):
+    ...     await response.write(chunk)
+
+By default, the executor of the loop is used (a thread pool). For CPU-bound
+work on many files, a ``ProcessPoolExecutor`` can be given instead, and each
+file can also be processed by several `jobs` (see ``compress_file``).
+
+The calls run on the executor take a copy of the context of the caller, so
+the statistics collected on a task (see ``compressor.stats``) only get the
+measures of its own operations. On a pool of processes, where the context
+can't be sent, they aren't collected.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+from compressor.container import SharedTable
+from compressor.core import decoded_blocks
+from compressor.decoder import Content
+from compressor.lib import compress_file, extract_file
+
+T = TypeVar("T")
+
+
+async def _run(executor: Optional[Executor], function: Callable[..., T], *args: Any) -> T:
+    """Call <function> with <args> on the <executor>, on a copy of the
+    current context (unless it's a pool of processes).
+    """
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor):
+        return await loop.run_in_executor(executor, function, *args)
+    return await loop.run_in_executor(executor, contextvars.copy_context().run, function, *args)
+
+
+async def compress_file_async(
+    filename: str, dest_file: str = "", executor: Optional[Executor] = None, **options: Any
+) -> None:
+    """
+    Like ``compress_file``, run on the <executor> (the default one of the
+    loop if not given), and awaiting for it to finish.
+
+    :param options: The rest of the options of ``compress_file``.
+    """
+    await _run(executor, partial(compress_file, filename, dest_file, **options))
+
+
+async def extract_file_async(
+    filename: str, dest_file: str = "", executor: Optional[Executor] = None, **options: Any
+) -> None:
+    """
+    Like ``extract_file``, run on the <executor> (the default one of the
+    loop if not given), and awaiting for it to finish.
+
+    :param options: The rest of the options of ``extract_file``.
+    """
+    await _run(executor, partial(extract_file, filename, dest_file, **options))
+
+
+async def extract_chunks(
+    filename: str,
+    jobs: Optional[int] = 1,
+    table: Optional[SharedTable] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[Content]:
+    """
+    Iterate asynchronously over the original content of the compressed file
+    <filename>, one block at the time, as they are decoded.
+
+    Each block is read and decoded on the <executor>, which has to be a
+    thread pool (the default one of the loop if not given). With more than
+    one of `jobs`, the blocks are decoded by a pool of processes.
+
+    :param table: The shared table, for files compressed with one.
+    """
+    src = await _run(executor, open, filename, "rb")
+    try:
+        _, blocks = await _run(executor, decoded_blocks, src, jobs, table)
+        try:
+            while True:
+                block = await _run(executor, next, blocks, None)
+                if block is None:
+                    break
+                yield block
+        finally:
+            await _run(executor, blocks.close)
+    finally:
+        await _run(executor, src.close)
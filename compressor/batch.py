@@ -0,0 +1,157 @@
+"""compressor.batch
+
+Processing of several files in the same program (instead of one for each),
+optionally on a pool of worker processes, with a summary of the totals at
+the end.
+"""
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from compressor import stats as instrumentation
+from compressor.constants import FILES_PER_TASK
+from compressor.engine import main_engine
+from compressor.util import default_filename
+
+logger = logging.getLogger(__name__)
+
+
+class FileResult(NamedTuple):
+    """Outcome of processing one of the files of a batch."""
+
+    filename: str
+    size_in: int
+    size_out: int
+    error: Optional[str] = None
+    measures: Optional[Dict[str, Any]] = None
+
+
+def batch_engine(
+    filenames: List[str],
+    dest_file: Optional[str] = None,
+    dest_dir: Optional[str] = None,
+    recursive: bool = False,
+    workers: Optional[int] = 1,
+    **options,
+) -> int:
+    """
+    Process several files in the same program, each one like `main_engine`,
+    and report the totals at the end.
+
+    :param filenames: Paths, glob patterns, or directories (with `recursive`)
+                      of the files to process.
+    :param dest_file: Name of the target file, only for a single one.
+    :param dest_dir:  Directory for the resulting files (the current one by
+                      default). The files found under a directory keep their
+                      relative location below it.
+    :param recursive: Process the files under the directories given.
+    :param workers:   Number of processes handling files at once (0 for all
+                      the CPUs).
+    :param options:   The rest of the options of `main_engine`.
+
+    :return: 0 if all the files were processed, 1 otherwise (also when a
+             pattern matched no files, or none were found at all).
+    """
+    sources, unmatched = _collect_files(filenames, recursive)
+    if not sources:
+        logger.error("No files to process")
+        return 1
+    if dest_file is not None and len(sources) != 1:
+        raise ValueError("A destination file (-d) can only be given for a single file, use --dest-dir instead")
+    if options.get("train"):
+        return main_engine([path for path, _ in sources], **options) or int(unmatched)
+    if len(sources) == 1 and dest_dir is None and not recursive:
+        return main_engine(sources[0][0], dest_file=dest_file, **options) or int(unmatched)
+
+    suffix = "extr" if options.get("extract") else "comp"
+    targets = [
+        (path, dest_file or os.path.join(dest_dir or "", subdir, default_filename(path, suffix)))
+        for path, subdir in sources
+    ]
+    # the measures taken on the workers are sent back along the results
+    process = partial(_process_file, options=options, measure=workers != 1 and instrumentation.enabled())
+    started = time.perf_counter()
+    if workers == 1:
+        results = [process(path, target) for path, target in targets]
+    else:
+        with ProcessPoolExecutor(workers or None) as executor:
+            results = list(executor.map(process, *zip(*targets), chunksize=FILES_PER_TASK))
+    for result in results:
+        if result.measures is not None:
+            instrumentation.merge(result.measures)
+    _log_summary(results, time.perf_counter() - started)
+    return 1 if unmatched or any(result.error for result in results) else 0
+
+
+def _collect_files(patterns: List[str], recursive: bool) -> Tuple[List[Tuple[str, str]], bool]:
+    """
+    The files named by the <patterns>, along with the directory (relative
+    to the one given) where each one was found, for those under directories;
+    and whether a glob pattern matched no files.
+    """
+    sources = []  # type: List[Tuple[str, str]]
+    unmatched = False
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not paths:
+            logger.error("%s: no files match", pattern)
+            unmatched = True
+        for path in paths:
+            sources.extend(_path_files(path, recursive))
+    return sources, unmatched
+
+
+def _path_files(path: str, recursive: bool) -> Iterator[Tuple[str, str]]:
+    """The file <path>, or the ones under it (with `recursive`)."""
+    if not os.path.isdir(path):
+        yield path, ""
+    elif not recursive:
+        logger.warning("%s is a directory (use -r to process its files), skipped", path)
+    else:
+        parent = os.path.dirname(path.rstrip(os.sep)) or os.curdir
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(root, name), os.path.relpath(root, parent)
+
+
+def _process_file(filename: str, dest_file: str, options: Dict[str, Any], measure: bool = False) -> FileResult:
+    """
+    Process a file of the batch, catching (and reporting) its errors.
+
+    :param options: The options of `main_engine`.
+    :param measure: Collect the measures of the stages, for sending them
+                    back from a worker process.
+    """
+    try:
+        if os.path.dirname(dest_file):
+            os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+        with instrumentation.collect_stats() if measure else nullcontext() as collected:
+            main_engine(filename, dest_file=dest_file, **options)
+        measures = collected.as_dict() if collected is not None else None
+        return FileResult(filename, os.path.getsize(filename), os.path.getsize(dest_file), measures=measures)
+    except (OSError, ValueError, UnicodeError) as error:
+        logger.error("%s: %s", filename, error)
+        return FileResult(filename, 0, 0, str(error))
+
+
+def _log_summary(results: List[FileResult], elapsed: float) -> None:
+    """Log the totals of a batch: sizes, ratio, and throughput."""
+    done = [result for result in results if not result.error]
+    size_in = sum(result.size_in for result in done)
+    size_out = sum(result.size_out for result in done)
+    logger.info(
+        "%d files processed (%d failed): %d -> %d bytes (%.1f%%), in %.2fs (%.2f MB/s)",
+        len(done),
+        len(results) - len(done),
+        size_in,
+        size_out,
+        100 * size_out / size_in if size_in else 100.0,
+        elapsed,
+        size_in / (1 << 20) / elapsed if elapsed else 0.0,
+    )
@@ -0,0 +1,192 @@
+"""compressor.cache
+
+On-disk cache of compressed files, for pipelines that compress the same
+files again and again. The output only depends on the content and on the
+options (see ``compressor.core.create_tree_code``), so compressing the same
+content with the same options gives the file already on the cache, instead
+of compressing it again::
+
+    >>> cache = CompressionCache("~/.cache/pycompress", max_size=1 << 30)
+    >>> cache.compress_file("app.log", "app.log.comp", index=True)
+
+The entries are named after a hash of the content and the options, and are
+evicted starting with the least recently used one (by their modification
+time, updated on each hit) when they take more than the size limit. Their
+size is only added up on the first insertion, and then kept up to date with
+the entries added, so they are listed again only for evicting (which is
+when the ones added by other processes are counted).
+
+On a hit, the compressed file is copied from the cache, so the output is
+the user's own (writable) file. With `link`, it's hard-linked instead (when
+possible), which saves the space and the copy, but then the output shares
+the content with the entry: it must be replaced, never written in place
+(as ``compressor.lib.compress_file`` would do), so the entries are
+read-only.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+import tempfile
+from typing import Any, List, Optional, Tuple
+
+from compressor import stats
+from compressor.constants import CACHE_SIZE, FORMAT_VERSION, READ_SIZE, VERSION
+from compressor.lib import compress_file
+from compressor.util import default_filename
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".comp"
+# options that don't change the output (with a given size of the blocks)
+_IGNORED_OPTIONS = ("max_memory",)
+
+
+class CompressionCache:
+    """Cache of compressed files on the directory <directory>."""
+
+    def __init__(self, directory: str, max_size: int = CACHE_SIZE, link: bool = False) -> None:
+        """
+        :param directory: Where the entries are kept (created if missing).
+        :param max_size:  Bytes the entries can take, at most.
+        :param link:      Hard-link the files from the cache on a hit,
+                          instead of copying them (see the module).
+        """
+        self.directory = os.path.expanduser(directory)
+        self.max_size = max_size
+        self.link = link
+        self._size = None  # type: Optional[int]
+        os.makedirs(self.directory, exist_ok=True)
+
+    def compress_file(self, filename: str, dest_file: str = "", **options: Any) -> bool:
+        """
+        Like ``compressor.lib.compress_file``, taking the compressed file
+        from the cache if the same content was compressed with the same
+        <options> before (and adding it otherwise).
+
+        :return: True if the file was taken from the cache.
+        """
+        dest_file = dest_file or default_filename(filename)
+        entry = self._entry(self.key(filename, **options))
+        try:
+            self._place(entry, dest_file)
+        except FileNotFoundError:
+            pass
+        else:
+            os.utime(entry)
+            stats.count("cache_hits")
+            logger.debug("%s: taken from the cache (%s)", filename, entry)
+            return True
+
+        stats.count("cache_misses")
+        fd, compressed = tempfile.mkstemp(suffix=_SUFFIX, dir=self.directory)
+        os.close(fd)
+        try:
+            compress_file(filename, compressed, **options)
+            if os.path.getsize(compressed) <= self.max_size:
+                os.chmod(compressed, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.makedirs(os.path.dirname(entry), exist_ok=True)
+                os.replace(compressed, entry)
+                self._place(entry, dest_file)
+                self._added(os.path.getsize(entry))
+            else:
+                os.chmod(compressed, stat.S_IRUSR | stat.S_IWUSR | stat.S_IRGRP | stat.S_IROTH)
+                shutil.move(compressed, dest_file)
+        finally:
+            if os.path.exists(compressed):
+                os.remove(compressed)
+        return False
+
+    def key(self, filename: str, **options: Any) -> str:
+        """Hash of the content of <filename>, and of the <options> (and the
+        versions) the output depends on.
+        """
+        content = hashlib.sha256()
+        with open(filename, "rb") as source:
+            for chunk in iter(lambda: source.read(READ_SIZE), b""):
+                content.update(chunk)
+        table = options.get("table")
+        if table is not None:
+            options["table"] = f"{table.table_id:016x}"
+        if options.get("block_size") is None:
+            # picks the size of the blocks (with all the CPUs, for None)
+            options["jobs"] = options.get("jobs", 1) or os.cpu_count() or 1
+        else:
+            options.pop("jobs", None)
+        parameters = {name: value for name, value in options.items() if name not in _IGNORED_OPTIONS}
+        parameters.update(format=FORMAT_VERSION, version=VERSION)
+        content.update(json.dumps(parameters, sort_keys=True).encode())
+        return content.hexdigest()
+
+    def entries(self) -> List[Tuple[str, os.stat_result]]:
+        """The entries on the cache, with their status, least recently used
+        first.
+        """
+        found = []
+        for root, _, files in os.walk(self.directory):
+            if root == self.directory:
+                continue  # only temporary files, being written
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    found.append((path, os.stat(path)))
+                except FileNotFoundError:  # evicted meanwhile
+                    pass
+        return sorted(found, key=lambda item: item[1].st_mtime)
+
+    def size(self) -> int:
+        """Bytes taken by the entries."""
+        return sum(status.st_size for _, status in self.entries())
+
+    def evict(self, max_size: Optional[int] = None) -> None:
+        """Remove the least recently used entries, until the rest take up to
+        <max_size> bytes (the limit of the cache, by default).
+        """
+        max_size = self.max_size if max_size is None else max_size
+        entries = self.entries()
+        total = sum(status.st_size for _, status in entries)
+        for path, status in entries:
+            if total <= max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= status.st_size
+        self._size = total
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        self.evict(max_size=0)
+
+    def _added(self, size: int) -> None:
+        """Count an entry of <size> bytes, evicting if the entries (as far
+        as this process knows) take more than the limit.
+        """
+        self._size = self.size() if self._size is None else self._size + size
+        if self._size > self.max_size:
+            self.evict()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + _SUFFIX)
+
+    def _place(self, entry: str, dest_file: str) -> None:
+        """Link (or copy) the <entry> as <dest_file>, replacing it."""
+        dest_dir = os.path.dirname(os.path.abspath(dest_file))
+        fd, placed = tempfile.mkstemp(suffix=_SUFFIX, dir=dest_dir)
+        os.close(fd)
+        os.remove(placed)
+        try:
+            if self.link:
+                try:
+                    os.link(entry, placed)
+                except OSError:  # another file system, or not supported (or a miss, raised by copying)
+                    shutil.copyfile(entry, placed)
+            else:
+                shutil.copyfile(entry, placed)
+            os.replace(placed, dest_file)
+        finally:
+            if os.path.exists(placed):
+                os.remove(placed)
@@ -2,11 +2,13 @@
 
 This object represents a character being processed in the file, along with its
 metadata, like the frequency of it (how many times it appears).
+
+Nodes are compact (they have ``__slots__``), and the value of the internal
+ones (the values of their leaves, concatenated) is only built if it's asked
+for, so building a tree doesn't copy strings.
 """
-from functools import total_ordering
 
 
-@total_ordering
 class CharNode:
     """
     Object that wraps/encapsulates the definition of a character
@@ -14,11 +16,14 @@ class CharNode:
     Used for comparison, and helper with its properties & methods.
     """
 
+    __slots__ = ("_value", "freq", "left", "right")
+
     def __init__(self, value, freq, left=None, right=None) -> None:
         """
         Represent a character as a node in a tree.
 
-        :param value: the original character
+        :param value: the original character (None for an internal node, to
+                      take it from its leaves).
         :param freq:  float with the occurrence average of `value`
                       in the processed text.
         :param left:  left child of this node.
@@ -29,6 +34,11 @@ class CharNode:
         self.left = left
         self.right = right
 
+    def __lt__(self, other) -> bool:
+        if self.__class__ is not other.__class__:
+            return NotImplemented
+        return self.freq < other.freq
+
     def __le__(self, other) -> bool:
         """
         Compare if this character is less or equal than another
@@ -45,10 +55,10 @@ class CharNode:
     def __eq__(self, other) -> bool:
         if self.__class__ is not other.__class__:
             return NotImplemented
-        return (self._value, self.freq) == (other.value, other.freq)
+        return (self.value, self.freq) == (other.value, other.freq)
 
     def __hash__(self):
-        return hash(self._value) ^ hash(self.freq)
+        return hash(self.value) ^ hash(self.freq)
 
     def __add__(self, other_node: "CharNode"):
         """Merge this node with the one received"""
@@ -61,7 +71,7 @@ class CharNode:
     @classmethod
     def _merge(cls, left_node, right_node):
         return cls(
-            value=f"{left_node.value}{right_node.value}",
+            value=None,
             freq=left_node.freq + right_node.freq,
             left=left_node,
             right=right_node,
@@ -69,9 +79,24 @@ class CharNode:
 
     @property
     def value(self):
-        """Expose the value being hold as read-only."""
+        """Expose the value being hold as read-only. For internal nodes, the
+        values of the leaves under it, from left to right.
+        """
+        if self._value is None and not self.leaf:
+            self._value = "".join(f"{leaf.value}" for leaf in self._leaves())
         return self._value
 
+    def _leaves(self):
+        """The leaves under this node, from left to right."""
+        pending = [self]
+        while pending:
+            node = pending.pop()
+            if node.leaf:
+                yield node
+            else:
+                pending.append(node.right)
+                pending.append(node.left)
+
     @property
     def leaf(self) -> bool:
         """
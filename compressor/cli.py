@@ -1,12 +1,31 @@
 """
 Compressor CLI (command-line interface) module.
 Exposes the entry point to the program for executing as command line.
+
+Only what's needed for parsing the arguments is imported on start up, so
+``-h`` and ``--version`` (and the invocations with wrong arguments) are
+fast. The rest of the package is imported by the operation that uses it.
 """
 import argparse
 import sys
+from typing import TYPE_CHECKING
+
+from compressor.constants import CACHE_SIZE, PROFILE_ENTRIES, VERSION
+
+if TYPE_CHECKING:
+    from typing import List, Optional, Union
+
 
-from compressor.constants import VERSION
-from compressor.lib import compress_file, extract_file
+def _size(value: str) -> int:
+    """Number of bytes of a size from the command line (see ``parse_size``)."""
+    from compressor.util import parse_size  # pylint: disable=import-outside-toplevel
+
+    return parse_size(value)
+
+
+def _block_size(value: str) -> "Optional[int]":
+    """Size of the blocks from the command line, or None for ``auto``."""
+    return None if value == "auto" else _size(value)
 
 
 def argument_parser() -> argparse.ArgumentParser:
@@ -17,11 +36,113 @@ def argument_parser() -> argparse.ArgumentParser:
         prog="PyCompress",
         description="Compress text files.",
     )
-    parser.add_argument("filename", type=str, help="Name of the file to process")
+    parser.add_argument(
+        "filenames",
+        type=str,
+        nargs="+",
+        help="Files to process (glob patterns, and directories with -r, are expanded)",
+    )
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("-c", "--compress", action="store_true", help="Compress the file")
     group.add_argument("-x", "--extract", action="store_true", help="Extract the file")
+    group.add_argument(
+        "--train", action="store_true", help="Train a shared table from the file, and save it on --table"
+    )
     parser.add_argument("-d", "--dest-file", type=str, default=None, help="Destination File Name")
+    parser.add_argument(
+        "--dest-dir",
+        type=str,
+        default=None,
+        help="Directory for the resulting files (instead of the current one)",
+    )
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        action="store_true",
+        help="Process the files under the directories given, keeping their structure on the destination",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes handling different files at once (0 to use all the CPUs)",
+    )
+    parser.add_argument(
+        "-m",
+        "--max-memory",
+        type=_size,
+        default=None,
+        help="Memory bound for the text read at once while compressing (e.g. 64M)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes compressing or extracting the file (0 to use all the CPUs)",
+    )
+    parser.add_argument(
+        "-i",
+        "--index",
+        action="store_true",
+        help="Add an index of the blocks to the compressed file, for faster parallel extraction",
+    )
+    parser.add_argument(
+        "-l",
+        "--max-code-length",
+        type=int,
+        default=None,
+        help="Maximum length (in bits) of the code of a character",
+    )
+    parser.add_argument(
+        "-b",
+        "--binary",
+        action="store_true",
+        help="Compress the bytes of the file instead of its text (works for any file)",
+    )
+    parser.add_argument(
+        "-s",
+        "--block-size",
+        type=_block_size,
+        default=None,
+        help="Characters (or bytes) per block, or 'auto' (the default) to pick it from the size of the file",
+    )
+    parser.add_argument(
+        "-a",
+        "--adaptive",
+        action="store_true",
+        help="Encode each group of blocks with its own table, for files whose content changes along them",
+    )
+    parser.add_argument(
+        "-t",
+        "--table",
+        type=str,
+        default=None,
+        help="File of a shared table to compress or extract with (or to create, with --train)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="Directory of a cache of compressed files, for reusing them when the same content is compressed again",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=_size,
+        default=CACHE_SIZE,
+        help="Size the files on the --cache can take (e.g. 512M), evicting the least recently used ones",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print the time of each stage, the sizes, and the mean length of the codes (as JSON) at the end",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the functions that took the most time (measured with cProfile) at the end",
+    )
     parser.add_argument("-v", "--version", action="version", version=f"%(prog)s {VERSION}")
     return parser
 
@@ -37,23 +158,44 @@ def parse_arguments(args=None) -> dict:
     return vars(args)
 
 
-def main_engine(filename: str, extract: bool = False, compress: bool = True, dest_file=None) -> int:
+def main_engine(filename: "Union[str, List[str]]", **options) -> int:
+    """The operation on <filename>, with the <options> (see
+    ``compressor.engine.main_engine``, where it's done).
     """
-    Main functionality for the program cli or call as library.
-    `extract` & `compress` must have opposite values.
+    from compressor.engine import main_engine as engine  # pylint: disable=import-outside-toplevel
+
+    return engine(filename, **options)
 
-    :param filename:  Path to the source file to process.
-    :param extract:   If True, sets the program for a extraction.
-    :param compress:  If True, the program should compress a file.
-    :param dest_file: Optional name of the target file.
 
-    :return: 0 if executed without problems.
+def run(stats: bool = False, profile: bool = False, **arguments) -> int:
+    """
+    Run `batch_engine` with the <arguments>, instrumented as requested.
+
+    :param stats:   Print the measures of the stages, as JSON, to the
+                    standard output.
+    :param profile: Print the ``PROFILE_ENTRIES`` functions with the most
+                    cumulative time to the standard error.
+    :return: The status of `batch_engine`.
     """
-    if compress:
-        compress_file(filename, dest_file)
-    if extract:
-        extract_file(filename, dest_file)
-    return 0
+    # pylint: disable=import-outside-toplevel
+    import cProfile
+    import pstats
+    from contextlib import nullcontext
+
+    from compressor import stats as instrumentation
+    from compressor.batch import batch_engine
+
+    profiler = cProfile.Profile() if profile else None
+    with instrumentation.collect_stats() if stats else nullcontext() as collected:
+        if profiler is not None:
+            status = profiler.runcall(batch_engine, **arguments)
+        else:
+            status = batch_engine(**arguments)
+    if profiler is not None:
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_ENTRIES)
+    if collected is not None:
+        print(collected.to_json())
+    return status
 
 
 def main() -> int:  # pragma: nocover
@@ -62,7 +204,11 @@ def main() -> int:  # pragma: nocover
     :return: Status code of the program.
     :rtype: int
     """
-    return main_engine(**parse_arguments())
+    arguments = parse_arguments()
+    import logging  # pylint: disable=import-outside-toplevel
+
+    logging.basicConfig(format="%(message)s", level=logging.INFO)
+    return run(**arguments)
 
 
 if __name__ == "__main__":  # pragma: nocover
@@ -9,5 +9,28 @@ from compressor import __version__ as VERSION
 ENC = 'utf-8'
 BYTE = 8
 BUFF_SIZE = 1024
-LEFT = b'0'
-RIGHT = b'1'
+MIN_BLOCK_SIZE = BUFF_SIZE
+MAX_BLOCK_SIZE = 64 * 1024
+READ_SIZE = 1 << 20  # characters read at once when counting frequencies
+MAX_CHAR_SIZE = 4  # bytes that a character can take in memory
+BLOCKS_PER_TASK = 64  # blocks encoded on each task sent to a worker process
+FILES_PER_TASK = 16  # files processed on each task sent to a worker process, in batches
+PROFILE_ENTRIES = 25  # functions listed by --profile
+IN_FLIGHT_PER_WORKER = 2
+LOOKUP_BITS = 10
+MAGIC = b'PYCZ'
+FORMAT_VERSION = 2
+FLAG_BINARY = 0x01
+FLAG_ADAPTIVE = 0x02
+ADAPTIVE_GROUP_BLOCKS = 16  # blocks sharing the same table, with adaptive tables
+ADAPTIVE_CANDIDATES = 16  # recently used tables considered for reuse
+FLAG_SHARED_TABLE = 0x04
+TABLE_MAGIC = b'PYCT'
+TABLE_FORMAT_VERSION = 1
+FLAG_STREAM = 0x08
+FLAG_INDEX = 0x10  # the file ends with the index of its blocks
+STREAM_BLOCK_SIZE = 16 * 1024
+STREAM_SAMPLE_SIZE = 64 * 1024  # characters buffered for sampling the first table
+READER_CACHE_BLOCKS = 8  # decoded blocks kept by CompressedFileReader
+TABLE_MEMO_SIZE = 64  # histograms whose code lengths are kept, for compressing the same content again
+CACHE_SIZE = 1 << 30  # bytes taken by the entries of a CompressionCache, by default
@@ -0,0 +1,216 @@
+"""compressor.container
+
+The format of the compressed files: the header, and the tables stored before
+the blocks. A file is laid out as::
+
+    [MAGIC][version: B][flags: B][checksum: Q][block size: I]
+    [tables]
+    [block length: I][original length: I][block]...
+    [index]
+
+The flags tell how the tables are stored (see `save_table`): a single one,
+the tables of each group of blocks (with adaptive tables, see
+`save_table_plan`), or only the id of a shared one (``Q``). Streamed files
+have their tables along the blocks instead, on records with an empty block
+whose original length is their type. The index of the blocks, if present,
+is described on ``compressor.index``.
+
+Being the codes canonical (see `canonical_codes`), the tables only store the
+length of the code of each character.
+"""
+from array import array
+from itertools import repeat
+from typing import Iterator, List, NamedTuple, Sequence, Tuple, Union, io  # type: ignore
+
+from compressor.constants import BUFF_SIZE, ENC, FORMAT_VERSION, MAGIC
+from compressor.util import pack, tobinary, unpack
+
+# Streamed content has records with an empty block, whose length is their type
+STREAM_END = 0
+STREAM_TABLE = 1
+
+
+class Header(NamedTuple):
+    """Metadata at the start of a compressed file."""
+
+    version: int
+    flags: int
+    checksum: int
+    block_size: int
+
+
+def _save_header(ofile: io, checksum: int, flags: int = 0, block_size: int = BUFF_SIZE) -> None:
+    """
+    Start the file with the magic number, the version of the format, the
+    flags with the options it was compressed with, the number of characters
+    (checksum), and the size of the blocks.
+    """
+    ofile.write(MAGIC)
+    ofile.write(pack("BBQI", FORMAT_VERSION, flags, checksum, block_size))
+
+
+def _patch_checksum(ofile: io, checksum: int, start: int = 0) -> None:
+    """Set the <checksum> on the header of <ofile> (written at the position
+    <start>), once it's known.
+    """
+    position = ofile.tell()
+    ofile.seek(start + len(MAGIC) + 2 * _sizeof("B"))
+    ofile.write(pack("Q", checksum))
+    ofile.seek(position)
+
+
+def _retrieve_header(ifile: io) -> Header:
+    """
+    Read the header of the file. Files without the magic number are of the
+    format prior to versioning (0), which starts with the checksum.
+    Files prior to version 2 used blocks of ``BUFF_SIZE``.
+    """
+    if ifile.read(len(MAGIC)) != MAGIC:
+        ifile.seek(0)
+        rawdata = ifile.read(_sizeof("L"))
+        return Header(0, 0, unpack("L", rawdata)[0], BUFF_SIZE)
+    version, flags, checksum = unpack("BBQ", ifile.read(2 * _sizeof("B") + _sizeof("Q")))
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version: {version}")
+    block_size = unpack("I", ifile.read(_sizeof("I")))[0] if version >= 2 else BUFF_SIZE
+    return Header(version, flags, checksum, block_size)
+
+
+def canonical_codes(lengths: dict) -> dict:
+    """
+    Assign the canonical prefix-free code for the given lengths: characters
+    are sorted by the length of their code, and then by the character itself,
+    and each one takes the next code, extended with zeros up to its
+    length:
+
+        {"a": 1, "b": 2, "c": 2} --> {"a": b"0", "b": b"10", "c": b"11"}
+
+    :param lengths: Mapping of each character to the length of its code.
+    :return:        Mapping of each character to its code.
+    """
+    table = {}
+    code, previous_length = 0, 0
+    for char, length in sorted(lengths.items(), key=_canonical_order):
+        code <<= length - previous_length
+        table[char] = format(code, f"0{length}b").encode(ENC) if length else b""
+        code += 1
+        previous_length = length
+    return table
+
+
+def _canonical_order(item: Tuple[str, int]) -> Tuple[int, str]:
+    char, length = item
+    return length, char
+
+
+def save_table(dest_file: io, table: dict, binary: bool = False) -> None:
+    """
+    Store the table in the destination file. Being the codes canonical, only
+    their lengths are stored:
+        I: number of characters
+        I: size (in bytes) of the encoded characters
+        characters, encoded (or the bytes, if `binary`), in canonical order
+        B: length of the code of each character
+
+    :param dest_file: opened file where to write the `table`.
+    :param table:     Mapping table with the chars and their codes.
+    :param binary:    If True, the characters of the table are bytes (ints).
+                      Otherwise, they can also be given by their code points
+                      (for ASCII text, read as bytes).
+    """
+    lengths = sorted(((char, len(code)) for char, code in table.items()), key=_canonical_order)
+    symbols = [char for char, _ in lengths]
+    chars = bytes(symbols) if binary else "".join(map(_as_char, symbols)).encode(ENC)
+
+    dest_file.write(pack("II", len(lengths), len(chars)))
+    dest_file.write(chars)
+    dest_file.write(pack(f"{len(lengths)}B", *(length for _, length in lengths)))
+
+
+def retrieve_table(dest_file: io, binary: bool = False) -> dict:
+    """
+    Read the table saved by `save_table`, and return it with the codes
+    assigned canonically.
+    """
+    count, size = unpack("II", dest_file.read(2 * _sizeof("I")))
+    raw_chars = dest_file.read(size)
+    chars = raw_chars if binary else str(raw_chars, encoding=ENC)  # type: Sequence
+    lengths = unpack(f"{count}B", dest_file.read(count * _sizeof("B")))
+    return canonical_codes(dict(zip(chars, lengths)))
+
+
+def _retrieve_legacy_table(dest_file: io) -> dict:
+    """
+    Read the table of the files prior to the versioned format, storing each
+    char along its code with a sentinel first bit:
+        c: char
+        L: code of c (unsigned Long)
+    """
+    offset, *_ = unpack("i", dest_file.read(_sizeof("i")))
+    chars = dest_file.read(offset * _sizeof("c"))
+    codes = dest_file.read(offset * _sizeof("L"))
+
+    chars = unpack(f"{offset}c", chars)
+    codes = unpack(f"{offset}L", codes)
+    return {str(char, encoding=ENC): tobinary(code)[1:].encode(ENC) for char, code in zip(chars, codes)}
+
+
+def _as_char(symbol: Union[str, int]) -> str:
+    return symbol if isinstance(symbol, str) else chr(symbol)
+
+
+class TablePlan(NamedTuple):
+    """The tables for compressing a file with adaptive tables: the blocks are
+    taken in groups of `group_size`, each one encoded with the table of
+    `table_ids` (its position on `tables`).
+    """
+
+    tables: List[dict]
+    table_ids: Sequence[int]
+    group_size: int
+
+    def block_table_ids(self) -> Iterator[int]:
+        """Id of the table of each block, in order."""
+        for table_id in self.table_ids:
+            yield from repeat(table_id, self.group_size)
+
+
+def save_table_plan(dest_file: io, plan: TablePlan, binary: bool = False) -> None:
+    """
+    Store the tables of the `plan`, and the one used by each group of blocks:
+        I: number of tables
+        each table (see `save_table`)
+        I: blocks on each group
+        I: number of groups
+        I: id of the table of each group
+    """
+    dest_file.write(pack("I", len(plan.tables)))
+    for table in plan.tables:
+        save_table(dest_file, table, binary)
+    dest_file.write(pack("II", plan.group_size, len(plan.table_ids)))
+    dest_file.write(array("I", plan.table_ids).tobytes())
+
+
+def retrieve_table_plan(dest_file: io, binary: bool = False) -> TablePlan:
+    """Read the tables, and their groups of blocks, saved by `save_table_plan`."""
+    count, *_ = unpack("I", dest_file.read(_sizeof("I")))
+    tables = [retrieve_table(dest_file, binary) for _ in range(count)]
+    group_size, groups = unpack("II", dest_file.read(2 * _sizeof("I")))
+    table_ids = array("I")
+    table_ids.frombytes(dest_file.read(groups * table_ids.itemsize))
+    return TablePlan(tables, table_ids, group_size)
+
+
+class SharedTable(NamedTuple):
+    """A table trained ahead of time, for compressing many files without
+    storing it on each of them, referred by its id instead.
+    """
+
+    table_id: int
+    table: dict
+    binary: bool
+
+
+def _sizeof(code: str) -> int:
+    sizes = {"i": 4, "c": 1, "L": 4, "I": 4, "B": 1, "Q": 8}
+    return sizes.get(code, 1)
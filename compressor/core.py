@@ -6,22 +6,83 @@ program makes use of.
 
 It contains auxiliary functions.
 """
-import binascii
+import hashlib
 import heapq
-from collections import Counter
-from typing import List, Sequence, io  # type: ignore
+import os
+import threading
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice, repeat
+from operator import itemgetter
+from typing import (  # type: ignore
+    Any,
+    Callable,
+    Deque,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    io,
+)
 
-from compressor.constants import BUFF_SIZE, BYTE, ENC, LEFT, RIGHT
+from compressor.constants import (
+    BLOCKS_PER_TASK,
+    BUFF_SIZE,
+    BYTE,
+    ENC,
+    FLAG_ADAPTIVE,
+    FLAG_BINARY,
+    FLAG_INDEX,
+    FLAG_SHARED_TABLE,
+    FLAG_STREAM,
+    IN_FLIGHT_PER_WORKER,
+    MAX_BLOCK_SIZE,
+    MIN_BLOCK_SIZE,
+    READ_SIZE,
+    TABLE_MEMO_SIZE,
+)
+from compressor import stats, vectorized
 from compressor.char_node import CharNode
+from compressor.container import (
+    STREAM_END,
+    STREAM_TABLE,
+    Header,
+    SharedTable,
+    TablePlan,
+    _patch_checksum,
+    _retrieve_header,
+    _retrieve_legacy_table,
+    _save_header,
+    _sizeof,
+    canonical_codes,
+    retrieve_table,
+    retrieve_table_plan,
+    save_table,
+    save_table_plan,
+)
+from compressor.decoder import BlockDecoders, Content, DecodeTable
+from compressor.index import BlockIndex
 from compressor.util import (
     StreamFile,
     default_filename,
     pack,
-    tobinary,
+    pack_into,
     unpack,
     open_text_file
 )
 
+_BLOCK_HEADER_SIZE = 8  # block length (I) & original length (I)
+_CARRIAGE_RETURN = ord("\r")
+_MAX_ASCII = 0x7F
+
 
 def create_tree_code(charset: List[CharNode]) -> CharNode:
     """
@@ -29,46 +90,163 @@ def create_tree_code(charset: List[CharNode]) -> CharNode:
     namely leaves in the tree, and returns a tree with the corresponding
     prefix-free code.
 
+    The heap holds ``(freq, number)`` tuples, where the number is the
+    position of the node on a list of all of them: the characters first,
+    sorted by frequency and then by the character itself, and then the
+    internal nodes, in the order they are created. So nodes are never
+    compared, and ties are always broken the same way: the tree only depends
+    on the frequencies, not on the order of the <charset> (which depends on
+    where each character appears first, or on how the content was split).
+
     :param charset: iterable with all the characters to process.
 
     :return:        iterable with a tree of the prefix-free code
                     for the charset.
     """
-    alpha_heap = charset
-    heapq.heapify(alpha_heap)
+    nodes = sorted(charset, key=_frequency_order)
+    heap = [(node.freq, number) for number, node in enumerate(nodes)]
+    heapq.heapify(heap)
+
+    for _ in range(len(nodes) - 1):
+        left_freq, left = heapq.heappop(heap)
+        right_freq, right = heap[0]
+        heapq.heapreplace(heap, (left_freq + right_freq, len(nodes)))
+        nodes.append(CharNode(None, left_freq + right_freq, nodes[left], nodes[right]))
+    _, root = heap[0]
+    return nodes[root]
 
-    for _ in charset[:-1]:
-        left_char = heapq.heappop(alpha_heap)
-        right_char = heapq.heappop(alpha_heap)
 
-        new_symbol = left_char + right_char
-        heapq.heappush(alpha_heap, new_symbol)
-    return heapq.heappop(alpha_heap)
+def _frequency_order(node: CharNode) -> Tuple[int, Union[str, int]]:
+    return node.freq, node.value
 
 
-def parse_tree_code(tree: CharNode, table: dict = None, code: bytes = b"") -> dict:
+def parse_tree_code(tree: CharNode) -> dict:
     """
     Given the tree with the chars-frequency processed, return a table that
-    maps each character with its binary representation on the new code:
-
-        left --> 0
+    maps each character with its binary representation on the new code.
 
-        right --> 1
+    Only the depth of each character on the tree (the length of its code) is
+    taken from it, and the codes are assigned canonically with
+    `canonical_codes`, so the table can be rebuilt from the lengths alone.
 
     :param tree:  iterable with the tree as returned by `create_tree_code`
-    :param table: Map with the translation for the characters to its code in
-                  the new system (prefix-free).
-    :param code:  The code prefix so far.
 
     :return:      Mapping with with the original char to its new code.
     """
-    table = table or {}
-    if tree.leaf:
-        table[tree.value] = code
-        return table
-    table.update(parse_tree_code(tree.left, table, code + LEFT))
-    table.update(parse_tree_code(tree.right, table, code + RIGHT))
-    return table
+    return canonical_codes(code_lengths(tree))
+
+
+def code_lengths(tree: CharNode) -> dict:
+    """
+    Map each character (leaf) of the <tree> to its depth on it, which is the
+    length of its code.
+    """
+    lengths = {}
+    pending = [(tree, 0)]
+    while pending:
+        node, depth = pending.pop()
+        if node.left is None and node.right is None:
+            lengths[node.value] = depth
+        else:
+            pending.append((node.left, depth + 1))
+            pending.append((node.right, depth + 1))
+    return lengths
+
+
+_lengths_memo = OrderedDict()  # type: OrderedDict
+_lengths_lock = threading.Lock()
+
+
+def memoized_code_lengths(charset: List[CharNode]) -> dict:
+    """
+    Lengths of the codes of the tree for the <charset> (like
+    ``code_lengths(create_tree_code(charset))``), reusing the ones computed
+    for the same frequencies, if they are among the last
+    ``TABLE_MEMO_SIZE`` histograms seen, so content with the same one
+    (like the same file, compressed again) doesn't build the tree again.
+
+    The memo is kept in the process only (the workers have their own, and
+    it's lost on exit: see ``compressor.cache`` for reusing the files), and
+    it's shared by its threads. Only the exact same histogram is found on
+    it, not a close one: the lengths taken from another would make the
+    output depend on what was compressed before, not only on the content.
+    """
+    histogram = sorted((node.value, node.freq) for node in charset)
+    key = hashlib.sha256(repr(histogram).encode(ENC)).digest()
+    with _lengths_lock:
+        lengths = _lengths_memo.get(key)
+        if lengths is not None:
+            _lengths_memo.move_to_end(key)
+    if lengths is not None:
+        stats.count("memoized_tables")
+        return dict(lengths)
+    lengths = code_lengths(create_tree_code(charset))
+    with _lengths_lock:
+        _lengths_memo[key] = lengths
+        if len(_lengths_memo) > TABLE_MEMO_SIZE:
+            _lengths_memo.popitem(last=False)
+    return dict(lengths)
+
+
+def limited_code_lengths(charset: List[CharNode], max_length: int) -> dict:
+    """
+    Optimal lengths of a prefix-free code for the <charset>, with none of
+    them longer than <max_length> bits, computed with the package-merge
+    algorithm.
+
+    Each list holds the characters (sorted by frequency) merged with the
+    packages made by pairing the items of the previous list, for as many
+    lists as the maximum length. The length of the code of a character is
+    then the number of times it appears on the first ``2n - 2`` items of the
+    last one.
+
+    :param charset:    the characters to process, with their frequencies.
+    :param max_length: maximum length allowed for a code.
+    :return:           Mapping of each character to the length of its code.
+    """
+    leaves = sorted((node.freq, node.value) for node in charset)
+    if len(leaves) <= 1:
+        return {value: 0 for _, value in leaves}
+    if len(leaves) > 1 << max_length:
+        raise ValueError(f"{len(leaves)} characters can't be coded with up to {max_length} bits")
+
+    # Items are (weight, leaf number) or (weight, (item, item)) for packages
+    leaf_items = [(freq, number) for number, (freq, _) in enumerate(leaves)]  # type: List[Tuple[int, Any]]
+    items = leaf_items
+    for _ in range(max_length - 1):
+        packages = [(items[i][0] + items[i + 1][0], (items[i], items[i + 1])) for i in range(0, len(items) - 1, 2)]
+        items = list(heapq.merge(leaf_items, packages, key=itemgetter(0)))
+
+    lengths = [0] * len(leaves)
+    pending = items[: 2 * len(leaves) - 2]
+    while pending:
+        _, content = pending.pop()
+        if isinstance(content, int):
+            lengths[content] += 1
+        else:
+            pending.extend(content)
+    return {value: length for (_, value), length in zip(leaves, lengths)}
+
+
+def counts_code_lengths(counts: dict, max_length: Optional[int] = None) -> dict:
+    """
+    Optimal lengths of the codes for the frequencies on <counts> (a mapping
+    of each character to its frequency), up to <max_length> bits if given.
+    """
+    nodes = _nodes_from_counts(counts)
+    if not nodes:
+        return {}
+    lengths = code_lengths(create_tree_code(list(nodes)))
+    if max_length is not None and max(lengths.values()) > max_length:
+        lengths = limited_code_lengths(nodes, max_length)
+    return lengths
+
+
+def encoded_size(charset: List[CharNode], lengths: dict) -> int:
+    """Number of bits the characters of <charset> take with the code
+    <lengths>.
+    """
+    return sum(node.freq * lengths[node.value] for node in charset)
 
 
 def process_frequencies(stream: Sequence[str]) -> List[CharNode]:
@@ -79,179 +257,604 @@ def process_frequencies(stream: Sequence[str]) -> List[CharNode]:
     :param stream: sequence with all the characters.
     """
     counts = Counter(stream)
+    return _nodes_from_counts(counts)
+
+
+def process_file_frequencies(filename: str, chunk_size: int = READ_SIZE, binary: bool = False) -> List[CharNode]:
+    """
+    Like `process_frequencies`, but streaming the contents of <filename>,
+    `chunk_size` characters at the time, so the memory used does not depend
+    on the size of the file, but on the chunk size, and the alphabet.
+
+    :param filename:   Path to the file to process.
+    :param chunk_size: Amount of characters to read on each step.
+    :param binary:     If True, count the bytes of the file (as ints) instead
+                       of the characters of its text.
+    """
+    return _nodes_from_counts(count_file_symbols(filename, chunk_size, binary))
+
+
+def process_stream_frequencies(chunks: Iterable[Content]) -> List[CharNode]:
+    """Like `process_frequencies`, for content streamed by <chunks>."""
+    return _nodes_from_counts(count_symbols(chunks))
+
+
+def plain_ascii_frequencies(chunks: Iterable[Content]) -> Optional[List[CharNode]]:
+    """
+    Like `process_stream_frequencies`, for the bytes of a text file, as long
+    as they are plain ASCII without carriage returns (so they are the same as
+    the characters read from it as text, which translates the line endings).
+
+    :return: The frequencies of the bytes, or None as soon as a chunk with
+             other bytes is counted.
+    """
+    counts = Counter()  # type: Counter
+    for chunk in chunks:
+        count_symbols([chunk], counts)
+        if _CARRIAGE_RETURN in counts or max(counts) > _MAX_ASCII:
+            return None
+    return _nodes_from_counts(counts)
+
+
+def count_file_symbols(
+    filename: str, chunk_size: int = READ_SIZE, binary: bool = False, counts: Optional[Counter] = None
+) -> Counter:
+    """
+    Frequency of each character (or byte) of <filename>, streaming it by
+    chunks (see `process_file_frequencies`).
+
+    :param counts: If given, the frequencies are added to it (for counting
+                   several files together).
+    """
+    with StreamFile(filename, chunk_size, binary) as source:
+        return count_symbols(source, counts)
+
+
+def count_symbols(chunks: Iterable[Content], counts: Optional[Counter] = None) -> Counter:
+    """Frequency of each character (or byte) on all the <chunks>, added to
+    <counts> if given.
+    """
+    count = vectorized.count_symbols if vectorized.AVAILABLE else None
+    counts = Counter() if counts is None else counts
+    for chunk in chunks:
+        counts.update(count(chunk) if count else chunk)
+    return counts
+
+
+def _nodes_from_counts(counts: Mapping) -> List[CharNode]:
     return [CharNode(value=value, freq=freq) for value, freq in counts.items()]
 
 
-def save_table(dest_file: io, table: dict) -> None:
+def encoding_codes(table: dict) -> dict:
     """
-    Store the table in the destination file.
-        c: char
-        L: code of c (unsigned Long)
+    Translate the `table` as returned by `parse_tree_code`, into the form
+    used by the encoder: each character mapped to the integer value of its
+    code, and the length (in bits) of it.
 
-    :param dest_file: opened file where to write the `table`.
-    :param table:     Mapping table with the chars and their codes.
+    :param table: Mapping with the characters and their codes.
+    :return:      Mapping of each character to a (value, length) pair.
     """
-    offset = len(table)
-    tokens = [(char.encode(ENC), int(b"1" + codec, base=2)) for char, codec in table.items()]
+    return {char: (int(code or b"0", base=2), len(code)) for char, code in table.items()}
 
-    chars, codecs = zip(*tokens)
 
-    dest_file.write(pack("i", offset))
-    dest_file.write(pack(f"{offset}c", *chars))
-    dest_file.write(pack(f"{offset}L", *codecs))
+def encode_block(buffer_line: Content, codes: dict) -> bytes:
+    """
+    Transform `buffer_line` into a compressed block, with its header.
 
+    The bits are accumulated as they are produced, and every completed byte
+    is moved into the block right away, so there is no intermediate
+    representation of the whole bit stream.
 
-def process_line_compression(buffer_line: str, output_file: io, table: dict) -> None:
+    :param buffer_line: a chunk of the text to process.
+    :param codes:       Mapping of each character to its (value, length) code,
+                        as returned by `encoding_codes`.
+    :return:            The header and content of the block.
+    """
+    block = bytearray(_BLOCK_HEADER_SIZE)
+    append = block.append
+    # Start with the sentinel bit
+    accumulator, pending_bits = 1, 1
+    for char in buffer_line:
+        value, length = codes[char]
+        accumulator = (accumulator << length) | value
+        pending_bits += length
+        while pending_bits >= BYTE:
+            pending_bits -= BYTE
+            append(accumulator >> pending_bits)
+            accumulator &= (1 << pending_bits) - 1
+    # 0-pad the last byte (a whole byte if the stream was already aligned)
+    append(accumulator << (BYTE - pending_bits))
+
+    block_length = len(block) - _BLOCK_HEADER_SIZE
+    pack_into("II", block, 0, block_length, len(buffer_line))
+    return bytes(block)
+
+
+def process_line_compression(buffer_line: str, output_file: io, codes: dict) -> None:
     """
-    Transform `buffer_line` into the new code, per-byte, based on `table`
+    Transform `buffer_line` into the new code, per-byte, based on `codes`
     and save the new byte-stream into `output_file`.
 
     :param buffer_line: a chunk of the text to process.
     :param output_file: The opened file where to write the result.
-    :param table:       Translation table for the characters in `buffer_line`.
+    :param codes:       Translation of the characters in `buffer_line`, as
+                        returned by `encoding_codes`.
     """
-    bitarray = []  # type: list
-    chr_buffer = b""
-    for char in buffer_line:
-        encoded_char = table[char]
-        chr_buffer += encoded_char
-        bitarray.extend(int(chr(x)) for x in encoded_char)
+    output_file.write(encode_block(buffer_line, codes))
 
-    array_str = "".join(str(x) for x in bitarray)
-    # Add a sentinel first bit
-    array_str = "1" + array_str
-    array_str += "0" * (BYTE - (len(array_str) % BYTE))  # 0-pad
 
-    stream = hex(int(array_str, 2))[2:]
-    block = binascii.a2b_hex(stream)
-    block_length = len(array_str) // BYTE
-    original_length = len(buffer_line)
+def block_encoder(codes: dict) -> Callable[[Content], bytes]:
+    """
+    Function that transforms a chunk into a compressed block with <codes>
+    (like `encode_block`), using the NumPy backend if it's available.
+    """
+    if vectorized.VectorEncoder.supports(codes):
+        return vectorized.VectorEncoder(codes).encode
+    return partial(encode_block, codes=codes)
+
+
+class CompressOptions(NamedTuple):
+    """
+    The options of compressing, as given (by keyword) to
+    ``compressor.lib.compress_file``, where they are described. Only `jobs`,
+    `index`, `binary`, and `block_size` (``BUFF_SIZE`` if not given) are
+    used for writing the blocks: the rest choose the tables.
+    """
+
+    max_memory: Optional[int] = None
+    jobs: Optional[int] = 1
+    index: bool = False  # type: ignore  # (it hides tuple.index, which isn't used)
+    max_code_length: Optional[int] = None
+    binary: bool = False
+    block_size: Optional[int] = None
+    adaptive: bool = False
+    table: Optional[SharedTable] = None
 
-    output_file.write(pack("I", block_length))
-    output_file.write(pack("I", original_length))
-    output_file.write(block)
 
+# The codes of the blocks: a table (of each character to its code), the
+# tables of the groups of blocks (adaptive tables), or a shared table
+Tables = Union[dict, TablePlan, SharedTable]
 
-def compress_and_save_content(input_filename: str, output_file: io, table: dict) -> None:
+
+def compress_and_save_content(
+    input_filename: str,
+    output_file: io,
+    tables: Tables,
+    index: Optional[BlockIndex] = None,
+    options: CompressOptions = CompressOptions(),
+) -> int:
     """
     Opens and processes <input_filename>. Iterates over the file and writes
     the contents on output_file.
 
     :param input_filename: the source to be compressed
     :param output_file:    opened file where to write the outcome
-    :param table:          mapping table for the char encoding
+    :param tables:         the codes for the characters (see `Tables`).
+                           With a shared table, every character must have a
+                           code on it (as it's not built from the file).
+    :param index:          if given, the blocks written are registered on it.
+    :param options:        the `jobs` encoding the blocks (None for as many
+                           as CPUs), whether the file is `binary`, and the
+                           `block_size`.
+    :return:               the length of the content compressed.
     """
-    with StreamFile(input_filename, BUFF_SIZE) as source:
-        for buff in source:
-            process_line_compression(buff, output_file, table)
-
+    with StreamFile(input_filename, options.block_size or BUFF_SIZE, options.binary) as source:
+        return compress_content(source, output_file, tables, options.jobs, index)
 
-def _sizeof(code: str) -> int:
-    sizes = {"i": 4, "c": 1, "L": 4, "I": 4}
-    return sizes.get(code, 1)
 
+def compress_content(
+    source: Iterable[Content],
+    output_file: io,
+    tables: Tables,
+    jobs: Optional[int] = 1,
+    index: Optional[BlockIndex] = None,
+) -> int:
+    """
+    Encode each chunk of <source> as a block, and write them on
+    <output_file>. See `compress_and_save_content` for the parameters.
 
-def retrieve_table(dest_file: io) -> dict:
+    :return: the length of the content compressed.
     """
-    Read the binary file, and return the translation table as a reversed
-    dictionary.
+    encoders, table_ids = _block_encoders(tables)
+    write = output_file.write
+    if stats.enabled():
+        source, write = stats.timed_iter("read", source), stats.timed_calls("write", write)
+    if isinstance(tables, SharedTable):
+        source = _checked_symbols(source, tables.table)
+    if jobs == 1:
+        blocks = (
+            (encoders[table_id](buff), len(buff)) for buff, table_id in zip(source, table_ids)
+        )  # type: Iterable[Tuple[bytes, int]]
+    else:
+        blocks = _parallel_compression(zip(source, table_ids), encoders, jobs)
+
+    offset, total_length, count = output_file.tell(), 0, 0
+    for block, length in blocks:
+        if index is not None:
+            index.append(offset, len(block), length)
+        write(block)
+        offset += len(block)
+        total_length += length
+        count += 1
+    stats.count("blocks", count)
+    return total_length
+
+
+def _block_encoders(tables: Tables) -> Tuple[List[Callable[[Content], bytes]], Iterable[int]]:
+    """The encoder of each table of <tables>, and the id of the one of each
+    block, in order.
+    """
+    if isinstance(tables, TablePlan):
+        return [block_encoder(encoding_codes(table)) for table in tables.tables], tables.block_table_ids()
+    table = tables.table if isinstance(tables, SharedTable) else tables
+    return [block_encoder(encoding_codes(table))], repeat(0)
+
+
+def _checked_symbols(chunks: Iterable[Content], table: dict) -> Iterator[Content]:
+    """Pass along the <chunks>, making sure all their characters have a code
+    on <table> (which might not be the case for a shared one).
     """
-    offset, *_ = unpack("i", dest_file.read(_sizeof("i")))
-    chars = dest_file.read(offset * _sizeof("c"))
-    codes = dest_file.read(offset * _sizeof("L"))
+    for chunk in chunks:
+        # all characters, or all bytes (which are comparable among them)
+        missing = set(chunk).difference(table)  # type: Set[Any]
+        if missing:
+            raise ValueError(f"Characters without a code on the table: {sorted(missing)!r}")
+        yield chunk
 
-    chars = unpack(f"{offset}c", chars)
-    codes = unpack(f"{offset}L", codes)
-    return {
-        "b{0}".format(tobinary(code)): str(char, encoding=ENC)  # pylint: disable=consider-using-f-string
-        for char, code in zip(chars, codes)
-    }
 
+_worker_state = {}  # type: dict
 
-def _save_checksum(ofile: io, checksum: int):
-    """Persist the number of bytes as the first byte in <ofile>."""
-    ofile.write(pack("L", checksum))
 
+def _init_worker(**state) -> None:
+    """Keep the state (the encoders, or the decoders) on each worker process,
+    so it is sent only once.
+    """
+    _worker_state.update(state)
+
+
+def _encode_blocks(chunks: List[Tuple[Content, int]]) -> List[bytes]:
+    encoders = _worker_state["encoders"]
+    return [encoders[table_id](chunk) for chunk, table_id in chunks]
 
-def _retrieve_checksum(ifile: io) -> int:
-    rawdata = ifile.read(_sizeof("L"))
-    return unpack("L", rawdata)[0]
 
+def _decode_blocks(first: int, blocks: List[Tuple[bytes, int]]) -> Content:
+    decoders = _worker_state["decoders"]
+    return decoders.join(
+        _decode_block(content, decoders[number], length) for number, (content, length) in enumerate(blocks, first)
+    )
 
-def save_compressed_file(filename: str, table: dict, checksum: int, dest_file: str = "") -> None:
+
+def _parallel_compression(
+    source: Iterable[Tuple[Content, int]], encoders: Sequence[Callable[[Content], bytes]], jobs: Optional[int]
+) -> Iterator[Tuple[bytes, int]]:
+    """
+    Encode the chunks of <source> (each one with the encoder of the table id
+    it comes along) on a pool of <jobs> processes, and yield the blocks
+    (along with the length of their content) in the same order they were
+    read.
+
+    The chunks are sent in batches of ``BLOCKS_PER_TASK``, and only a few
+    batches per worker are in flight at the same time, so the memory is
+    bounded regardless of the size of the file.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    source = iter(source)
+    batches = iter(lambda: [(_picklable(chunk), table_id) for chunk, table_id in islice(source, BLOCKS_PER_TASK)], [])
+    with ProcessPoolExecutor(jobs, initializer=partial(_init_worker, encoders=encoders)) as executor:
+        in_flight = deque()  # type: Deque[Tuple[Future, List[int]]]
+        for batch in batches:
+            in_flight.append((executor.submit(_encode_blocks, batch), [len(chunk) for chunk, _ in batch]))
+            if len(in_flight) >= IN_FLIGHT_PER_WORKER * jobs:
+                future, lengths = in_flight.popleft()
+                yield from zip(future.result(), lengths)
+        while in_flight:
+            future, lengths = in_flight.popleft()
+            yield from zip(future.result(), lengths)
+
+
+def _picklable(chunk: Union[Content, memoryview]) -> Content:
+    """Copy of the <chunk> for sending it to a worker, if it's a view."""
+    return bytes(chunk) if isinstance(chunk, memoryview) else chunk
+
+
+def auto_block_size(length: int, jobs: Optional[int] = 1) -> int:
+    """
+    Size of the blocks for compressing <length> characters with <jobs>
+    processes.
+
+    Larger blocks take less overhead (a header, and a call, per block), but
+    there should be enough of them for keeping all the workers busy, and
+    they are the unit of random access (a whole block is decoded to read any
+    part of it). So the blocks are as large as possible while giving each
+    worker a few batches of them, between ``MIN_BLOCK_SIZE`` and
+    ``MAX_BLOCK_SIZE`` (rounded down to a power of 2).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    target = length // (jobs * BLOCKS_PER_TASK * IN_FLIGHT_PER_WORKER)
+    size = 1 << max(target, 1).bit_length() - 1
+    return min(max(size, MIN_BLOCK_SIZE), MAX_BLOCK_SIZE)
+
+
+def save_compressed_file(
+    filename: str,
+    tables: Tables,
+    checksum: Optional[int],
+    dest_file: str = "",
+    options: CompressOptions = CompressOptions(),
+) -> None:
     """
     Given the original file by its `filename`, save a new one.
-    `table` contains the new codes for each character on `filename`.
+    `tables` contains the new codes for each character on `filename`: a
+    table, all of whose codes are saved; a `TablePlan`, for compressing the
+    file with adaptive tables (all the tables of the plan are saved, and
+    each group of blocks is encoded with its own); or a `SharedTable`, of
+    which only the id is saved (the table is needed for extracting the
+    file, and every character of it must have a code on it).
+    The blocks are encoded by the `jobs` processes of the `options`.
+    If their `index` is True, a trailer with the location of each block is
+    added at the end of the file.
+    If `binary` is True, the bytes of the file are compressed instead of the
+    characters of its text.
+    The content is split in blocks of `block_size` characters.
+    The `checksum` can be None when it's not known beforehand, in which case
+    it's set once the whole content is compressed.
     """
     new_file = dest_file or default_filename(filename)
+    block_size = options.block_size or BUFF_SIZE
+    with open(new_file, "wb") as target, StreamFile(filename, block_size, options.binary) as source:
+        write_compressed(source, target, tables, checksum, options)
+
+
+def write_compressed(
+    source: Iterable[Content],
+    target: io,
+    tables: Tables,
+    checksum: Optional[int],
+    options: CompressOptions = CompressOptions(),
+) -> None:
+    """
+    Write the compressed file (header, tables, blocks, and index) on the
+    opened <target>, with each chunk of <source> (of `block_size`) as a
+    block. See `save_compressed_file` for the rest of the parameters.
 
-    with open(new_file, "wb") as target:
-        _save_checksum(target, checksum)
-        save_table(target, table)
-        compress_and_save_content(filename, target, table)
+    The `target` must be seekable if the `checksum` is not given.
+    """
+    block_index = BlockIndex() if options.index else None
+    flags = (FLAG_BINARY if options.binary else 0) | (FLAG_INDEX if options.index else 0)
+    flags |= FLAG_ADAPTIVE if isinstance(tables, TablePlan) else 0
+    flags |= FLAG_SHARED_TABLE if isinstance(tables, SharedTable) else 0
+
+    start = target.tell()
+    _save_header(target, checksum or 0, flags, options.block_size or BUFF_SIZE)
+    if isinstance(tables, TablePlan):
+        save_table_plan(target, tables, options.binary)
+    elif isinstance(tables, SharedTable):
+        target.write(pack("Q", tables.table_id))
+    else:
+        save_table(target, tables, options.binary)
+    with stats.timed("encode"):
+        length = compress_content(source, target, tables, options.jobs, block_index)
+    if checksum is None:
+        _patch_checksum(target, length, start)
+    if block_index is not None:
+        block_index.save(target)
+    if stats.enabled():
+        stats.count("length", length)
+        stats.count("bytes_out", target.tell() - start)
+
+
+def _decode_block(binary_content: bytes, decoder: DecodeTable, block_length: int) -> Content:
+    """Transform the compressed content of a block into the original text."""
+    return decoder.decode(binary_content, block_length)
 
 
-def _decode_block(binary_content: bytes, table: dict, block_length: int) -> str:
-    """Transform the compressed content of a block into the original text."""
-    newchars = []
-    cont = binascii.hexlify(binary_content)
-    bitarray = tobinary(cont)
-    # Ignore first bit, sentinel
-    bitarray = bitarray[1:]
-    window_start, window_end = 0, 1
-    part = bitarray[window_start:window_end]
-    restored = 0  # bytes
-    while part:
-        char = table.get(bitarray[window_start:window_end], False)
-        while not char and bitarray[window_start:window_end]:
-            window_end += 1
-            char = table.get(bitarray[window_start:window_end], False)
-        newchars.append(char)
-        restored += 1
-        if restored == block_length:
-            break
-        window_start, window_end = window_end, window_end + 1
-        part = bitarray[window_start:window_end]
-    return "".join(newchars)[:block_length]
-
-
-def decode_file_content(compfile: io, table: dict, checksum: int) -> str:
+def iter_file_content(compfile: io, decoders: BlockDecoders, checksum: int) -> Generator[Content, None, None]:
     """
     Reconstruct the remaining part of the <compfile>, starting right after
-    the metadata, decoding each bit according to the <table>.
+    the metadata, decoding each block with the lookup tables of its decoder
+    on <decoders>, and yielding its content as soon as it's decoded.
     """
-    original_stream = ""
+    restored, number = 0, 0
     next_block = compfile.read(_sizeof("I"))
-    while len(original_stream) < checksum and next_block:
+    while restored < checksum and next_block:
         block_size, *_ = unpack("I", next_block)
         block_length, *_ = unpack("I", compfile.read(_sizeof("I")))
         binary_content = compfile.read(block_size)
-        retrieved = _decode_block(binary_content, table, block_length)
+        yield _decode_block(binary_content, decoders[number], block_length)
 
-        original_stream += retrieved
+        restored += block_length
+        number += 1
         next_block = compfile.read(_sizeof("I"))
-    return original_stream
+    stats.count("blocks", number)
 
 
-def _reorganize_table_keys(table: dict) -> dict:
-    """Change the keys of the table to be more easily readable: bytes->str"""
-    return {k[2:]: v for k, v in table.items()}
+def iter_stream_content(compfile: io, decoders: BlockDecoders) -> Generator[Content, None, None]:
+    """
+    Like `iter_file_content`, for streamed content, whose length is not on
+    the header: the blocks are decoded until the end record. A table record
+    replaces the table for decoding the blocks after it.
+    """
+    while True:
+        record = compfile.read(_BLOCK_HEADER_SIZE)
+        if len(record) < _BLOCK_HEADER_SIZE:
+            raise ValueError("Truncated stream: the end record is missing")
+        block_size, block_length = unpack("II", record)
+        if block_size:
+            yield _decode_block(compfile.read(block_size), decoders[0], block_length)
+        elif block_length == STREAM_TABLE:
+            table = retrieve_table(compfile, decoders.binary)
+            decoders = BlockDecoders([_decoding_table(table)], binary=decoders.binary)
+        elif block_length == STREAM_END:
+            return
+        else:
+            raise ValueError(f"Invalid record on the stream: {block_length}")
+
+
+def decode_file_content(compfile: io, decoders: BlockDecoders, checksum: int, output: io) -> None:
+    """
+    Decode the blocks of <compfile> (see `iter_file_content`), writing each
+    one into <output> as it's decoded, so only one block at the time is held
+    in memory.
+    """
+    _write_blocks(output, iter_file_content(compfile, decoders, checksum))
+
+
+def _read_block(compfile: io, index: BlockIndex, number: int) -> Tuple[bytes, int]:
+    """Content of the block <number> on the <index>, and its original length."""
+    compfile.seek(index.offsets[number])
+    raw = compfile.read(index.sizes[number])
+    _, block_length = unpack("II", raw[:_BLOCK_HEADER_SIZE])
+    return raw[_BLOCK_HEADER_SIZE:], block_length
+
+
+def _parallel_decoding(
+    compfile: io, decoders: BlockDecoders, index: BlockIndex, jobs: Optional[int]
+) -> Generator[Content, None, None]:
+    """
+    Decode the blocks of <compfile> listed on <index> on a pool of <jobs>
+    processes, yielding their content in order.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(jobs, initializer=partial(_init_worker, decoders=decoders)) as executor:
+        in_flight = deque()  # type: Deque[Future]
+        for first in range(0, len(index), BLOCKS_PER_TASK):
+            last = min(first + BLOCKS_PER_TASK, len(index))
+            batch = [_read_block(compfile, index, number) for number in range(first, last)]
+            in_flight.append(executor.submit(_decode_blocks, first, batch))
+            if len(in_flight) >= IN_FLIGHT_PER_WORKER * jobs:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def _retrieve_metadata(compfile: io, shared: Optional[SharedTable] = None) -> Tuple[Header, BlockDecoders]:
+    """
+    Read the header and the tables from the start of <compfile>.
+
+    Files compressed with a `shared` table only have its id, so it has to be
+    given (and match it) for decoding them.
+    """
+    header = _retrieve_header(compfile)
+    binary = bool(header.flags & FLAG_BINARY)
+    if header.flags & FLAG_STREAM and not header.flags & FLAG_SHARED_TABLE:
+        return header, BlockDecoders([], binary=binary)  # the tables come along the blocks
+    if header.flags & FLAG_SHARED_TABLE:
+        table_id, *_ = unpack("Q", compfile.read(_sizeof("Q")))
+        if shared is None:
+            raise ValueError(f"The file was compressed with a shared table ({table_id:016x}), which is required")
+        if shared.table_id != table_id:
+            raise ValueError(f"The file was compressed with the table {table_id:016x}, not {shared.table_id:016x}")
+        return header, BlockDecoders([_decoding_table(shared.table)], binary=binary)
+    if header.flags & FLAG_ADAPTIVE:
+        plan = retrieve_table_plan(compfile, binary)
+        tables = [_decoding_table(table) for table in plan.tables]
+        return header, BlockDecoders(tables, plan.table_ids, plan.group_size, binary)
+    table = retrieve_table(compfile, binary) if header.version else _retrieve_legacy_table(compfile)
+    return header, BlockDecoders([_decoding_table(table)], binary=binary)
+
+
+def _decoding_table(table: dict) -> dict:
+    """Mapping of each code (as a string of bits) to its character."""
+    return {str(code, encoding=ENC): char for char, code in table.items()}
+
+
+def _block_index(compfile: io, header: Header) -> BlockIndex:
+    """The index from the trailer of <compfile>, if the <header> says it has
+    one, or by scanning its blocks.
+    """
+    index = BlockIndex.load(compfile) if header.flags & FLAG_INDEX else None
+    return index or BlockIndex.scan(compfile, header.checksum)
 
 
-def retrieve_compressed_file(filename: str, dest_file: str = "") -> None:
+def retrieve_compressed_file(
+    filename: str, dest_file: Union[str, io] = "", jobs: Optional[int] = 1, table: Optional[SharedTable] = None
+) -> None:
     """
     EXTRACT - Reconstruct the original file from the compressed copy.
     Reads a binary file.
-    Writes into a text file.
-    Write the output in the indicated `dest_file`.
+    Writes into a text file (or a binary one, if it was compressed as such).
+    Write the output in the indicated `dest_file`, which can also be an
+    opened (writable) file-like object. The content is written block by
+    block, as it is decoded.
+    With more than one of `jobs`, the blocks are decoded in parallel.
+    Files compressed with a shared table need it as `table`.
     """
-    with open(filename, "rb") as src:
-        checksum = _retrieve_checksum(src)
-        map_table = retrieve_table(src)
-        table = _reorganize_table_keys(map_table)
-
+    with stats.timed("extract"), open(filename, "rb") as src:
+        stats.count("bytes_in", os.path.getsize(filename))
+        decoders, blocks = decoded_blocks(src, jobs, table)
+        if hasattr(dest_file, "write"):
+            _write_blocks(dest_file, blocks)
+            return
         dest_filename = dest_file or default_filename(filename, suffix="extr")
-        stream = decode_file_content(src, table, checksum)
-        # Dump the decoded extraction into its destination
-        with open_text_file(dest_filename, "w+") as out:
-            out.write(stream)
+        with open(dest_filename, "wb") if decoders.binary else open_text_file(dest_filename, "w+") as out:
+            _write_blocks(out, blocks)
+    if stats.enabled():
+        stats.count("bytes_out", os.path.getsize(dest_filename))
+
+
+def decoded_blocks(
+    src: io, jobs: Optional[int] = 1, table: Optional[SharedTable] = None
+) -> Tuple[BlockDecoders, Generator[Content, None, None]]:
+    """
+    Read the metadata of the compressed file opened as <src>, and return its
+    decoders, along with the content of its blocks, decoded as they are
+    iterated (by `jobs` processes).
+
+    With more than one of `jobs`, <src> must be seekable. Streamed content
+    (see ``compressor.streaming``) is always decoded sequentially.
+    """
+    with stats.timed("metadata"):
+        header, decoders = _retrieve_metadata(src, table)
+    if header.flags & FLAG_STREAM:
+        blocks = iter_stream_content(src, decoders)
+    elif jobs == 1:
+        blocks = iter_file_content(src, decoders, header.checksum)
+    else:
+        index = _block_index(src, header)
+        stats.count("blocks", len(index))
+        blocks = _parallel_decoding(src, decoders, index, jobs)
+    if stats.enabled():
+        stats.count("length", header.checksum)
+        blocks = stats.timed_iter("decode", blocks)
+    return decoders, blocks
+
+
+def _write_blocks(output: io, blocks: Iterable[Content]) -> None:
+    for block in blocks:
+        output.write(block)
+
+
+def extract_range(
+    filename: str, start: int, length: int, table: Optional[SharedTable] = None
+) -> Content:
+    """
+    Return `length` characters (or bytes, for files compressed as binary) of
+    the original content of the compressed file <filename>, starting at
+    `start`.
+
+    Only the blocks holding the range are decoded, found by the index on the
+    trailer of the file (or by scanning the headers of the blocks, if the
+    file has none).
+    Files compressed with a shared table need it as `table`.
+    """
+    if start < 0 or length < 0:
+        raise ValueError("start and length must be positive")
+    with open(filename, "rb") as src:
+        header, decoders = _retrieve_metadata(src, table)
+        if header.flags & FLAG_STREAM:
+            raise ValueError("Ranges can't be extracted from streamed content")
+        if not length or start >= header.checksum:
+            return decoders.empty
+        index = _block_index(src, header)
+        end = min(start + length, index.length)
+        first = index.find(start)
+
+        pieces = []
+        for number in range(first, len(index)):
+            if index.positions[number] >= end:
+                break
+            binary_content, block_length = _read_block(src, index, number)
+            pieces.append(_decode_block(binary_content, decoders[number], block_length))
+
+    offset = start - index.positions[first]
+    return decoders.join(pieces)[offset : offset + end - start]
@@ -0,0 +1,160 @@
+"""compressor.decoder
+
+Table-driven decoding of the compressed blocks.
+
+Instead of growing a window one bit at the time, and looking it up on the
+translation table, the codes are expanded into a lookup table indexed by the
+next ``lookup_bits`` bits of the stream, so a single lookup resolves a whole
+character. Codes longer than the lookup window are resolved on a secondary
+table, keyed by their length and value.
+
+Files with adaptive tables have several of them, and each block is decoded
+with the one of its group (see ``BlockDecoders``).
+"""
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union, cast
+
+from compressor.constants import BYTE, LOOKUP_BITS
+
+Symbol = Union[str, int]
+Content = Union[str, bytes]  # decoded text, or bytes (for binary files)
+Entry = Tuple[Symbol, int]
+
+
+class DecodeTable:  # pylint: disable=too-few-public-methods
+    """Lookup tables for decoding a prefix-free code straight from the packed
+    bytes of a block.
+
+    >>> decoder = DecodeTable({"0": "a", "10": "b", "11": "c"})
+    >>> decoder.decode(block_content, block_length)
+    """
+
+    def __init__(self, table: Mapping[str, Symbol], lookup_bits: int = LOOKUP_BITS, binary: bool = False) -> None:
+        """
+        :param table:       Mapping of each code (as a string of 0s and 1s)
+                            to the character it represents.
+        :param lookup_bits: How many bits to resolve with a single lookup.
+        :param binary:      If True, the symbols are bytes (as ints), and the
+                            blocks are decoded into ``bytes``.
+        """
+        self.binary = binary
+        self.empty = b"" if binary else ""  # type: Content
+        self.max_length = max(map(len, table), default=0)
+        self.lookup_bits = max(1, min(lookup_bits, self.max_length))
+        self._primary = [None] * (1 << self.lookup_bits)  # type: List[Optional[Entry]]
+        self._long_codes = {}  # type: Dict[Tuple[int, int], Symbol]
+
+        for code, char in table.items():
+            length = len(code)
+            value = int(code or "0", 2)
+            if length > self.lookup_bits:
+                self._long_codes[(length, value)] = char
+                continue
+            # Every window starting with this code resolves to it
+            shift = self.lookup_bits - length
+            start = value << shift
+            for index in range(start, start + (1 << shift)):
+                self._primary[index] = (char, length)
+
+    def _resolve_long_code(self, window: int, available: int) -> Entry:
+        """Find the code longer than the lookup window, at the start of the
+        ``available`` bits of ``window``.
+        """
+        for length in range(self.lookup_bits + 1, self.max_length + 1):
+            value = (window >> (available - length)) & ((1 << length) - 1)
+            char = self._long_codes.get((length, value))
+            if char is not None:
+                return char, length
+        raise ValueError("Invalid code found in the compressed block")
+
+    def _join(self, symbols: List[Symbol]) -> Content:
+        return bytes(symbols) if self.binary else "".join(symbols)  # type: ignore
+
+    def decode(self, binary_content: bytes, block_length: int) -> Content:  # pylint: disable=too-many-locals
+        """Transform the compressed content of a block into the original
+        text (or bytes), of ``block_length`` characters.
+
+        The first bit of the block is the sentinel, and the trailing bits
+        are padding, so they are both ignored. What the loop uses is kept on
+        local variables, as they are faster to look up.
+        """
+        if not block_length:
+            return self.empty
+        lookup_bits = self.lookup_bits
+        mask = (1 << lookup_bits) - 1
+        required = max(self.max_length, lookup_bits)
+        primary = self._primary
+
+        newchars = []  # type: List[Symbol]
+        append = newchars.append
+        pending = block_length
+        window, available = 0, -1  # skip the sentinel bit
+        for chunk in (binary_content, bytes(required // BYTE + 1)):  # the content, and padding
+            for byte in chunk:
+                window = (window << BYTE) | byte
+                available += BYTE
+                while available >= required:
+                    entry = primary[(window >> (available - lookup_bits)) & mask]
+                    if entry is None:
+                        entry = self._resolve_long_code(window, available)
+                    char, length = entry
+                    append(char)
+                    pending -= 1
+                    if not pending:
+                        return self._join(newchars)
+                    available -= length
+                window &= (1 << available) - 1
+        return self._join(newchars)
+
+
+class BlockDecoders:
+    """The decoder for each block of a file, by its number.
+
+    Files compressed with a single table use the same decoder for all their
+    blocks. With adaptive tables, the blocks are taken in groups of
+    ``group_size``, each one referring to a table by its id (its position on
+    ``tables``). The decoder of each table is built the first time a block
+    needs it, and kept for the next ones.
+
+    >>> decoders = BlockDecoders([table])
+    >>> decoders[number].decode(block_content, block_length)
+    """
+
+    def __init__(
+        self,
+        tables: Sequence[Mapping[str, Symbol]],
+        table_ids: Optional[Sequence[int]] = None,
+        group_size: int = 1,
+        binary: bool = False,
+    ) -> None:
+        """
+        :param tables:     The decoding tables (as taken by ``DecodeTable``).
+        :param table_ids:  Id of the table of each group of blocks, or None
+                           if all the blocks use the first one.
+        :param group_size: Number of blocks on each group.
+        :param binary:     If True, the blocks are decoded into ``bytes``.
+        """
+        self.tables = tables
+        self.table_ids = table_ids
+        self.group_size = group_size
+        self.binary = binary
+        self.empty = b"" if binary else ""  # type: Content
+        self._decoders = {}  # type: Dict[int, DecodeTable]
+
+    def table_id(self, number: int) -> int:
+        """Id of the table of the block <number>."""
+        if self.table_ids is None:
+            return 0
+        return self.table_ids[number // self.group_size]
+
+    def join(self, pieces: Iterable[Content]) -> Content:
+        """Concatenate the decoded <pieces> (all text, or all bytes)."""
+        if self.binary:
+            return b"".join(cast(Iterable[bytes], pieces))
+        return "".join(cast(Iterable[str], pieces))
+
+    def __getitem__(self, number: int) -> DecodeTable:
+        table_id = self.table_id(number)
+        decoder = self._decoders.get(table_id)
+        if decoder is None:
+            decoder = self._decoders[table_id] = DecodeTable(self.tables[table_id], binary=self.binary)
+        return decoder
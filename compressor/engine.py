@@ -0,0 +1,72 @@
+"""compressor.engine
+
+The operation on one file (or the training of a table from several), with
+the options of the command line: what `batch_engine` runs for each file.
+"""
+from typing import Any, Callable, List, Optional, Union
+
+from compressor.constants import CACHE_SIZE
+
+
+def main_engine(
+    filename: Union[str, List[str]],
+    extract: bool = False,
+    compress: bool = True,
+    dest_file: Optional[str] = None,
+    **options: Any,
+) -> int:
+    """
+    Main functionality for the program cli or call as library.
+    Only one of `extract`, `compress`, or `train` must be True.
+
+    :param filename:   Path to the source file to process (or a list of
+                       them, for training).
+    :param extract:    If True, sets the program for a extraction.
+    :param compress:   If True, the program should compress a file.
+    :param dest_file:  Optional name of the target file.
+    :param options:    The options of compressing (see
+                       ``compressor.lib.compress_file``), with `jobs` as 0
+                       for all the CPUs, and `table` as the path to the file
+                       of a shared table. Besides:
+    :param train:      If True, train a shared table from the file, and save
+                       it on `table`.
+    :param cache:      Directory of a cache of compressed files, for taking
+                       the result from it if the file was compressed before.
+    :param cache_size: Bytes the files on the `cache` can take.
+
+    :return: 0 if executed without problems.
+    """
+    # pylint: disable=import-outside-toplevel
+    from compressor.lib import extract_file, load_table, train_table
+
+    table, cache = options.pop("table", None), options.pop("cache", None)
+    cache_size = options.pop("cache_size", CACHE_SIZE)
+    if options.pop("train", False):
+        if table is None:
+            raise ValueError("The file where to save the table (--table) is required for training")
+        names = [filename] if isinstance(filename, str) else filename
+        train_table(names, table, options.get("binary", False), options.get("max_code_length"))
+        return 0
+    if not isinstance(filename, str):
+        raise ValueError("Only one file can be compressed, or extracted, at once")
+    shared = load_table(table) if table is not None else None
+    options["jobs"] = options.get("jobs", 1) or None
+    if compress:
+        _compressing(cache, cache_size)(filename, dest_file, table=shared, **options)
+    if extract:
+        extract_file(filename, dest_file, jobs=options["jobs"], table=shared)
+    return 0
+
+
+def _compressing(cache: Optional[str], cache_size: int) -> Callable[..., Any]:
+    """The function compressing a file: the one of ``compressor.lib``, or the
+    one taking the file from the cache on the directory <cache>, if given.
+    """
+    # pylint: disable=import-outside-toplevel
+    if cache is None:
+        from compressor.lib import compress_file
+
+        return compress_file
+    from compressor.cache import CompressionCache
+
+    return CompressionCache(cache, cache_size).compress_file
@@ -0,0 +1,124 @@
+"""compressor.index
+
+Index of the blocks of a compressed file.
+
+For each block, it keeps the offset in the compressed file where it starts,
+its size (header included), and the offset of its content in the original
+text. It's optionally saved as a trailer of the compressed file, right after
+the last block, with the following layout::
+
+    [offsets: count * Q][sizes: count * Q][positions: count * Q]
+    [index offset: Q][count: Q][INDEX_MAGIC]
+
+The files with the trailer have ``FLAG_INDEX`` on their header, so it's only
+looked for on those. Files without it can still be indexed by scanning the
+headers of their blocks.
+"""
+import os
+from array import array
+from bisect import bisect_right
+from typing import Optional, io  # type: ignore
+
+from compressor.util import pack, unpack
+
+INDEX_MAGIC = b"CIDX"
+_FOOTER_FORMAT = f"QQ{len(INDEX_MAGIC)}s"
+_FOOTER_SIZE = 8 + 8 + len(INDEX_MAGIC)
+_BLOCK_HEADER_FORMAT = "II"
+_BLOCK_HEADER_SIZE = 8
+
+
+class BlockIndex:
+    """Location of each block, both in the compressed file and in the
+    original content.
+    """
+
+    def __init__(self) -> None:
+        self.offsets = array("Q")
+        self.sizes = array("Q")
+        self.positions = array("Q")
+        self.length = 0
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def append(self, offset: int, size: int, length: int) -> None:
+        """
+        Register a new block, following the last one.
+
+        :param offset: position in the compressed file where the block starts.
+        :param size:   bytes taken by the block, header included.
+        :param length: length of the original content of the block.
+        """
+        self.offsets.append(offset)
+        self.sizes.append(size)
+        self.positions.append(self.length)
+        self.length += length
+
+    def find(self, position: int) -> int:
+        """Number of the block that holds the original content at <position>."""
+        if not 0 <= position < self.length:
+            raise IndexError(f"Position {position} out of range")
+        return bisect_right(self.positions, position) - 1
+
+    def save(self, dest_file: io) -> None:
+        """Write the index as a trailer on <dest_file>, at its current position."""
+        index_offset = dest_file.tell()
+        for values in (self.offsets, self.sizes, self.positions):
+            dest_file.write(values.tobytes())
+        dest_file.write(pack(_FOOTER_FORMAT, index_offset, len(self), INDEX_MAGIC))
+
+    @classmethod
+    def load(cls, compfile: io) -> Optional["BlockIndex"]:
+        """
+        Read the index from the trailer of <compfile>, if it has one.
+        The position of the file is restored afterwards.
+
+        :return: the index, or None if the file has no trailer.
+        """
+        position = compfile.tell()
+        try:
+            compfile.seek(0, os.SEEK_END)
+            if compfile.tell() < _FOOTER_SIZE:
+                return None
+            compfile.seek(-_FOOTER_SIZE, os.SEEK_END)
+            index_offset, count, magic = unpack(_FOOTER_FORMAT, compfile.read(_FOOTER_SIZE))
+            if magic != INDEX_MAGIC:
+                return None
+            compfile.seek(index_offset)
+            index = cls()
+            for values in (index.offsets, index.sizes, index.positions):
+                values.frombytes(compfile.read(count * values.itemsize))
+            if count:
+                index.length = index.positions[-1] + _block_length(compfile, index.offsets[-1])
+            return index
+        finally:
+            compfile.seek(position)
+
+    @classmethod
+    def scan(cls, compfile: io, checksum: int) -> "BlockIndex":
+        """
+        Build the index by reading the headers of the blocks, starting from
+        the current position of <compfile> and until <checksum> characters
+        are covered. The position of the file is restored afterwards.
+        """
+        position = compfile.tell()
+        index = cls()
+        try:
+            offset = position
+            while index.length < checksum:
+                header = compfile.read(_BLOCK_HEADER_SIZE)
+                if len(header) < _BLOCK_HEADER_SIZE:
+                    break
+                block_size, block_length = unpack(_BLOCK_HEADER_FORMAT, header)
+                index.append(offset, _BLOCK_HEADER_SIZE + block_size, block_length)
+                offset = compfile.seek(block_size, os.SEEK_CUR)
+            return index
+        finally:
+            compfile.seek(position)
+
+
+def _block_length(compfile: io, offset: int) -> int:
+    compfile.seek(offset)
+    _, block_length = unpack(_BLOCK_HEADER_FORMAT, compfile.read(_BLOCK_HEADER_SIZE))
+    return block_length
@@ -1,28 +1,254 @@
 """compressor.lib
 
 High-level functions exposed as a library, that can be imported.
+
+Besides files (by their path), the content can be compressed, and extracted,
+from memory (``compress``, and ``decompress``), or from opened file objects
+(``compress_stream``, and ``decompress_stream``), without temporary files.
+Content arriving over time is compressed incrementally with ``Compressor``,
+and extracted with ``Decompressor``.
 """
+import io
+import logging
+import os
+from functools import partial
+from typing import IO, Any, Callable, Optional, Tuple, Union
 
+from compressor import stats
+from compressor.adaptive import plan_tables
 from compressor.char_node import CharNode  # pylint: disable=unused-import
-from compressor.core import (create_tree_code, parse_tree_code,
-                             process_frequencies)
+from compressor.constants import MAX_CHAR_SIZE, READ_SIZE
+from compressor.container import SharedTable, canonical_codes
+from compressor.core import (CompressOptions, Tables, auto_block_size,
+                             decoded_blocks, encoded_size,
+                             limited_code_lengths, memoized_code_lengths,
+                             plain_ascii_frequencies,
+                             process_stream_frequencies, write_compressed)
+from compressor.core import extract_range  # pylint: disable=unused-import
 from compressor.core import retrieve_compressed_file as extract_file  # pylint: disable=unused-import
-from compressor.core import save_compressed_file
-from compressor.util import open_text_file
+from compressor.reader import CompressedFileReader  # pylint: disable=unused-import
+from compressor.shared import load_table, train_table  # pylint: disable=unused-import
+from compressor.streaming import Compressor, Decompressor  # pylint: disable=unused-import
+from compressor.util import MappedFile, MemoryStream, StreamFile, default_filename
+
+logger = logging.getLogger(__name__)
 
 
-def compress_file(filename: str, dest_file: str = "") -> None:
+def compress_file(filename: str, dest_file: str = "", **options: Any) -> None:
     """
     Open the <filename> and compress its contents on a new one.
 
-    :param filename:  The path to the source file to compress.
-    :param dest_file: The name of the target file. If not provided (None),
-                      a default will be used with `<filename>.comp`
+    The file is read twice: once for counting the frequencies of the
+    characters, and then for encoding them, streaming it by chunks both
+    times, so files larger than the available memory can be compressed.
+    Binary files, and text files that are plain ASCII (whose bytes are their
+    characters, as found while counting them), are mapped in memory instead
+    of read, so both passes work on slices of the page cache.
+
+    The <options> are given by keyword (see ``CompressOptions``):
+
+    :param filename:   The path to the source file to compress.
+    :param dest_file:  The name of the target file. If not provided (None),
+                       a default will be used with `<filename>.comp`
+    :param max_memory: Bound (in bytes) for the chunks of text read at once.
+    :param jobs:       Number of processes encoding the blocks in parallel
+                       (None to use all the CPUs).
+    :param index:      Add a trailer with the location of each block, for
+                       parallel extraction, and access to ranges of the
+                       original content with `extract_range`.
+    :param max_code_length: Maximum length (in bits) for the code of a
+                       character. The cost in compression ratio of the limit
+                       is logged.
+    :param binary:     Compress the bytes of the file, instead of the
+                       characters of its text, so any file can be
+                       compressed, and it's extracted as binary.
+    :param block_size: Characters (or bytes) on each block. If not provided,
+                       it's chosen from the length of the file, and the
+                       number of `jobs`.
+    :param adaptive:   Use adaptive tables: each group of blocks is encoded
+                       with its own table (or the one of a previous group),
+                       for files whose content changes along them.
+    :param table:      A shared table (see `train_table` and `load_table`)
+                       to compress the file with, in a single pass, storing
+                       only its id. The file is compressed as binary if the
+                       table is, and `table` is required for extracting it.
+    """
+    settings = CompressOptions(**options)
+    if settings.table is not None:
+        settings = settings._replace(binary=settings.table.binary)
+    open_stream = partial(StreamFile, filename, binary=settings.binary)  # type: Callable[[int], Any]
+    if settings.binary:
+        open_stream = partial(MappedFile, filename)
+    # ASCII text is compressed from its bytes, but only with a table built
+    # from them (adaptive and shared tables have the characters as str)
+    plain_table = not settings.binary and settings.table is None and not settings.adaptive
+    ascii_stream = partial(MappedFile, filename) if plain_table else None
+    with open(dest_file or default_filename(filename), "wb") as target:
+        _compress(open_stream, target, os.path.getsize(filename), settings, ascii_stream)
+
+
+def compress(data: Union[str, bytes, memoryview], **options: Any) -> bytes:
+    """
+    Compress the <data> in memory, and return the compressed content (the
+    same that `compress_file` would have written).
+
+    A ``str`` is compressed as text, and anything else supporting the buffer
+    protocol (``bytes``, ``bytearray``, ``memoryview``...) as binary, taking
+    its chunks without copying it. See `compress_file` for the rest of the
+    <options>.
+    """
+    content = data if isinstance(data, str) else memoryview(data).cast("B")  # type: Union[str, memoryview]
+    settings = CompressOptions(**options)._replace(binary=isinstance(content, memoryview))
+    target = io.BytesIO()
+    _compress(partial(MemoryStream, content), target, len(content), settings)
+    return target.getvalue()
+
+
+def compress_stream(source: IO, dest: IO, **options: Any) -> None:
+    """
+    Compress the content of the opened file object <source>, from its
+    current position, writing it on the (binary) file object <dest>.
+
+    The content is compressed as text if <source> is opened in text mode,
+    and as binary otherwise. Unless a shared `table` is given, <source> is
+    read twice, so it must be seekable (and it's left at the position it
+    had). The `dest` has to support ``tell``
+    (and ``seek``, with a shared `table`). See `compress_file` for the rest
+    of the <options>.
+    """
+    settings = CompressOptions(**options)._replace(binary=not isinstance(source, io.TextIOBase))
+    _compress(partial(StreamFile, source), dest, _remaining_size(source), settings)
+
+
+def _remaining_size(source: IO) -> int:
+    """Size of what's left to read of <source>, if it can be known."""
+    if not source.seekable():
+        return 0
+    position = source.tell()
+    end = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return max(end - position, 0)
+
+
+def _compress(
+    open_stream: Callable[[int], Any],
+    target: IO,
+    size: int,
+    options: CompressOptions,
+    ascii_stream: Optional[Callable[[int], Any]] = None,
+) -> None:
     """
-    with open_text_file(filename, "r") as source:
-        freqs = process_frequencies(source.read())
+    Compress the content streamed by <open_stream> (called with the size of
+    the chunks) on <target>.
+
+    :param size:         The size of the content (or an estimate), for
+                         choosing the size of the blocks.
+    :param ascii_stream: Like <open_stream>, streaming the bytes of the
+                         text, which are used instead if they turn out to
+                         be plain ASCII while counting them.
+    """
+    with stats.timed("compress"):
+        stats.count("bytes_in", size)
+        if options.table is not None:
+            if options.adaptive:
+                raise ValueError("A shared table can't be used with adaptive tables")
+            if options.table.binary != options.binary:
+                raise ValueError(f"The table is for {'binary' if options.table.binary else 'text'} content")
+            tables = options.table  # type: Tables
+            checksum = None  # type: Optional[int]
+        elif options.adaptive:
+            block_size = options.block_size or auto_block_size(size, options.jobs)
+            options = options._replace(block_size=block_size)
+            with stats.timed("plan"):
+                tables, checksum = plan_tables(open_stream, block_size, options.binary, options.max_code_length)
+        else:
+            tables, checksum, open_stream = _counted_table(open_stream, options, ascii_stream)
+            size = checksum
+        block_size = options.block_size or auto_block_size(size, options.jobs)
+        with open_stream(block_size) as source:
+            write_compressed(source, target, tables, checksum, options._replace(block_size=block_size))
+
+
+def _counted_table(
+    open_stream: Callable[[int], Any], options: CompressOptions, ascii_stream: Optional[Callable[[int], Any]]
+) -> Tuple[dict, int, Callable[[int], Any]]:
+    """
+    The table built from the frequencies of the characters streamed by
+    <open_stream> (see `_compress`), their number (the checksum), and the
+    function streaming them for encoding: <ascii_stream>, if the content
+    turned out to be plain ASCII.
+    """
+    chunk_size = READ_SIZE if options.max_memory is None else max(1, options.max_memory // MAX_CHAR_SIZE)
+    with stats.timed("frequencies"):
+        freqs = None
+        if ascii_stream is not None:
+            with ascii_stream(chunk_size) as source:
+                freqs = plain_ascii_frequencies(source)
+            open_stream = open_stream if freqs is None else ascii_stream
+        if freqs is None:
+            with open_stream(chunk_size) as source:
+                freqs = process_stream_frequencies(source)
 
     checksum = sum(c.freq for c in freqs)  # bytes
-    tree_code = create_tree_code(freqs)
-    table = parse_tree_code(tree_code)
-    save_compressed_file(filename, table, checksum, dest_file)
+    with stats.timed("codes"):
+        lengths = memoized_code_lengths(freqs) if freqs else {}
+        if options.max_code_length is not None and max(lengths.values(), default=0) > options.max_code_length:
+            lengths = _limit_code_lengths(freqs, lengths, options.max_code_length)
+    if stats.enabled():
+        stats.code_statistics({node.value: node.freq for node in freqs}, lengths)
+    return canonical_codes(lengths), checksum, open_stream
+
+
+def decompress(
+    blob: Union[bytes, memoryview], jobs: Optional[int] = 1, table: Optional[SharedTable] = None
+) -> Union[str, bytes]:
+    """
+    Extract the compressed content of <blob> (as returned by `compress`, or
+    written by `compress_file`).
+
+    :param blob:  The compressed content.
+    :param jobs:  Number of processes decoding the blocks in parallel.
+    :param table: The shared table, for content compressed with one.
+    :return: The original content: ``str``, or ``bytes`` if it was
+             compressed as binary.
+    """
+    decoders, blocks = decoded_blocks(io.BytesIO(blob), jobs, table)
+    return decoders.join(blocks)
+
+
+def decompress_stream(
+    source: IO, dest: IO, jobs: Optional[int] = 1, table: Optional[SharedTable] = None
+) -> None:
+    """
+    Extract the compressed content read from the (binary) file object
+    <source>, writing it on <dest>, as each block is decoded. The <dest>
+    has to be opened in binary mode for content compressed as binary, and
+    in text mode otherwise (checked before writing anything, for the file
+    objects of ``io``).
+
+    With more than one of `jobs`, <source> must be seekable.
+    """
+    decoders, blocks = decoded_blocks(source, jobs, table)
+    text_dest = isinstance(dest, io.TextIOBase)
+    if (text_dest or isinstance(dest, (io.RawIOBase, io.BufferedIOBase))) and text_dest == decoders.binary:
+        kind = "binary" if decoders.binary else "text"
+        raise TypeError(f"The content was compressed as {kind}, and has to be written in {kind} mode")
+    for block in blocks:
+        dest.write(block)
+
+
+def _limit_code_lengths(freqs: list, lengths: dict, max_code_length: int) -> dict:
+    """Replace the code <lengths> by the optimal ones up to <max_code_length>
+    bits, and report the increase in size it produces.
+    """
+    limited = limited_code_lengths(freqs, max_code_length)
+    optimal_size, limited_size = encoded_size(freqs, lengths), encoded_size(freqs, limited)
+    logger.info(
+        "Codes limited to %d bits (from %d): %d bits instead of %d (%.3f%% larger)",
+        max_code_length,
+        max(lengths.values()),
+        limited_size,
+        optimal_size,
+        100 * (limited_size - optimal_size) / optimal_size,
+    )
+    return limited
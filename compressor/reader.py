@@ -0,0 +1,179 @@
+"""compressor.reader
+
+Random access to the original content of a compressed file, without
+extracting it.
+
+The compressed file is mapped in memory, and its metadata is read once. The
+blocks are located with the index on its trailer (or by scanning their
+headers, if it has none), and decoded only when some of their content is
+read. The last decoded blocks are kept on a small cache, so reading forward,
+or around the same position, decodes each block once::
+
+    >>> with CompressedFileReader("huge.log.comp") as reader:
+    ...     reader.seek(1_000_000)
+    ...     reader.read(80)
+    ...     reader[-80:]
+    ...     for line in reader:
+    ...         ...
+"""
+import io
+import mmap
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Union
+
+from compressor.constants import FLAG_STREAM, READER_CACHE_BLOCKS
+from compressor.container import SharedTable
+from compressor.core import _block_index, _decode_block, _read_block, _retrieve_metadata
+from compressor.decoder import Content
+
+
+class CompressedFileReader:
+    """File-like (read-only) access to the original content of a compressed
+    file, decoding its blocks on demand.
+
+    Positions, and sizes, are in characters (or bytes, for files compressed
+    as binary). Slicing the reader returns that part of the content,
+    regardless of the current position.
+    """
+
+    def __init__(
+        self, filename: str, table: Optional[SharedTable] = None, cache_size: int = READER_CACHE_BLOCKS
+    ) -> None:
+        """
+        :param filename:   Path to the compressed file.
+        :param table:      The shared table, for files compressed with one.
+        :param cache_size: Number of decoded blocks to keep.
+        """
+        self.cache_size = cache_size
+        # kept open along with the reader, until it's closed
+        self._file = open(filename, "rb")  # pylint: disable=consider-using-with
+        try:
+            header, self._decoders = _retrieve_metadata(self._file, table)
+            if header.flags & FLAG_STREAM:
+                raise ValueError("Streamed content can't be read by random access")
+            self._index = _block_index(self._file, header)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._position = 0
+        self._cache = OrderedDict()  # type: OrderedDict
+
+    @property
+    def binary(self) -> bool:
+        """Whether the content is ``bytes`` (or ``str``)."""
+        return self._decoders.binary
+
+    @property
+    def closed(self) -> bool:
+        """Whether the reader is closed."""
+        return self._file.closed
+
+    def __len__(self) -> int:
+        return self._index.length
+
+    def __enter__(self) -> "CompressedFileReader":
+        return self
+
+    def __exit__(self, ex_type, ex_value, ex_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the mapping, and the file."""
+        if not self.closed:
+            self._map.close()
+            self._file.close()
+            self._cache.clear()
+
+    def readable(self) -> bool:
+        """Always True: the content can be read."""
+        return True
+
+    def seekable(self) -> bool:
+        """Always True: any position can be read."""
+        return True
+
+    def tell(self) -> int:
+        """The current position."""
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move to the position <offset> (relative to <whence>), and return it."""
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self)}[whence]
+        if base + offset < 0:
+            raise ValueError(f"Negative position: {base + offset}")
+        self._position = base + offset
+        return self._position
+
+    def read(self, size: Optional[int] = -1) -> Content:
+        """Read up to <size> characters (all the rest, if negative or None)
+        from the current position.
+        """
+        end = len(self) if size is None or size < 0 else self._position + size
+        content = self._content(self._position, end)
+        self._position += len(content)
+        return content
+
+    def readline(self) -> Content:
+        """Read until the end of the line (included), or of the content."""
+        newline = b"\n" if self.binary else "\n"
+        pieces = []  # type: List[Content]
+        while self._position < len(self):
+            number = self._index.find(self._position)
+            offset = self._position - self._index.positions[number]
+            block = self._block(number)
+            end = block.find(newline, offset)  # type: ignore
+            piece = block[offset : end + 1] if end >= 0 else block[offset:]
+            pieces.append(piece)
+            self._position += len(piece)
+            if end >= 0:
+                break
+        return self._decoders.join(pieces)
+
+    def __iter__(self) -> Iterator[Content]:
+        """The lines from the current position."""
+        return iter(self.readline, self._decoders.empty)
+
+    def __getitem__(self, key: Union[int, slice]) -> Content:
+        if isinstance(key, slice):
+            positions = range(*key.indices(len(self)))
+            if not positions:
+                return self._decoders.empty
+            if positions.step == 1:
+                return self._content(positions.start, positions.stop)
+            # decode the span covering the positions only, and step over it
+            low, high = min(positions[0], positions[-1]), max(positions[0], positions[-1])
+            content = self._content(low, high + 1)
+            return content[positions[0] - low :: positions.step][: len(positions)]
+        position = key + len(self) if key < 0 else key
+        if not 0 <= position < len(self):
+            raise IndexError("Position out of range")
+        return self._content(position, position + 1)
+
+    def _content(self, start: int, end: int) -> Content:
+        """The original content between the positions <start> and <end>."""
+        end = min(end, len(self))
+        if start >= end:
+            return self._decoders.empty
+        first = self._index.find(start)
+        pieces = []  # type: List[Content]
+        for number in range(first, len(self._index)):
+            if self._index.positions[number] >= end:
+                break
+            pieces.append(self._block(number))
+        offset = start - self._index.positions[first]
+        return self._decoders.join(pieces)[offset : offset + end - start]
+
+    def _block(self, number: int) -> Content:
+        """The decoded content of the block <number>, from the cache if it's
+        on it.
+        """
+        if number in self._cache:
+            self._cache.move_to_end(number)
+            return self._cache[number]
+        binary_content, block_length = _read_block(self._map, self._index, number)
+        content = _decode_block(binary_content, self._decoders[number], block_length)
+        self._cache[number] = content
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return content
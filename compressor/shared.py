@@ -0,0 +1,90 @@
+"""compressor.shared
+
+Shared tables, trained once from a sample of files, for compressing many
+small (and similar) files without building a tree, or storing a table, for
+each one of them. The compressed files only keep the id of the table, and it
+has to be given for extracting them.
+
+Tables are saved on their own file, with the following layout::
+
+    [TABLE_MAGIC][version: B][flags: B][table id: Q][table (see save_table)]
+
+The id is taken from a hash of the table, so the same table always gets the
+same id, and a file can't be extracted with a different one.
+"""
+import hashlib
+import io
+from collections import Counter
+from typing import Iterable, Optional
+
+from compressor.constants import FLAG_BINARY, READ_SIZE, TABLE_FORMAT_VERSION, TABLE_MAGIC
+from compressor.container import SharedTable, canonical_codes, retrieve_table, save_table
+from compressor.core import count_file_symbols, counts_code_lengths
+from compressor.util import pack, unpack
+
+_HEADER_FORMAT = "BBQ"
+_HEADER_SIZE = 1 + 1 + 8
+
+
+def train_table(
+    filenames: Iterable[str],
+    dest_file: str,
+    binary: bool = False,
+    max_code_length: Optional[int] = None,
+) -> SharedTable:
+    """
+    Build a table from the frequencies of all the <filenames> together, and
+    save it on <dest_file>.
+
+    A file compressed with the table can only have characters that appear
+    on the training files. For binary tables, all the bytes are given a code
+    (the ones not seen, the longest), so any file can be compressed.
+
+    :param filenames:       The sample of files to train the table with.
+    :param dest_file:       Path of the table file to create.
+    :param binary:          Count the bytes of the files, instead of the
+                            characters of their text.
+    :param max_code_length: Maximum length (in bits) of the codes.
+    :return: The trained table.
+    """
+    counts = Counter()  # type: Counter
+    for filename in filenames:
+        count_file_symbols(filename, READ_SIZE, binary, counts)
+    if binary:
+        counts.update(range(256))
+    if not counts:
+        raise ValueError("No content to train the table with")
+
+    table = canonical_codes(counts_code_lengths(counts, max_code_length))
+
+    shared = SharedTable(_table_id(table, binary), table, binary)
+    save_shared_table(dest_file, shared)
+    return shared
+
+
+def _table_id(table: dict, binary: bool) -> int:
+    """Id of the <table>: the first 8 bytes of the hash of its content."""
+    content = io.BytesIO()
+    content.write(pack("B", FLAG_BINARY if binary else 0))
+    save_table(content, table, binary)
+    return int.from_bytes(hashlib.sha256(content.getvalue()).digest()[:8], "big")
+
+
+def save_shared_table(dest_file: str, shared: SharedTable) -> None:
+    """Write the <shared> table on its own file, at <dest_file>."""
+    with open(dest_file, "wb") as target:
+        target.write(TABLE_MAGIC)
+        target.write(pack(_HEADER_FORMAT, TABLE_FORMAT_VERSION, FLAG_BINARY if shared.binary else 0, shared.table_id))
+        save_table(target, shared.table, shared.binary)
+
+
+def load_table(filename: str) -> SharedTable:
+    """Read the table saved on <filename> by `train_table`."""
+    with open(filename, "rb") as source:
+        if source.read(len(TABLE_MAGIC)) != TABLE_MAGIC:
+            raise ValueError(f"{filename} is not a table file")
+        version, flags, table_id = unpack(_HEADER_FORMAT, source.read(_HEADER_SIZE))
+        if version > TABLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported table version: {version}")
+        binary = bool(flags & FLAG_BINARY)
+        return SharedTable(table_id, retrieve_table(source, binary), binary)
@@ -0,0 +1,231 @@
+"""compressor.stats
+
+Instrumentation of the stages of compression and extraction: the time (wall
+and CPU) spent on each one, and counters like the bytes in and out, the
+blocks, or the mean length of the codes (versus the entropy of the content).
+
+The measures are sent to the registered observers. While there are none,
+the hooks do nothing, besides checking it, so the instrumentation costs
+(almost) nothing when it's off::
+
+    >>> with collect_stats() as stats:
+    ...     compress_file("app.log")
+    >>> print(stats.to_json())
+
+Custom observers (for exporting the measures as they are taken) subclass
+``Observer``, and are registered with ``add_observer``.
+
+The observers are registered on the current context (see ``contextvars``),
+so they only see the operations run on it: those of the same thread, or of
+the same ``asyncio`` task (and of the executor calls of ``compressor.aio``,
+which run on a copy of it). Operations run concurrently on other tasks, or
+other threads, don't mix their measures with them.
+
+The stages are nested: ``compress`` and ``extract`` cover a whole file, and
+the time of ``read`` and ``write`` is included in ``encode``, as well as the
+one of reading the blocks in ``decode``. The CPU time only counts the
+current process (not the workers, with more than one of `jobs`).
+"""
+import json
+import math
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, Mapping, Optional, Tuple, TypeVar
+
+try:
+    import resource
+except ImportError:  # pragma: nocover
+    resource = None  # type: ignore
+
+T = TypeVar("T")
+
+# a tuple, so the copies of the context don't share changes to it
+_observers = ContextVar("observers", default=())  # type: ContextVar[Tuple[Observer, ...]]
+_DISABLED = nullcontext()
+_DONE = object()
+
+
+class Observer:
+    """Receives the measures, as they are taken. The methods do nothing, so
+    subclasses only override the ones they need.
+    """
+
+    def stage(self, name: str, wall: float, cpu: float) -> None:
+        """The stage <name> took <wall> seconds (and <cpu> seconds of CPU)."""
+
+    def count(self, name: str, value: float) -> None:
+        """Add <value> to the counter <name>."""
+
+    def merge(self, measures: Mapping[str, Any]) -> None:
+        """Add the <measures> taken elsewhere, like on another process (as
+        returned by ``Stats.as_dict``).
+        """
+        for name, stage in measures["stages"].items():
+            self.stage(name, stage["wall"], stage["cpu"])
+        for name, value in measures["counters"].items():
+            self.count(name, value)
+
+
+def add_observer(observer: Observer) -> None:
+    """Send the measures (taken on the current context) to the <observer>,
+    from now on.
+    """
+    _observers.set(_observers.get() + (observer,))
+
+
+def remove_observer(observer: Observer) -> None:
+    """Stop sending the measures to the <observer>."""
+    observers = list(_observers.get())
+    observers.remove(observer)
+    _observers.set(tuple(observers))
+
+
+def enabled() -> bool:
+    """Whether there is someone observing the measures (for skipping the
+    ones that cost something to take).
+    """
+    return bool(_observers.get())
+
+
+class _Timer:
+    """Context manager measuring the time of a stage."""
+
+    __slots__ = ("name", "wall", "cpu")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.wall = self.cpu = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, ex_type, ex_value, ex_tb) -> None:
+        wall, cpu = time.perf_counter() - self.wall, time.process_time() - self.cpu
+        for observer in _observers.get():
+            observer.stage(self.name, wall, cpu)
+
+
+def timed(name: str) -> Any:
+    """Context manager measuring the stage <name> (or doing nothing, if no
+    one is observing).
+    """
+    return _Timer(name) if _observers.get() else _DISABLED
+
+
+def count(name: str, value: float = 1) -> None:
+    """Add <value> to the counter <name>."""
+    for observer in _observers.get():
+        observer.count(name, value)
+
+
+def merge(measures: Mapping[str, Any]) -> None:
+    """Add the <measures> taken elsewhere (see ``Observer.merge``)."""
+    for observer in _observers.get():
+        observer.merge(measures)
+
+
+def timed_iter(name: str, iterable: Iterable[T]) -> Generator[T, None, None]:
+    """Pass along the items of <iterable>, measuring the time taken by
+    producing them as the stage <name>.
+    """
+    iterator = iter(iterable)
+    while True:
+        with _Timer(name):
+            item = next(iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item  # type: ignore
+
+
+def timed_calls(name: str, function: Callable[..., T]) -> Callable[..., T]:
+    """The <function>, measuring each call to it as the stage <name>."""
+
+    def measured(*args: Any) -> T:
+        with _Timer(name):
+            return function(*args)
+
+    return measured
+
+
+def code_statistics(counts: Mapping[Any, int], lengths: Mapping[Any, int]) -> None:
+    """
+    Count the symbols with <counts>, the bits of their codes (of <lengths>),
+    and their entropy (the lower bound for those bits).
+    """
+    total = sum(counts.values())
+    count("symbols", total)
+    count("code_bits", sum(freq * lengths[symbol] for symbol, freq in counts.items()))
+    count("entropy_bits", sum(freq * math.log2(total / freq) for freq in counts.values() if freq))
+
+
+def peak_memory() -> Optional[int]:
+    """Peak of resident memory (in bytes) of this process, or of the largest
+    of its (finished) child processes. None if it can't be known.
+    """
+    if resource is None:  # pragma: nocover
+        return None
+    peak = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+    return peak if sys.platform == "darwin" else peak * 1024  # kilobytes, on Linux
+
+
+class Stats(Observer):
+    """Observer adding up the measures of each stage, and the counters."""
+
+    def __init__(self) -> None:
+        self.stages = {}  # type: Dict[str, Dict[str, float]]
+        # a Counter, though its values aren't all int (like the entropy)
+        self.counters = Counter()  # type: Dict[str, Any]
+
+    def stage(self, name: str, wall: float, cpu: float) -> None:
+        stage = self.stages.setdefault(name, _new_stage())
+        stage["wall"] += wall
+        stage["cpu"] += cpu
+        stage["calls"] += 1
+
+    def count(self, name: str, value: float) -> None:
+        self.counters[name] += value
+
+    def merge(self, measures: Mapping[str, Any]) -> None:
+        for name, stage in measures["stages"].items():
+            for key, value in stage.items():
+                self.stages.setdefault(name, _new_stage())[key] += value
+        self.counters.update(measures["counters"])
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The measures, along with the figures derived from them: the
+        compression ratio, the mean length of the codes, and the entropy (in
+        bits per symbol), and the peak of memory.
+        """
+        counters = self.counters
+        result = {"stages": self.stages, "counters": dict(counters)}  # type: Dict[str, Any]
+        if counters["bytes_in"]:
+            result["ratio"] = counters["bytes_out"] / counters["bytes_in"]
+        if counters["symbols"]:
+            result["mean_code_length"] = counters["code_bits"] / counters["symbols"]
+            result["entropy"] = counters["entropy_bits"] / counters["symbols"]
+        result["peak_memory"] = peak_memory()
+        return result
+
+    def to_json(self) -> str:
+        """The measures (see `as_dict`), as JSON."""
+        return json.dumps(self.as_dict(), sort_keys=True)
+
+
+def _new_stage() -> Dict[str, float]:
+    """The measures of a stage not measured yet (its calls are an int)."""
+    return {"wall": 0.0, "cpu": 0.0, "calls": 0}
+
+
+@contextmanager
+def collect_stats() -> Iterator[Stats]:
+    """Collect the measures taken within the context on a ``Stats``."""
+    stats = Stats()
+    add_observer(stats)
+    try:
+        yield stats
+    finally:
+        remove_observer(stats)
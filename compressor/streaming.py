@@ -0,0 +1,286 @@
+"""compressor.streaming
+
+Incremental compression, for content that arrives over time (like the data
+read from a socket, or the tail of a log), whose length is not known
+beforehand.
+
+The streamed content starts with the header of a compressed file (flagged
+with ``FLAG_STREAM``, and without checksum), followed by records with the
+layout of the blocks::
+
+    [size: I][length: I][content]   a block, encoded with the current table
+    [0: I][STREAM_TABLE: I][table]  the table for the blocks after it
+    [0: I][STREAM_END: I]           the end of the stream
+
+Unless a shared table is given, the first table is built from a sample of
+the content. When a block has a character without a code on the table, a new
+one is built from the frequencies of all the content seen so far.
+
+The buffers are bounded: the compressor keeps the sample (or less than a
+block) pending, and the decompressor, at most an incomplete record.
+"""
+import io
+from collections import Counter
+from typing import List, Optional, Union, cast
+
+from compressor.constants import (
+    FLAG_BINARY,
+    FLAG_SHARED_TABLE,
+    FLAG_STREAM,
+    MAGIC,
+    STREAM_BLOCK_SIZE,
+    STREAM_SAMPLE_SIZE,
+)
+from compressor.container import (
+    STREAM_END,
+    STREAM_TABLE,
+    SharedTable,
+    _save_header,
+    canonical_codes,
+    retrieve_table,
+    save_table,
+)
+from compressor.core import (
+    _checked_symbols,
+    _decode_block,
+    _decoding_table,
+    _retrieve_metadata,
+    block_encoder,
+    count_symbols,
+    counts_code_lengths,
+    encoding_codes,
+)
+from compressor.decoder import BlockDecoders, Content
+from compressor.util import pack, unpack
+
+_HEADER_SIZE = len(MAGIC) + 1 + 1 + 8 + 4  # magic, version, flags, checksum, block size
+_RECORD_SIZE = 8
+_FLAGS_OFFSET = len(MAGIC) + 1
+
+
+class Compressor:  # pylint: disable=too-many-instance-attributes
+    """Compress content given by chunks, as it arrives.
+
+    >>> compressor = Compressor()
+    >>> for chunk in source:
+    ...     output.write(compressor.compress(chunk))
+    >>> output.write(compressor.flush())
+
+    The output can be extracted like a compressed file (``extract_file``, or
+    ``decompress``), or incrementally with a ``Decompressor``.
+    """
+
+    def __init__(
+        self,
+        binary: bool = False,
+        table: Optional[SharedTable] = None,
+        block_size: int = STREAM_BLOCK_SIZE,
+        sample_size: int = STREAM_SAMPLE_SIZE,
+        max_code_length: Optional[int] = None,
+    ) -> None:
+        """
+        :param binary:          The chunks are ``bytes`` (or ``bytearray``,
+                                ``memoryview``...), instead of ``str``.
+        :param table:           A shared table to encode all the content
+                                with, instead of sampling it.
+        :param block_size:      Characters (or bytes) on each block.
+        :param sample_size:     Characters (or bytes) to buffer before
+                                building the first table.
+        :param max_code_length: Maximum length (in bits) of the codes.
+        """
+        if table is not None and table.binary != binary:
+            raise ValueError(f"The table is for {'binary' if table.binary else 'text'} content")
+        self.binary = binary
+        self.block_size = block_size
+        self.sample_size = sample_size
+        self.max_code_length = max_code_length
+        self.finished = False
+        self._shared = table
+        self._table = table.table if table is not None else None  # type: Optional[dict]
+        self._encoder = block_encoder(encoding_codes(self._table)) if self._table is not None else None
+        self._counts = Counter()  # type: Counter
+        self._pending = []  # type: List[Content]
+        self._pending_length = 0
+
+        header = io.BytesIO()
+        flags = FLAG_STREAM | (FLAG_BINARY if binary else 0) | (FLAG_SHARED_TABLE if table is not None else 0)
+        _save_header(header, 0, flags, block_size)
+        if table is not None:
+            header.write(pack("Q", table.table_id))
+        self._header = header.getvalue()
+
+    def compress(self, chunk: Union[str, bytes, memoryview]) -> bytes:
+        """
+        Add the <chunk> to the content, and return the compressed output
+        available so far (the whole blocks). The rest is kept pending until
+        more content arrives, or the stream is flushed.
+        """
+        if self.finished:
+            raise ValueError("The stream is already finished")
+        if isinstance(chunk, str) == self.binary:
+            raise TypeError(f"Expected {'a bytes-like object' if self.binary else 'str'}, not {type(chunk).__name__}")
+        if not chunk:
+            return self._output([])
+        chunk = chunk if isinstance(chunk, (str, bytes)) else bytes(chunk)
+        if self._shared is None:
+            count_symbols([chunk], self._counts)
+        self._pending.append(chunk)
+        self._pending_length += len(chunk)
+
+        if self._table is None and self._pending_length < self.sample_size:
+            return self._output([])
+        return self._output(self._encode_pending(final=False))
+
+    def flush(self, finish: bool = True) -> bytes:
+        """
+        Compress all the pending content, and return the output.
+
+        :param finish: End the stream. Otherwise, more content can be
+                       compressed afterwards (the pending content is
+                       encoded as a shorter block).
+        """
+        if self.finished:
+            raise ValueError("The stream is already finished")
+        records = self._encode_pending(final=True)
+        if finish:
+            records.append(pack("II", 0, STREAM_END))
+            self.finished = True
+        return self._output(records)
+
+    def _output(self, records: List[bytes]) -> bytes:
+        """The <records>, preceded by the header if it wasn't returned yet."""
+        if self._header:
+            records.insert(0, self._header)
+            self._header = b""
+        return b"".join(records)
+
+    def _encode_pending(self, final: bool) -> List[bytes]:
+        """Records for the whole blocks of the pending content (and the rest
+        of it, if it's the `final` part).
+        """
+        if self.binary:
+            content = b"".join(cast(List[bytes], self._pending))  # type: Content
+        else:
+            content = "".join(cast(List[str], self._pending))
+        whole = len(content) if final else len(content) - len(content) % self.block_size
+        blocks = [content[start : start + self.block_size] for start in range(0, whole, self.block_size)]
+        rest = content[whole:]
+        self._pending, self._pending_length = ([rest] if rest else []), len(rest)
+
+        if self._shared is not None:
+            return [self._encoder(block) for block in _checked_symbols(blocks, self._table)]  # type: ignore
+        records = []  # type: List[bytes]
+        for block in blocks:
+            if self._table is None or not set(block).issubset(self._table):
+                records.append(self._new_table())
+            records.append(self._encoder(block))  # type: ignore
+        return records
+
+    def _new_table(self) -> bytes:
+        """Build the table from the frequencies seen so far, and return its
+        record.
+        """
+        self._table = canonical_codes(counts_code_lengths(self._counts, self.max_code_length))
+        self._encoder = block_encoder(encoding_codes(self._table))
+        record = io.BytesIO()
+        record.write(pack("II", 0, STREAM_TABLE))
+        save_table(record, self._table, self.binary)
+        return record.getvalue()
+
+
+class Decompressor:  # pylint: disable=too-few-public-methods
+    """Extract streamed content (as produced by ``Compressor``), given by
+    chunks, as it arrives.
+
+    >>> decompressor = Decompressor()
+    >>> for chunk in source:
+    ...     output.write(decompressor.decompress(chunk))
+    >>> assert decompressor.eof
+
+    The output is always ``str`` (or always ``bytes``, with `binary`), even
+    before the header of the stream is complete.
+    """
+
+    def __init__(self, table: Optional[SharedTable] = None, binary: bool = False) -> None:
+        """
+        :param table:  The shared table the content was compressed with (if
+                       it was).
+        :param binary: The content was compressed as binary, so it's
+                       extracted as ``bytes``, instead of ``str``.
+        """
+        if table is not None and table.binary != binary:
+            raise ValueError(f"The table is for {'binary' if table.binary else 'text'} content")
+        self.binary = binary
+        self.eof = False
+        self.unused_data = b""
+        self._table = table
+        self._buffer = bytearray()
+        self._decoders = None  # type: Optional[BlockDecoders]
+
+    def decompress(self, data: Union[bytes, memoryview]) -> Content:
+        """
+        Add <data> to the compressed content, and return the content of the
+        blocks completed with it (empty until the header is read).
+        Data after the end of the stream is kept on ``unused_data``.
+
+        :raise ValueError: if the content is not streamed, or it was not
+                           compressed as `binary` (or text) as expected.
+        """
+        empty = b"" if self.binary else ""  # type: Content
+        if self.eof:
+            self.unused_data += bytes(data)
+            return empty
+        self._buffer += data
+        if self._decoders is None and not self._read_header():
+            return empty
+        return self._decoders.join(self._read_records())  # type: ignore
+
+    def _read_header(self) -> bool:
+        """Read the header from the buffer, if it's complete."""
+        if len(self._buffer) < _HEADER_SIZE:
+            return False
+        if not self._buffer.startswith(MAGIC) or not self._buffer[_FLAGS_OFFSET] & FLAG_STREAM:
+            raise ValueError("Not streamed content")
+        header_size = _HEADER_SIZE + (8 if self._buffer[_FLAGS_OFFSET] & FLAG_SHARED_TABLE else 0)
+        if len(self._buffer) < header_size:
+            return False
+        _, decoders = _retrieve_metadata(io.BytesIO(self._buffer[:header_size]), self._table)
+        if decoders.binary != self.binary:
+            raise ValueError(f"The content was compressed as {'binary' if decoders.binary else 'text'}")
+        self._decoders = decoders
+        del self._buffer[:header_size]
+        return True
+
+    def _read_records(self) -> List[Content]:
+        """Decode the complete records on the buffer."""
+        buffer, position = self._buffer, 0
+        pieces = []  # type: List[Content]
+        while len(buffer) - position >= _RECORD_SIZE:
+            start = position + _RECORD_SIZE
+            block_size, block_length = unpack("II", buffer[position:start])
+            if block_size:
+                if len(buffer) - start < block_size:
+                    break
+                decoder = self._decoders[0]  # type: ignore
+                pieces.append(_decode_block(bytes(buffer[start : start + block_size]), decoder, block_length))
+                position = start + block_size
+            elif block_length == STREAM_TABLE:
+                if len(buffer) - start < 8:
+                    break
+                count, chars_size = unpack("II", buffer[start : start + 8])
+                end = start + 8 + chars_size + count
+                if len(buffer) < end:
+                    break
+                binary = self._decoders.binary  # type: ignore
+                table = retrieve_table(io.BytesIO(buffer[start:end]), binary)
+                self._decoders = BlockDecoders([_decoding_table(table)], binary=binary)
+                position = end
+            elif block_length == STREAM_END:
+                self.eof = True
+                self.unused_data = bytes(buffer[start:])
+                position = len(buffer)
+                break
+            else:
+                raise ValueError(f"Invalid record on the stream: {block_length}")
+        del buffer[:position]
+        return pieces
@@ -1,13 +1,15 @@
 """Utilities and functions used throughout the application"""
+import mmap
 import os
 import struct
 import sys
 from functools import singledispatch, wraps, partial
-from typing import Callable, Union, overload
+from typing import IO, Callable, Iterator, Optional, Union, overload
 
 from compressor.constants import ENC
 
 _DEFAULT_ENCODING = "UTF-8"
+_SIZE_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
 
 
 def default_filename(filename: str, suffix: str = "comp") -> str:
@@ -19,6 +21,23 @@ def default_filename(filename: str, suffix: str = "comp") -> str:
     return f"{basename}.{suffix}"
 
 
+def parse_size(size: str) -> int:
+    """Number of bytes represented by <size>, which can have one of the
+    K, M, or G suffixes (powers of 1024). For example::
+
+        >>> parse_size("64M")
+        67108864
+    """
+    size = size.strip().upper().rstrip("B")
+    multiplier = _SIZE_UNITS.get(size[-1:], 1)
+    if multiplier != 1:
+        size = size[:-1]
+    value = int(size) * multiplier
+    if value <= 0:
+        raise ValueError(f"Invalid size: {size!r}")
+    return value
+
+
 def endianess_prefix(parm_type=str) -> Union[str, bytes]:
     """
     Return the prefix to be used in struct.{pack,unpack} according
@@ -70,6 +89,14 @@ def pack(code, *args):
     return struct.pack(code, *args)
 
 
+@patched_struct
+def pack_into(code, *args):
+    """Original struct.pack_into with the decorator applied.
+    Will change the code according to the system's architecture.
+    """
+    return struct.pack_into(code, *args)
+
+
 @patched_struct
 def unpack(code, *args):
     """Original struct.unpack with the decorator applied.
@@ -116,24 +143,41 @@ def _(str_hex):  # type: ignore
 class StreamFile:
     """Read a file by chunks, streaming each one at the time
 
-    Use as a context manager and iterable object.
+    Use as a context manager and iterable object. The chunks are ``str``,
+    unless the file is opened as ``binary``.
 
     >>> with StreamFile("some file", 1000) as source:
     ...     for buffer in source:
     ...         do_something_with(buffer)
+
+    Instead of its name, an already opened file can be given, in which case
+    it's read from its current position, and not closed at the end (the
+    chunks are of the type it returns, so ``binary`` doesn't apply). If it's
+    seekable, its position is restored afterwards, so it can be streamed
+    again.
     """
 
-    def __init__(self, filename: str, chunk_size: int) -> None:
+    def __init__(self, filename: Union[str, IO], chunk_size: int, binary: bool = False) -> None:
         self.filename = filename
         self.chunk_size = chunk_size
+        self.binary = binary
         self._data_source = None
+        self._opened = isinstance(filename, (str, bytes, os.PathLike))
+        self._start = None  # type: Optional[int]
 
     def __enter__(self):
-        self._data_source = open_text_file(self.filename)
+        if self._opened:
+            self._data_source = open(self.filename, "rb") if self.binary else open_text_file(self.filename)
+        else:
+            self._data_source = self.filename
+            self._start = self._data_source.tell() if self._data_source.seekable() else None
         return self
 
     def __exit__(self, ex_type, ex_value, ex_tb):
-        self._data_source.close()
+        if self._opened:
+            self._data_source.close()
+        elif self._start is not None:
+            self._data_source.seek(self._start)
 
     def __iter__(self):
         return self
@@ -145,4 +189,64 @@ class StreamFile:
         return data
 
 
+class MappedFile:
+    """Like ``StreamFile`` (in binary mode), mapping the file in memory, so
+    the chunks are ``memoryview`` slices of it, read straight from the page
+    cache without copying them.
+
+    >>> with MappedFile("some file", 1000) as source:
+    ...     for buffer in source:
+    ...         do_something_with(buffer)
+    """
+
+    def __init__(self, filename: str, chunk_size: int) -> None:
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self._file = None  # type: Optional[IO]
+        self._map = None  # type: Optional[mmap.mmap]
+        self._view = memoryview(b"")
+
+    def __enter__(self):
+        self._file = open(self.filename, "rb")
+        if os.fstat(self._file.fileno()).st_size:  # empty files can't be mapped
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+        return self
+
+    def __exit__(self, ex_type, ex_value, ex_tb):
+        self._view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:  # chunks still referenced: unmapped once they are gone
+                pass
+        self._file.close()  # type: ignore
+
+    def __iter__(self) -> Iterator[memoryview]:
+        view = self._view
+        for start in range(0, len(view), self.chunk_size):
+            yield view[start : start + self.chunk_size]
+
+
+class MemoryStream:
+    """Like ``StreamFile``, for content already in memory: a ``str``, or
+    ``bytes`` (or a ``memoryview`` of them, so the chunks are taken without
+    copying the data).
+    """
+
+    def __init__(self, data: Union[str, bytes, memoryview], chunk_size: int) -> None:
+        self.data = data
+        self.chunk_size = chunk_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, ex_type, ex_value, ex_tb):
+        pass
+
+    def __iter__(self) -> Iterator[Union[str, bytes, memoryview]]:
+        for start in range(0, len(self.data), self.chunk_size):
+            yield self.data[start : start + self.chunk_size]
+
+
 open_text_file = partial(open, encoding=_DEFAULT_ENCODING)
@@ -0,0 +1,165 @@
+"""compressor.vectorized
+
+Optional backend for counting the frequencies, and encoding the blocks, with
+NumPy (when it's installed), operating on whole chunks at once instead of
+iterating over their characters.
+
+Characters are handled by their code points (a ``uint32`` view of the text
+encoded in UTF-32), and bytes as ``uint8``. The output is identical to the one
+of the pure-Python functions on ``compressor.core``.
+"""
+from typing import Dict, Optional, Tuple, Union
+
+from compressor.constants import BYTE
+from compressor.util import pack
+
+try:
+    import numpy as np
+except ImportError:  # pragma: nocover
+    np = None  # type: ignore
+
+AVAILABLE = np is not None
+_MAX_CODE_LENGTH = 63  # codes have to fit in an uint64
+_UTF32 = "utf-32-le"
+_WORD_BITS = 64
+_WORD_SHIFT = 6
+_SENTINEL = bytes([1 << BYTE - 1])  # the block of an empty chunk
+_DENSE_POINTS = 1 << 16  # highest code point looked up on dense arrays
+
+
+def _as_array(chunk: Union[str, bytes]) -> "np.ndarray":
+    """View the chunk as an array of its symbols (code points, or bytes)."""
+    if isinstance(chunk, str):
+        return np.frombuffer(chunk.encode(_UTF32), dtype="<u4")
+    return np.frombuffer(chunk, dtype=np.uint8)
+
+
+def count_symbols(chunk: Union[str, bytes]) -> Dict[Union[str, int], int]:
+    """
+    Frequency of each symbol (character, or byte) on the <chunk>, counted
+    with ``np.bincount`` (so symbols are listed by their value, which
+    doesn't change the code built from the frequencies).
+    """
+    symbols = _as_array(chunk)
+    counts = np.bincount(symbols)
+    present = np.flatnonzero(counts)
+    counts = counts[present].tolist()
+    if isinstance(chunk, str):
+        return dict(zip(map(chr, present.tolist()), counts))
+    return dict(zip(present.tolist(), counts))
+
+
+class VectorEncoder:
+    """Encode blocks with lookup arrays for the length of the code of each
+    symbol, and its value aligned to the left of an ``uint64``, sorted by
+    the symbols.
+
+    The symbols are looked up on dense arrays, indexed by code point, if
+    they are all below ``_DENSE_POINTS`` (built on first use, so they aren't
+    sent to the workers), or found with ``np.searchsorted`` otherwise (so
+    the arrays only take as much as the table, whatever its code points).
+
+    >>> encoder = VectorEncoder(encoding_codes(table))
+    >>> block = encoder.encode(chunk)  # same as encode_block(chunk, codes)
+    """
+
+    def __init__(self, codes: dict) -> None:
+        """
+        :param codes: Mapping of each symbol to its (value, length) code, as
+                      returned by ``compressor.core.encoding_codes``.
+        """
+        points = sorted((_code_point(symbol), code) for symbol, code in codes.items())
+        self.points = np.array([point for point, _ in points], dtype=np.uint32)
+        self.aligned = np.array(
+            [value << _WORD_BITS - length if length else 0 for _, (value, length) in points], dtype=np.uint64
+        )
+        self.lengths = np.array([length for _, (_, length) in points], dtype=np.int64)
+        self._dense = None  # type: Optional[Tuple[np.ndarray, np.ndarray]]
+
+    def __getstate__(self) -> dict:
+        return dict(self.__dict__, _dense=None)
+
+    @staticmethod
+    def supports(codes: dict) -> bool:
+        """Whether the codes can be handled by this encoder."""
+        return AVAILABLE and all(length <= _MAX_CODE_LENGTH for _, length in codes.values())
+
+    def encode(self, chunk: Union[str, bytes]) -> bytes:
+        """
+        Transform the <chunk> into a compressed block, with its header.
+
+        Consecutive codes are merged by pairs (the second one shifted after
+        the first one), as long as they fit in an ``uint64``, so there are
+        fewer of them. Then the offset of each one (after the sentinel bit)
+        is the cumulative sum of the lengths before it: its bits go to the
+        64-bit word of the offset, shifted to their place, and the ones that
+        don't fit to the next word. Codes don't overlap, so adding them up
+        on the words (with ``np.add.at``) joins their bits. There's no loop
+        over the symbols, nor over the bits.
+        """
+        if not chunk:
+            return pack("II", 1, 0) + _SENTINEL
+        aligned, lengths = self._codes(chunk)
+        longest = int(lengths.max())
+        while lengths.size > 1 and 2 * longest <= _WORD_BITS:
+            if lengths.size % 2:
+                aligned, lengths = np.append(aligned, np.uint64(0)), np.append(lengths, 0)
+            firsts = lengths[0::2]
+            aligned = aligned[0::2] | aligned[1::2] >> firsts.astype(np.uint64)
+            lengths = firsts + lengths[1::2]
+            longest = int(lengths.max())
+
+        ends = np.cumsum(lengths)
+        ends += 1
+        starts = ends - lengths
+        total_bits = int(ends[-1])
+        shifts = (starts & _WORD_BITS - 1).astype(np.uint64)
+        word = starts >> _WORD_SHIFT
+        words = np.zeros(total_bits // _WORD_BITS + 2, dtype=np.uint64)
+        np.add.at(words, word, aligned >> shifts)
+        np.add.at(words, word + 1, aligned << np.uint64(_WORD_BITS) - shifts)
+        words[0] |= np.uint64(1 << _WORD_BITS - 1)  # the sentinel bit
+
+        # 0-padded (a whole byte if already aligned)
+        block_length = total_bits // BYTE + 1
+        return pack("II", block_length, len(chunk)) + words.astype(">u8").tobytes()[:block_length]
+
+    def _codes(self, chunk: Union[str, bytes]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """The (left-aligned) code of each symbol of the <chunk>, and their
+        lengths.
+
+        :raise KeyError: for a symbol without code (like ``encode_block``).
+        """
+        symbols = _as_array(chunk)
+        if self.points[-1] < _DENSE_POINTS:
+            aligned, lengths = self._dense_codes()
+            # code points above the table, on its last position (bytes are all on it)
+            positions = np.minimum(symbols, lengths.size - 1) if isinstance(chunk, str) else symbols
+            lengths = lengths.take(positions)
+            if lengths.min() < 0:
+                raise KeyError(chunk[int(np.argmin(lengths))])
+            return aligned.take(positions), lengths
+
+        positions = np.searchsorted(self.points, symbols)
+        found = positions < self.points.size
+        found[found] = self.points[positions[found]] == symbols[found]
+        if not found.all():
+            raise KeyError(chunk[int(np.argmin(found))])
+        return self.aligned.take(positions), self.lengths.take(positions)
+
+    def _dense_codes(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """The codes, and their lengths, indexed by code point up to the
+        highest one on the table, plus one for the ones above it, and at
+        least for all the bytes (with a length of -1 for the ones without
+        code).
+        """
+        if self._dense is None:
+            size = max(int(self.points[-1]) + 2, 1 << BYTE)
+            aligned, lengths = np.zeros(size, dtype=np.uint64), np.full(size, -1, dtype=np.int64)
+            aligned[self.points], lengths[self.points] = self.aligned, self.lengths
+            self._dense = aligned, lengths
+        return self._dense
+
+
+def _code_point(symbol: Union[str, int]) -> int:
+    return ord(symbol) if isinstance(symbol, str) else symbol
@@ -4,6 +4,7 @@ from compressor.constants import VERSION
 
 tests_require = ("pytest", "pytest-cov", "codecov", "mypy", "pylint", "flake8", "black")
 docs_require = ("Sphinx", "sphinx-autodoc-annotation")
+numpy_require = ("numpy",)
 
 
 with open("README.rst", "r") as readme:
@@ -24,7 +25,7 @@ setup(
     keywords="text compression",
     install_requires=docs_require,
     setup_requires=["pytest-runner"],
-    extras_require={"tests": tests_require, "docs": docs_require},
+    extras_require={"tests": tests_require, "docs": docs_require, "numpy": numpy_require},
     tests_require=tests_require,
     classifiers=[
         "Development Status :: 3 - Alpha",
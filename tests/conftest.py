@@ -2,6 +2,8 @@
 import glob
 import os
 
+import pytest
+
 from compressor.util import open_text_file
 
 TEST_DATA_FILES_LOCATION = os.path.join(os.path.dirname(__file__), "data")
@@ -29,3 +31,52 @@ def pytest_generate_tests(metafunc):
             _load_files_contents(*TEST_DATA_FILES),
             ids=TEST_DATA_FILES,
         )
+
+
+@pytest.fixture
+def binary_file(tmp_path):
+    """Bytes that aren't text: all of them, random ones, and lines ending
+    with CRLF.
+    """
+    source = tmp_path / "binary"
+    source.write_bytes(bytes(range(256)) * 4 + os.urandom(3000) + b"line with windows ending\r\n" * 50)
+    return str(source)
+
+
+@pytest.fixture
+def records(tmp_path):
+    """Many small, similar, JSON records."""
+    names = []
+    for number in range(20):
+        record = tmp_path / f"record{number}.json"
+        record.write_text(
+            f'{{"id": {number}, "user": "user{number}", "active": {str(number % 2 == 0).lower()}}}\n', encoding="utf-8"
+        )
+        names.append(str(record))
+    return names
+
+
+@pytest.fixture
+def heterogeneous_file(tmp_path):
+    """Text switching between parts with very different characters."""
+    parts = (
+        '{"level": "info", "msg": "request served", "status": 200}\n' * 300,
+        "Traceback (most recent call last):\n  File \"app.py\", line 12, in <module>\n" * 200,
+        "".join(chr(ord("A") + i % 26) + chr(ord("0") + i % 10) for i in range(8000)) + "\n",
+    )
+    source = tmp_path / "heterogeneous.txt"
+    source.write_text("".join(parts) * 3, encoding="utf-8")
+    return str(source)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """A directory with text files, some of them on a subdirectory."""
+    directory = tmp_path / "tree"
+    (directory / "logs" / "old").mkdir(parents=True)
+    names = []
+    for number, subdir in enumerate(("logs", "logs", os.path.join("logs", "old"))):
+        name = directory / subdir / f"app{number}.log"
+        name.write_text(f"line {number} of the log\n" * (100 * (number + 1)), encoding="utf-8")
+        names.append(str(name))
+    return str(directory), names
@@ -0,0 +1,54 @@
+"""Tests for compressing with adaptive tables (one for each group of blocks)."""
+import pytest
+
+from compressor.engine import main_engine
+from compressor.lib import compress_file, extract_range
+from tests.conftest import TEST_DATA_FILES
+
+
+def _read(filename):
+    with open(filename, "rb") as content:
+        return content.read()
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_compress_adaptive(heterogeneous_file, jobs, monkeypatch, tmp_path):
+    monkeypatch.setattr("compressor.core.BLOCKS_PER_TASK", 1)
+    single, adaptive, extracted = tmp_path / "single", tmp_path / "adaptive", str(tmp_path / "extracted")
+
+    main_engine(heterogeneous_file, compress=True, dest_file=str(single), block_size=1024)
+    main_engine(heterogeneous_file, compress=True, dest_file=str(adaptive), block_size=1024, adaptive=True, jobs=jobs)
+    main_engine(str(adaptive), extract=True, compress=False, dest_file=extracted, jobs=jobs)
+
+    assert _read(extracted) == _read(heterogeneous_file)
+    assert adaptive.stat().st_size < single.stat().st_size
+
+
+@pytest.mark.parametrize("source", TEST_DATA_FILES)
+def test_compress_adaptive_datasets(source, tmp_path):
+    target, extracted = str(tmp_path / "compressed"), str(tmp_path / "extracted")
+
+    main_engine(source, compress=True, dest_file=target, block_size=64, adaptive=True, max_code_length=8)
+    main_engine(target, extract=True, compress=False, dest_file=extracted)
+
+    assert _read(extracted) == _read(source)
+
+
+def test_compress_adaptive_binary(binary_file, tmp_path):
+    target, extracted = str(tmp_path / "compressed"), str(tmp_path / "extracted")
+
+    main_engine(binary_file, compress=True, dest_file=target, binary=True, adaptive=True, block_size=100)
+    main_engine(target, extract=True, compress=False, dest_file=extracted)
+
+    assert _read(extracted) == _read(binary_file)
+
+
+@pytest.mark.parametrize("index", (True, False))
+def test_extract_range_adaptive(heterogeneous_file, index, tmp_path):
+    target = str(tmp_path / "compressed")
+    compress_file(heterogeneous_file, target, index=index, adaptive=True, block_size=1024)
+    with open(heterogeneous_file, encoding="utf-8") as original:
+        content = original.read()
+
+    for start in (0, 17000, 40000, len(content) - 100):
+        assert extract_range(target, start, 5000) == content[start : start + 5000]
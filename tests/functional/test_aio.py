@@ -0,0 +1,88 @@
+"""Tests for the asyncio API."""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from compressor.aio import compress_file_async, extract_chunks, extract_file_async
+from compressor.lib import compress_file
+from compressor.stats import collect_stats
+from tests.conftest import TEST_DATA_FILES
+
+
+def _read(filename):
+    with open(filename, encoding="utf-8") as source:
+        return source.read()
+
+
+async def _roundtrip(source, directory, executor=None, **options):
+    name = os.path.join(directory, os.path.basename(source))
+    target, extracted = name + ".comp", name + ".extr"
+    await compress_file_async(source, target, executor=executor, **options)
+    await extract_file_async(target, extracted, executor=executor)
+    return extracted
+
+
+def test_compress_and_extract_concurrently(tmp_path):
+    async def run_all():
+        return await asyncio.gather(*(_roundtrip(source, tmp_path, block_size=256) for source in TEST_DATA_FILES))
+
+    for source, extracted in zip(TEST_DATA_FILES, asyncio.run(run_all())):
+        assert _read(extracted) == _read(source)
+
+
+def test_stats_per_task(tmp_path):
+    """The statistics collected on each task have only the measures of its
+    own operations, although they run at the same time.
+    """
+
+    async def compress_collecting(source):
+        with collect_stats() as collected:
+            await compress_file_async(source, str(tmp_path / os.path.basename(source)), block_size=256)
+        return collected
+
+    async def run_all():
+        return await asyncio.gather(*(compress_collecting(source) for source in TEST_DATA_FILES))
+
+    for source, collected in zip(TEST_DATA_FILES, asyncio.run(run_all())):
+        assert collected.counters["bytes_in"] == os.path.getsize(source)
+        assert collected.stages["compress"]["calls"] == 1
+
+
+def test_process_executor(tmp_path):
+    async def run_all():
+        with ProcessPoolExecutor(2) as executor:
+            return await asyncio.gather(*(_roundtrip(source, tmp_path, executor) for source in TEST_DATA_FILES))
+
+    for source, extracted in zip(TEST_DATA_FILES, asyncio.run(run_all())):
+        assert _read(extracted) == _read(source)
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_extract_chunks(jobs, monkeypatch, tmp_path):
+    monkeypatch.setattr("compressor.core.BLOCKS_PER_TASK", 1)
+    source = max(TEST_DATA_FILES, key=os.path.getsize)
+    target = str(tmp_path / "compressed")
+    compress_file(source, target, block_size=100)
+
+    async def collect():
+        return [chunk async for chunk in extract_chunks(target, jobs=jobs)]
+
+    chunks = asyncio.run(collect())
+    assert len(chunks) > 1
+    assert "".join(chunks) == _read(source)
+
+
+def test_extract_chunks_stop_early(tmp_path):
+    source = TEST_DATA_FILES[0]
+    target = str(tmp_path / "compressed")
+    compress_file(source, target, block_size=100)
+
+    async def first_chunk():
+        chunks = extract_chunks(target)
+        async for chunk in chunks:
+            await chunks.aclose()
+            return chunk
+
+    assert asyncio.run(first_chunk()) == _read(source)[:100]
@@ -0,0 +1,79 @@
+"""Tests for processing many files at once: directories, patterns, and the
+report of the ones that failed.
+"""
+import filecmp
+import logging
+import os
+
+import pytest
+
+from compressor.batch import batch_engine
+from compressor.lib import load_table
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_batch_recursive(tree, workers, tmp_path, caplog):
+    directory, names = tree
+    compressed, extracted = str(tmp_path / "compressed"), str(tmp_path / "extracted")
+    with caplog.at_level(logging.INFO, logger="compressor.batch"):
+        status = batch_engine(
+            [os.path.join(directory, "logs")], compress=True, recursive=True, dest_dir=compressed, workers=workers
+        )
+    assert status == 0
+    assert "3 files processed (0 failed)" in caplog.text
+
+    comp_files = [os.path.join(compressed, os.path.relpath(name, directory)) + ".comp" for name in names]
+    assert all(os.path.exists(comp_file) for comp_file in comp_files)
+    assert batch_engine(comp_files, extract=True, compress=False, dest_dir=extracted) == 0
+    for name in names:
+        assert filecmp.cmp(name, os.path.join(extracted, os.path.basename(name) + ".comp.extr"), shallow=False)
+
+
+def test_batch_glob(tree, tmp_path, caplog):
+    directory, _ = tree
+    compressed = str(tmp_path / "compressed")
+    pattern = os.path.join(directory, "logs", "*.log")
+    with caplog.at_level(logging.INFO, logger="compressor.batch"):
+        assert batch_engine([pattern, os.path.join(directory, "logs")], compress=True, dest_dir=compressed) == 0
+    assert sorted(os.listdir(compressed)) == ["app0.log.comp", "app1.log.comp"]
+    assert "is a directory" in caplog.text
+
+
+def test_batch_failures(tree, tmp_path, caplog):
+    directory, names = tree
+    missing = os.path.join(directory, "missing.log")
+    with caplog.at_level(logging.INFO, logger="compressor.batch"):
+        status = batch_engine([names[0], missing], compress=True, dest_dir=str(tmp_path / "compressed"))
+    assert status == 1
+    assert "1 files processed (1 failed)" in caplog.text
+
+
+def test_batch_unmatched_pattern(tree, tmp_path, caplog):
+    directory, names = tree
+    compressed = str(tmp_path / "compressed")
+    with caplog.at_level(logging.INFO, logger="compressor.batch"):
+        status = batch_engine([names[0], os.path.join(directory, "*.txt")], compress=True, dest_dir=compressed)
+    assert status == 1
+    assert "no files match" in caplog.text
+    assert os.listdir(compressed) == ["app0.log.comp"]  # the rest are still processed
+
+
+@pytest.mark.parametrize("pattern", ("missing/*.log", "logs"))
+def test_batch_nothing_to_process(tree, pattern, caplog):
+    directory, _ = tree
+    with caplog.at_level(logging.INFO, logger="compressor.batch"):
+        assert batch_engine([os.path.join(directory, pattern)], compress=True) == 1
+    assert "No files to process" in caplog.text
+
+
+def test_batch_single_destination(tree):
+    _, names = tree
+    with pytest.raises(ValueError):
+        batch_engine(names, compress=True, dest_file="out.comp")
+
+
+def test_batch_train(tree, tmp_path):
+    _, names = tree
+    table = str(tmp_path / "table")
+    assert batch_engine(names, train=True, compress=False, table=table) == 0
+    assert load_table(table).table
@@ -0,0 +1,29 @@
+"""Tests for compressing the bytes of the files (any file, not only text)."""
+import pytest
+
+from compressor.engine import main_engine
+from compressor.lib import compress_file, extract_range
+
+
+def _read(filename):
+    with open(filename, "rb") as content:
+        return content.read()
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_compress_binary(binary_file, jobs, tmp_path):
+    target, extracted = str(tmp_path / "compressed"), str(tmp_path / "extracted")
+
+    main_engine(binary_file, compress=True, dest_file=target, binary=True, jobs=jobs)
+    main_engine(target, extract=True, compress=False, dest_file=extracted, jobs=jobs)
+
+    assert _read(extracted) == _read(binary_file)
+
+
+def test_extract_range_binary(binary_file, tmp_path):
+    target = str(tmp_path / "compressed")
+    compress_file(binary_file, target, binary=True, index=True)
+    content = _read(binary_file)
+
+    assert extract_range(target, 1000, 2000) == content[1000:3000]
+    assert extract_range(target, len(content), 10) == b""
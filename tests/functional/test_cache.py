@@ -0,0 +1,182 @@
+"""Tests for the cache of compressed files."""
+import os
+import stat
+
+import pytest
+
+from compressor.cache import CompressionCache
+from compressor.engine import main_engine
+from compressor.lib import compress_file, extract_file
+from compressor.stats import collect_stats
+from tests.conftest import TEST_DATA_FILES
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CompressionCache(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def source(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_text("the same line, again and again\n" * 500, encoding="utf-8")
+    return str(log)
+
+
+def _read(filename):
+    with open(filename, "rb") as content:
+        return content.read()
+
+
+def test_hit(cache, source, tmp_path):
+    first, second, expected = (str(tmp_path / name) for name in ("first", "second", "expected"))
+    compress_file(source, expected)
+
+    assert cache.compress_file(source, first) is False
+    assert cache.compress_file(source, second) is True
+    assert _read(first) == _read(second) == _read(expected)
+    (entry, status), = cache.entries()
+    assert not os.path.samefile(entry, second)  # copied from the entry
+    assert not status.st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    assert os.access(second, os.W_OK)
+
+
+def test_output_overwritten(cache, source, tmp_path):
+    """Compressing something else on the output taken from the cache leaves
+    the entry as it was.
+    """
+    target = str(tmp_path / "compressed")
+    cache.compress_file(source, target)
+    cache.compress_file(source, target)
+    (entry, _), = cache.entries()
+    expected = _read(entry)
+
+    compress_file(TEST_DATA_FILES[0], target)
+    assert _read(entry) == expected
+    assert cache.compress_file(source, target) is True
+    assert _read(target) == expected
+
+
+def test_same_content_other_file(cache, source, tmp_path):
+    copy = tmp_path / "copy.log"
+    copy.write_bytes(_read(source))
+
+    assert cache.compress_file(source, str(tmp_path / "first")) is False
+    assert cache.compress_file(str(copy), str(tmp_path / "second")) is True
+
+
+@pytest.mark.parametrize(
+    "options,other",
+    (
+        ({}, {"index": True}),
+        ({}, {"binary": True}),
+        ({"block_size": 1024}, {"block_size": 2048}),
+        ({"jobs": 1}, {"jobs": 4}),
+    ),
+)
+def test_options_in_the_key(cache, source, options, other):
+    assert cache.key(source, **options) != cache.key(source, **other)
+
+
+def test_all_the_cpus_in_the_key(cache, source, monkeypatch):
+    """Using all the CPUs (`jobs` of None or 0) picks the size of the blocks
+    for the count of this machine.
+    """
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    assert cache.key(source, jobs=None) == cache.key(source, jobs=0) == cache.key(source, jobs=4)
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    assert cache.key(source, jobs=None) != cache.key(source, jobs=4)
+
+
+def test_options_not_in_the_key(cache, source):
+    assert cache.key(source, max_memory=64) == cache.key(source)
+    assert cache.key(source, block_size=1024, jobs=1) == cache.key(source, block_size=1024, jobs=4)
+
+
+def test_changed_content(cache, source, tmp_path):
+    target = str(tmp_path / "compressed")
+    cache.compress_file(source, target)
+    with open(source, "a", encoding="utf-8") as log:
+        log.write("a new line\n")
+
+    assert cache.compress_file(source, target) is False
+    extracted = str(tmp_path / "extracted")
+    extract_file(target, extracted)
+    assert _read(extracted) == _read(source)
+    assert len(cache.entries()) == 2
+
+
+def test_link(source, tmp_path):
+    cache = CompressionCache(str(tmp_path / "cache"), link=True)
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+    cache.compress_file(source, first)
+    assert cache.compress_file(source, second) is True
+
+    (entry, _), = cache.entries()
+    assert os.path.samefile(entry, first) and os.path.samefile(entry, second)
+
+
+def test_too_large(source, tmp_path):
+    cache = CompressionCache(str(tmp_path / "cache"), max_size=10)
+    target = str(tmp_path / "compressed")
+
+    assert cache.compress_file(source, target) is False
+    assert cache.entries() == []
+    assert os.path.getsize(target) > 10
+    assert os.access(target, os.W_OK)
+
+
+def test_evict_least_recently_used(cache, tmp_path):
+    targets = [str(tmp_path / f"compressed{number}") for number, _ in enumerate(TEST_DATA_FILES)]
+    for number, (filename, target) in enumerate(zip(TEST_DATA_FILES, targets)):
+        cache.compress_file(filename, target)
+        entry = cache._entry(cache.key(filename))  # pylint: disable=protected-access
+        os.utime(entry, (1000 + number, 1000 + number))
+    entries = [path for path, _ in cache.entries()]
+    sizes = [os.path.getsize(path) for path in entries]
+
+    cache.evict(sum(sizes[1:]))
+    assert [path for path, _ in cache.entries()] == entries[1:]
+    assert all(os.path.exists(target) for target in targets)  # the outputs are kept
+
+    cache.clear()
+    assert cache.entries() == []
+    assert cache.size() == 0
+
+
+def test_evicted_on_insertion(cache, source, tmp_path):
+    cache.compress_file(TEST_DATA_FILES[0], str(tmp_path / "first"))
+    cache.max_size = cache.size() + 1
+
+    cache.compress_file(source, str(tmp_path / "second"))
+    assert cache.size() <= cache.max_size
+    assert len(cache.entries()) == 1
+
+
+def test_entries_listed_for_evicting_only(cache, source, tmp_path, monkeypatch):
+    target = str(tmp_path / "compressed")
+    cache.compress_file(source, target)
+    entries, listed = cache.entries, []
+    monkeypatch.setattr(cache, "entries", lambda: listed.append(1) or entries())
+
+    for filename in TEST_DATA_FILES:
+        cache.compress_file(filename, target)
+    assert not listed  # only on the first insertion, before
+    cache.max_size = cache.size()
+    del listed[:]
+    cache.compress_file(source, target, index=True)
+    assert len(listed) == 1
+    assert cache.size() <= cache.max_size
+
+
+def test_cli_cache(source, tmp_path):
+    directory, target = str(tmp_path / "cache"), str(tmp_path / "compressed")
+    with collect_stats() as collected:
+        main_engine(source, compress=True, dest_file=target, cache=directory)
+        main_engine(source, compress=True, dest_file=target, cache=directory)
+
+    assert collected.counters["cache_misses"] == 1
+    assert collected.counters["cache_hits"] == 1
+    extracted = str(tmp_path / "extracted")
+    main_engine(target, extract=True, compress=False, dest_file=extracted)
+    assert _read(extracted) == _read(source)
@@ -0,0 +1,52 @@
+"""Tests for extracting part of a file (with the index of the blocks, or
+without it), and for extracting the blocks in parallel.
+"""
+import os
+
+import pytest
+
+from compressor.engine import main_engine
+from compressor.index import INDEX_MAGIC
+from compressor.lib import compress_file, extract_range
+from compressor.util import pack
+from tests.conftest import TEST_DATA_FILES
+
+
+def _read(filename):
+    with open(filename, encoding="utf-8") as original:
+        return original.read()
+
+
+@pytest.mark.parametrize("index", (True, False))
+@pytest.mark.parametrize("source", TEST_DATA_FILES)
+def test_parallel_extraction(source, index, monkeypatch, tmp_path):
+    monkeypatch.setattr("compressor.core.BLOCKS_PER_TASK", 1)
+    target, extracted = str(tmp_path / "compressed"), str(tmp_path / "extracted")
+
+    main_engine(source, compress=True, dest_file=target, index=index)
+    main_engine(target, extract=True, compress=False, dest_file=extracted, jobs=2)
+
+    assert _read(extracted) == _read(source)
+
+
+@pytest.mark.parametrize("index", (True, False))
+@pytest.mark.parametrize("start,length", ((0, 10), (1000, 1024), (1020, 10), (3000, 5000), (0, 0), (9999, 1)))
+def test_extract_range(start, length, index, tmp_path):
+    source = max(TEST_DATA_FILES, key=os.path.getsize)
+    target = str(tmp_path / "compressed")
+    compress_file(source, target, index=index)
+
+    assert extract_range(target, start, length) == _read(source)[start : start + length]
+
+
+def test_trailer_only_with_the_flag(tmp_path):
+    """Content ending like an index trailer is not taken for one, on files
+    compressed without it.
+    """
+    source = max(TEST_DATA_FILES, key=os.path.getsize)
+    target = str(tmp_path / "compressed")
+    compress_file(source, target)
+    with open(target, "ab") as compressed:
+        compressed.write(pack("QQ4s", 0, 3, INDEX_MAGIC))
+
+    assert extract_range(target, 3000, 5000) == _read(source)[3000:8000]
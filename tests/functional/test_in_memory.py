@@ -0,0 +1,112 @@
+"""Tests for compressing content in memory, and from (and to) file objects."""
+import io
+
+import pytest
+
+from compressor.lib import compress, compress_file, compress_stream, decompress, decompress_stream, train_table
+from tests.conftest import TEST_DATA_FILES
+
+
+@pytest.mark.parametrize("source", TEST_DATA_FILES)
+def test_compress_in_memory(source, tmp_path):
+    """Compressing in memory produces the same content as compressing the file."""
+    target = tmp_path / "compressed"
+    compress_file(source, str(target))
+    with open(source, encoding="utf-8", newline="") as original:
+        content = original.read()
+
+    blob = compress(content)
+
+    assert blob == target.read_bytes()
+    assert decompress(blob) == content
+
+
+@pytest.mark.parametrize("wrap", (bytes, bytearray, memoryview))
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_compress_in_memory_binary(binary_file, wrap, jobs):
+    with open(binary_file, "rb") as original:
+        content = original.read()
+
+    blob = compress(wrap(content), jobs=jobs, block_size=512, index=True)
+
+    assert decompress(memoryview(blob), jobs=jobs) == content
+
+
+@pytest.mark.parametrize("options", ({"adaptive": True, "block_size": 64}, {"max_code_length": 6}))
+def test_compress_in_memory_options(options):
+    content = "".join(chr(ord("a") + i % 20) * (i % 7 + 1) for i in range(3000))
+    assert decompress(compress(content, **options)) == content
+
+
+def test_compress_unknown_option():
+    with pytest.raises(TypeError):
+        compress("content", blocks=64)
+
+
+@pytest.mark.parametrize("data", ("", b""))
+def test_compress_empty(data):
+    assert decompress(compress(data)) == data
+
+
+def test_compress_in_memory_shared_table(records, tmp_path):
+    shared = train_table(records, str(tmp_path / "table"))
+    with open(records[3], encoding="utf-8") as record:
+        content = record.read()
+
+    blob = compress(content, table=shared)
+
+    assert decompress(blob, table=shared) == content
+    with pytest.raises(ValueError, match="text content"):
+        compress(content.encode(), table=shared)
+
+
+def test_compress_streams(binary_file):
+    source, dest, extracted = io.BytesIO(), io.BytesIO(), io.BytesIO()
+    with open(binary_file, "rb") as original:
+        content = original.read()
+    source.write(b"header" + content)
+    source.seek(len(b"header"))
+
+    compress_stream(source, dest, block_size=1000)
+    dest.seek(0)
+    decompress_stream(dest, extracted)
+
+    assert extracted.getvalue() == content
+
+
+def test_compress_text_streams(data_file):
+    dest, extracted = io.BytesIO(), io.StringIO()
+
+    compress_stream(io.StringIO(data_file), dest, max_memory=4096, jobs=2)
+    decompress_stream(io.BytesIO(dest.getvalue()), extracted, jobs=2)
+
+    assert extracted.getvalue() == data_file
+
+
+@pytest.mark.parametrize("data,dest", (("text", io.BytesIO), (b"bytes", io.StringIO)))
+def test_decompress_stream_mode(data, dest):
+    extracted = dest()
+    with pytest.raises(TypeError):
+        decompress_stream(io.BytesIO(compress(data)), extracted)
+    assert not extracted.getvalue()
+
+
+@pytest.mark.parametrize("prefix", (b"", b"PREFIX"))
+def test_compress_stream_after_content(records, tmp_path, prefix):
+    """The checksum (known after the blocks, when compressing with a shared
+    table) is set on the header, wherever the stream starts.
+    """
+    shared = train_table(records, str(tmp_path / "table"))
+    with open(records[3], encoding="utf-8") as record:
+        content = record.read()
+    dest = io.BytesIO()
+    dest.write(prefix)
+
+    compress_stream(io.StringIO(content), dest, table=shared)
+
+    assert dest.getvalue()[: len(prefix)] == prefix
+    assert dest.getvalue()[len(prefix) :] == compress(content, table=shared)
+    extracted = io.StringIO()
+    dest.seek(len(prefix))
+    decompress_stream(dest, extracted, table=shared)
+    assert extracted.getvalue() == content
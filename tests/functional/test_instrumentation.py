@@ -0,0 +1,61 @@
+"""Tests for the statistics of the operations, and the profile of the command
+line.
+"""
+import json
+import os
+
+import pytest
+
+from compressor.cli import run
+from compressor.lib import compress, compress_file, extract_file
+from compressor.stats import collect_stats
+from tests.conftest import TEST_DATA_FILES
+
+
+def test_stats_compress_and_extract(tmp_path):
+    source = max(TEST_DATA_FILES, key=os.path.getsize)
+    target, extracted = str(tmp_path / "compressed"), str(tmp_path / "extracted")
+    with collect_stats() as compression:
+        compress_file(source, target, block_size=1024)
+    with collect_stats() as extraction:
+        extract_file(target, extracted)
+
+    measures = compression.as_dict()
+    assert {"compress", "frequencies", "codes", "encode", "read", "write"} <= set(measures["stages"])
+    assert measures["counters"]["bytes_in"] == os.path.getsize(source)
+    assert measures["counters"]["bytes_out"] == os.path.getsize(target)
+    assert measures["counters"]["blocks"] == len(range(0, measures["counters"]["length"], 1024))
+    assert measures["entropy"] <= measures["mean_code_length"] < measures["entropy"] + 1
+
+    measures = extraction.as_dict()
+    assert {"extract", "metadata", "decode"} <= set(measures["stages"])
+    assert measures["counters"]["bytes_in"] == os.path.getsize(target)
+    assert measures["counters"]["bytes_out"] == os.path.getsize(extracted)
+
+
+def test_stats_adaptive(heterogeneous_file):
+    with open(heterogeneous_file, encoding="utf-8") as source:
+        content = source.read()
+    with collect_stats() as collected:
+        compress(content, adaptive=True, block_size=1024)
+    measures = collected.as_dict()
+    assert "plan" in measures["stages"]
+    assert measures["entropy"] <= measures["mean_code_length"]
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_cli_stats(tree, workers, tmp_path, capsys):
+    directory, names = tree
+    status = run(
+        filenames=[directory], compress=True, recursive=True, dest_dir=str(tmp_path), workers=workers, stats=True
+    )
+    assert status == 0
+    measures = json.loads(capsys.readouterr().out)
+    assert measures["stages"]["compress"]["calls"] == len(names)
+    assert measures["counters"]["bytes_in"] == sum(os.path.getsize(name) for name in names)
+
+
+def test_cli_profile(tree, tmp_path, capsys):
+    _, names = tree
+    assert run(filenames=names[:1], compress=True, dest_dir=str(tmp_path), profile=True) == 0
+    assert "cumulative" in capsys.readouterr().err
@@ -0,0 +1,18 @@
+"""Tests for compressing the files mapped in memory (binary, and ASCII text)."""
+import pytest
+
+from compressor.lib import compress, compress_file, extract_file
+
+
+@pytest.mark.parametrize("newline", ("\n", "\r\n"))
+def test_compress_ascii_text(newline, tmp_path):
+    """Text is compressed the same whether it's read as bytes or as text."""
+    source, target, extracted = tmp_path / "source", tmp_path / "compressed", tmp_path / "extracted"
+    with open(source, "w", encoding="utf-8", newline=newline) as text:
+        text.write("plain ascii line\n" * 200)
+
+    compress_file(str(source), str(target))
+    extract_file(str(target), str(extracted))
+
+    assert target.read_bytes() == compress("plain ascii line\n" * 200)
+    assert extracted.read_text(encoding="utf-8") == "plain ascii line\n" * 200
@@ -0,0 +1,139 @@
+"""Tests for reading compressed files by random access."""
+import io
+import os
+
+import pytest
+
+from compressor.core import _decode_block
+from compressor.lib import CompressedFileReader, Compressor, compress_file
+from tests.conftest import TEST_DATA_FILES
+
+
+@pytest.fixture(scope="module")
+def compressed(tmp_path_factory):
+    """The largest test file, compressed in small blocks, and its content."""
+    source = max(TEST_DATA_FILES, key=os.path.getsize)
+    target = str(tmp_path_factory.mktemp("reader") / "compressed")
+    compress_file(source, target, block_size=256)
+    with open(source, encoding="utf-8") as original:
+        content = original.read()
+    return target, content
+
+
+def test_read_sequentially(compressed):
+    target, content = compressed
+    with CompressedFileReader(target) as reader:
+        assert len(reader) == len(content)
+        pieces = []
+        piece = reader.read(1000)
+        while piece:
+            pieces.append(piece)
+            piece = reader.read(1000)
+        assert "".join(pieces) == content
+        assert reader.tell() == len(content)
+    assert reader.closed
+
+
+def test_seek_and_tell(compressed):
+    target, content = compressed
+    with CompressedFileReader(target) as reader:
+        assert reader.seek(3000) == 3000
+        assert reader.read(500) == content[3000:3500]
+        assert reader.seek(-100, io.SEEK_CUR) == 3400
+        assert reader.read(50) == content[3400:3450]
+        assert reader.seek(-20, io.SEEK_END) == len(content) - 20
+        assert reader.read() == content[-20:]
+        assert reader.read() == ""
+        reader.seek(len(content) + 10)
+        assert reader.read(10) == ""
+        with pytest.raises(ValueError):
+            reader.seek(-1)
+
+
+@pytest.mark.parametrize(
+    "key",
+    (
+        slice(0, 10),
+        slice(1000, 5000),
+        slice(-300, None),
+        slice(None, None),
+        slice(10, 5),
+        slice(100, 3000, 7),
+        slice(3000, 100, -3),
+        slice(None, None, -1),
+    ),
+)
+def test_slicing(compressed, key):
+    target, content = compressed
+    with CompressedFileReader(target) as reader:
+        assert reader[key] == content[key]
+        assert reader.tell() == 0
+
+
+def test_indexing(compressed):
+    target, content = compressed
+    with CompressedFileReader(target) as reader:
+        assert reader[0] == content[0]
+        assert reader[-1] == content[-1]
+        with pytest.raises(IndexError):
+            reader[len(content)]  # pylint: disable=pointless-statement
+
+
+def test_lines(compressed):
+    target, content = compressed
+    with CompressedFileReader(target) as reader:
+        assert list(reader) == content.splitlines(keepends=True)
+        reader.seek(content.index("\n") + 1)
+        assert reader.readline() == content.splitlines(keepends=True)[1]
+
+
+def test_blocks_are_cached(compressed, monkeypatch):
+    target, content = compressed
+    decoded = []
+
+    def decode_block(binary_content, decoder, block_length):
+        decoded.append(binary_content)
+        return _decode_block(binary_content, decoder, block_length)
+
+    monkeypatch.setattr("compressor.reader._decode_block", decode_block)
+    with CompressedFileReader(target, cache_size=2) as reader:
+        for position in range(0, 256, 16):
+            assert reader[position : position + 16] == content[position : position + 16]
+        assert len(decoded) == 1
+        assert reader[256:266] == content[256:266]
+        assert reader[600:610] == content[600:610]
+        assert reader[0:10] == content[0:10]
+        assert len(decoded) == 4
+
+
+def test_binary(binary_file, tmp_path):
+    with open(binary_file, "rb") as original:
+        content = original.read()
+    target = str(tmp_path / "compressed")
+    compress_file(binary_file, target, binary=True, block_size=100, index=True)
+    with CompressedFileReader(target) as reader:
+        assert reader.binary
+        assert reader[1000:2000] == content[1000:2000]
+        reader.seek(len(content) - 30)
+        assert reader.read() == content[-30:]
+
+
+def test_empty_file(tmp_path):
+    source, target = tmp_path / "empty", str(tmp_path / "compressed")
+    source.touch()
+    compress_file(str(source), target)
+    with CompressedFileReader(target) as reader:
+        assert len(reader) == 0
+        assert reader.read() == ""
+        assert reader[:] == ""
+        assert list(reader) == []
+
+
+def test_stream_not_supported(tmp_path):
+    target = str(tmp_path / "compressed")
+    compressor = Compressor()
+    with open(target, "wb") as output:
+        output.write(compressor.compress("streamed content"))
+        output.write(compressor.flush())
+    with pytest.raises(ValueError):
+        CompressedFileReader(target)
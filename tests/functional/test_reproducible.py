@@ -0,0 +1,87 @@
+"""The compressed output only depends on the content (and the options): not
+on the hash seed, the version of Python, the order the characters appear
+in, how the content is split, or the backend available.
+"""
+import hashlib
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from compressor.lib import compress, compress_stream
+from compressor.util import unpack
+from tests.conftest import TEST_DATA_FILES_LOCATION
+
+SOURCE = os.path.join(TEST_DATA_FILES_LOCATION, "license.txt")
+# many bytes with the same frequency
+BINARY = bytes(number % 251 for number in range(40_000)) + bytes(range(256)) * 3
+
+# sha256 of the compressed content, which must not change across versions
+# (of Python, or of the package, unless the format does)
+GOLDEN = {
+    "text": "8b4da47bb4c0e908969e32fdbfddca304ad541c986315e8a562032e897031dfc",
+    "binary": "b14caa0ef8d71609a698feb36fd21acd49bfe2ef09b832f82a87607c1faf7d99",
+}
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_HASHES = """
+from tests.functional.test_reproducible import _hashes, _text
+print(" ".join(_hashes().values()))
+"""
+
+
+def _text() -> str:
+    with open(SOURCE, encoding="utf-8") as source:
+        return source.read()
+
+
+def _hashes() -> dict:
+    return {
+        "text": hashlib.sha256(compress(_text(), block_size=1024)).hexdigest(),
+        "binary": hashlib.sha256(compress(BINARY, block_size=1024)).hexdigest(),
+    }
+
+
+def _metadata(compressed: bytes) -> bytes:
+    """The header and the table, at the start of <compressed>."""
+    header = 4 + 1 + 1 + 8 + 4
+    count, chars_size = unpack("II", compressed[header : header + 8])
+    return compressed[: header + 8 + chars_size + count]
+
+
+def test_golden():
+    assert _hashes() == GOLDEN
+
+
+@pytest.mark.parametrize("seed", ("0", "1", "4242", "random"))
+def test_hash_seeds(seed):
+    env = dict(os.environ, PYTHONHASHSEED=seed)
+    result = subprocess.run(
+        (sys.executable, "-c", _HASHES), env=env, cwd=_ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == list(GOLDEN.values())
+
+
+def test_pure_python(monkeypatch):
+    monkeypatch.setattr("compressor.vectorized.AVAILABLE", False)
+    assert _hashes() == GOLDEN
+
+
+def test_order_of_appearance():
+    """Content with the same frequencies gets the same table, regardless of
+    where each character appears first.
+    """
+    text = _text()
+    assert _metadata(compress(text[::-1])) == _metadata(compress(text))
+    assert _metadata(compress(BINARY[::-1])) == _metadata(compress(BINARY))
+
+
+@pytest.mark.parametrize("max_memory", (16, 1000, 1 << 20))
+def test_chunking(max_memory):
+    """The frequencies are the same however the content is read."""
+    text = _text()
+    target = io.BytesIO()
+    compress_stream(io.StringIO(text), target, max_memory=max_memory, block_size=1024)
+    assert hashlib.sha256(target.getvalue()).hexdigest() == GOLDEN["text"]
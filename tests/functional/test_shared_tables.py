@@ -0,0 +1,65 @@
+"""Tests for compressing many small files with a table trained ahead of time."""
+import pytest
+
+from compressor.engine import main_engine
+from compressor.lib import compress_file, extract_file, extract_range, load_table, train_table
+
+
+def _read(filename):
+    with open(filename, "rb") as content:
+        return content.read()
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_compress_with_shared_table(records, jobs, tmp_path):
+    table_file = str(tmp_path / "table")
+    shared = train_table(records[:10], table_file)
+    target, standalone, extracted = tmp_path / "compressed", tmp_path / "standalone", str(tmp_path / "extracted")
+
+    for record in records:
+        compress_file(record, str(target), table=shared, jobs=jobs)
+        compress_file(record, str(standalone))
+        extract_file(str(target), extracted, table=load_table(table_file))
+
+        assert _read(extracted) == _read(record)
+        assert target.stat().st_size < standalone.stat().st_size
+        assert extract_range(str(target), 1, 4, table=shared) == '"id"'
+
+
+def test_shared_table_from_cli(records, tmp_path):
+    table_file, target, extracted = str(tmp_path / "table"), str(tmp_path / "compressed"), str(tmp_path / "extracted")
+
+    main_engine(records[0], compress=False, train=True, table=table_file)
+    main_engine(records[0], compress=True, dest_file=target, table=table_file)
+    main_engine(target, extract=True, compress=False, dest_file=extracted, table=table_file)
+
+    assert _read(extracted) == _read(records[0])
+
+
+def test_shared_table_required(records, tmp_path):
+    shared = train_table(records, str(tmp_path / "table"))
+    other = train_table(records[:1], str(tmp_path / "other"))
+    target, extracted = str(tmp_path / "compressed"), str(tmp_path / "extracted")
+    compress_file(records[0], target, table=shared)
+
+    with pytest.raises(ValueError, match="shared table"):
+        extract_file(target, extracted)
+    with pytest.raises(ValueError, match="compressed with the table"):
+        extract_file(target, extracted, table=other)
+
+
+def test_shared_table_missing_characters(records, tmp_path):
+    shared = train_table(records[:1], str(tmp_path / "table"))
+
+    with pytest.raises(ValueError, match="without a code"):
+        compress_file(records[1], str(tmp_path / "compressed"), table=shared)
+
+
+def test_shared_binary_table(records, binary_file, tmp_path):
+    shared = train_table(records, str(tmp_path / "table"), binary=True)
+    target, extracted = str(tmp_path / "compressed"), str(tmp_path / "extracted")
+
+    compress_file(binary_file, target, table=shared)
+    extract_file(target, extracted, table=shared)
+
+    assert _read(extracted) == _read(binary_file)
@@ -1,4 +1,7 @@
 import hashlib
+import io
+import logging
+import os
 import subprocess
 import tempfile
 from itertools import groupby
@@ -6,8 +9,9 @@ from typing import List
 
 import pytest
 
-from compressor.cli import main_engine
-from tests.conftest import TEST_DATA_FILES
+from compressor.engine import main_engine
+from compressor.lib import compress_file, extract_file, extract_range
+from tests.conftest import TEST_DATA_FILES, TEST_DATA_FILES_LOCATION
 
 
 def _all_equal(iterable):
@@ -43,6 +47,98 @@ def test_compress_and_retrieve_datasets(source):
     assert _all_files_identical(source, extracted)
 
 
+@pytest.mark.parametrize("source", ("license.txt", "test002.txt"))
+def test_compress_limited_code_length(source, caplog):
+    source = os.path.join(TEST_DATA_FILES_LOCATION, source)
+    target = tempfile.NamedTemporaryFile().name
+    extracted = tempfile.NamedTemporaryFile().name
+
+    with caplog.at_level(logging.INFO, logger="compressor.lib"):
+        main_engine(source, compress=True, dest_file=target, max_code_length=6)
+    main_engine(target, extract=True, compress=False, dest_file=extracted)
+
+    assert _all_files_identical(source, extracted)
+    assert "Codes limited to 6 bits" in caplog.text
+
+
+class _RecordingWriter(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_extract_into_writable(jobs, monkeypatch):
+    """Extraction writes the blocks into the given file-like object as they
+    are decoded."""
+    monkeypatch.setattr("compressor.core.BLOCKS_PER_TASK", 1)
+    source = os.path.join(TEST_DATA_FILES_LOCATION, "test002.txt")
+    target = tempfile.NamedTemporaryFile().name
+    compress_file(source, target)
+    output = _RecordingWriter()
+
+    extract_file(target, output, jobs=jobs)
+
+    with open(source, encoding="utf-8") as original:
+        assert output.getvalue() == original.read()
+    assert output.writes > 1
+
+
+@pytest.mark.parametrize("block_size", (1, 100, 4096, 65536))
+@pytest.mark.parametrize("source", TEST_DATA_FILES)
+def test_compress_block_size(source, block_size):
+    target = tempfile.NamedTemporaryFile().name
+    extracted = tempfile.NamedTemporaryFile().name
+
+    main_engine(source, compress=True, dest_file=target, block_size=block_size, index=True)
+    main_engine(target, extract=True, compress=False, dest_file=extracted, jobs=2)
+
+    assert _all_files_identical(source, extracted)
+    with open(source, encoding="utf-8") as original:
+        assert extract_range(target, 50, 300) == original.read()[50:350]
+
+
+def test_extract_legacy_format():
+    """Files compressed before the format was versioned can be extracted."""
+    legacy = os.path.join(TEST_DATA_FILES_LOCATION, "license-v0.txt.comp")
+    original = os.path.join(TEST_DATA_FILES_LOCATION, "license.txt")
+    extracted = tempfile.NamedTemporaryFile().name
+
+    main_engine(legacy, extract=True, compress=False, dest_file=extracted)
+
+    assert _all_files_identical(original, extracted)
+
+
+def test_compress_non_ascii():
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", delete=False) as source:
+        source.write("Compresión de archivos: ñandú, €, 日本語\n" * 20)
+    target = tempfile.NamedTemporaryFile().name
+    extracted = tempfile.NamedTemporaryFile().name
+
+    main_engine(source.name, compress=True, dest_file=target)
+    main_engine(target, extract=True, compress=False, dest_file=extracted)
+
+    assert _all_files_identical(source.name, extracted)
+    os.unlink(source.name)
+
+
+@pytest.mark.parametrize("source", TEST_DATA_FILES)
+def test_parallel_compression_identical(source, monkeypatch):
+    """Compressing in parallel produces the same file."""
+    monkeypatch.setattr("compressor.core.BLOCKS_PER_TASK", 1)
+    sequential = tempfile.NamedTemporaryFile().name
+    parallel = tempfile.NamedTemporaryFile().name
+
+    main_engine(source, compress=True, dest_file=sequential)
+    main_engine(source, compress=True, dest_file=parallel, jobs=2)
+
+    assert _all_files_identical(sequential, parallel)
+
+
 def test_cli_invocation():
     """The entry point works"""
     st_code = subprocess.check_call(("pycompress", "-h"))
@@ -0,0 +1,58 @@
+"""Start up of the command line program: showing the help, or the version,
+only imports what's needed for parsing the arguments.
+"""
+import subprocess
+import sys
+
+import pytest
+
+# imported by the operations (compressing, extracting...) only
+DEFERRED_MODULES = (
+    "compressor.lib",
+    "compressor.core",
+    "compressor.util",
+    "compressor.batch",
+    "compressor.engine",
+    "compressor.stats",
+    "compressor.cache",
+    "numpy",
+    "concurrent.futures",
+    "logging",
+)
+
+
+def _import_times(code: str, *args: str) -> dict:
+    """
+    Run <code> (with <args>) on a new interpreter, with ``-X importtime``,
+    and return the cumulative time (in microseconds) of each module imported
+    at the top level.
+    """
+    result = subprocess.run(
+        (sys.executable, "-X", "importtime", "-c", code, *args), capture_output=True, text=True, check=False
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            if not name.startswith("  "):  # nested imports are included in their parent
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def _startup_times(*args: str) -> dict:
+    return _import_times("import sys; from compressor.cli import main; sys.exit(main())", *args)
+
+
+@pytest.mark.parametrize("args", (("-h",), ("--version",), ("-c",)))
+def test_startup_imports(args):
+    imported = _startup_times(*args)
+    assert "compressor.cli" in imported
+    assert not set(DEFERRED_MODULES).intersection(imported)
+
+
+def test_startup_time():
+    """The imports on start up take less than the ones deferred."""
+    baseline = _import_times("pass")
+    startup = sum(time for name, time in _startup_times("-h").items() if name not in baseline)
+    deferred = _import_times("import compressor.cli, compressor.lib, compressor.batch")
+    assert startup < sum(time for name, time in deferred.items() if name not in baseline) / 2
@@ -0,0 +1,71 @@
+"""Tests for the planning of adaptive tables."""
+from functools import partial
+
+import pytest
+
+from compressor.adaptive import plan_tables
+from compressor.util import MemoryStream, StreamFile
+
+
+@pytest.fixture
+def make_file(tmp_path):
+    def _make_file(content):
+        source = tmp_path / f"source{len(list(tmp_path.iterdir()))}"
+        source.write_text(content, encoding="utf-8")
+        return str(source)
+
+    return _make_file
+
+
+def test_similar_groups_share_a_table(make_file):
+    filename = make_file("the quick brown fox jumps over the lazy dog\n" * 100)
+    plan, checksum = plan_tables(partial(StreamFile, filename), block_size=64, group_size=4)
+
+    assert checksum == 4400
+    assert len(plan.tables) == 1
+    assert set(plan.table_ids) == {0}
+    assert plan.group_size == 4
+
+
+def test_new_table_when_content_changes(make_file):
+    filename = make_file("abab" * 1024 + "xyz0123456789" * 300)
+    plan, _ = plan_tables(partial(StreamFile, filename), block_size=256, group_size=2)
+
+    assert len(plan.tables) == 2
+    assert plan.table_ids[0] == 0
+    assert plan.table_ids[-1] == 1
+    assert set(plan.tables[0]) == {"a", "b"}
+
+
+def test_previous_table_is_reused(make_file):
+    first, second = "abab" * 512, "0123456789ABCDEF" * 128
+    filename = make_file(first + second + first)
+    plan, _ = plan_tables(partial(StreamFile, filename), block_size=1024, group_size=2)
+
+    assert len(plan.tables) == 2
+    assert plan.table_ids[0] == plan.table_ids[-1] == 0
+
+
+def test_table_must_cover_the_group(make_file):
+    """A table lacking a character of the group can't be reused."""
+    filename = make_file("a" * 2048 + "ab" * 1024)
+    plan, _ = plan_tables(partial(StreamFile, filename), block_size=1024, group_size=2)
+
+    assert list(plan.table_ids) == [0, 1]
+    assert "b" in plan.tables[1]
+
+
+def test_block_table_ids(make_file):
+    filename = make_file("abab" * 512 + "0123456789ABCDEF" * 128)
+    plan, _ = plan_tables(partial(StreamFile, filename), block_size=1024, group_size=2)
+
+    assert list(plan.block_table_ids()) == [0, 0, 1, 1]
+
+
+def test_plan_in_memory():
+    content = b"abab" * 512 + b"0123456789ABCDEF" * 128
+    plan, checksum = plan_tables(partial(MemoryStream, content), 1024, binary=True, group_size=2)
+
+    assert checksum == 4096
+    assert len(plan.tables) == 2
+    assert set(plan.tables[0]) == {ord("a"), ord("b")}
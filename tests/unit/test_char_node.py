@@ -61,3 +61,17 @@ def test_merge_nodes():
 def test_merge_invalid_nodes():
     with pytest.raises(TypeError):
         CharNode("A", 1) + "B"
+
+
+def test_charnode_slots():
+    with pytest.raises(AttributeError):
+        CharNode("A", 1).weight = 2
+
+
+def test_merged_value_is_lazy():
+    node = (CharNode("A", 1) + CharNode("B", 2)) + (CharNode(3, 4) + CharNode("D", 5))
+
+    assert node._value is None  # pylint: disable=protected-access
+    assert node.value == "AB3D"
+    assert node.left.value == "AB"
+    assert node == (CharNode("A", 1) + CharNode("B", 2)) + (CharNode(3, 4) + CharNode("D", 5))
@@ -4,7 +4,7 @@ from argparse import Namespace
 import pytest
 
 from compressor.cli import argument_parser, parse_arguments
-from compressor.constants import VERSION
+from compressor.constants import CACHE_SIZE, VERSION
 
 
 @pytest.fixture
@@ -15,16 +15,28 @@ def argparser():
 @pytest.mark.parametrize('opt', ('-c', '--compress'))
 def test_compress(argparser, opt):
     to_compress = argparser.parse_args([opt, 'foo'])
-    expected = Namespace(filename='foo', compress=True,
-                         extract=False, dest_file=None)
+    expected = Namespace(filenames=['foo'], compress=True,
+                         extract=False, dest_file=None,
+                         dest_dir=None, recursive=False, workers=1,
+                         max_memory=None, jobs=1,
+                         index=False, max_code_length=None,
+                         binary=False, block_size=None, adaptive=False,
+                         train=False, table=None, cache=None,
+                         cache_size=CACHE_SIZE, stats=False, profile=False)
     assert to_compress == expected
 
 
 @pytest.mark.parametrize('opt', ('-x', '--extract'))
 def test_extract(argparser, opt):
     tbe = argparser.parse_args((opt, 'foo'))
-    expected = Namespace(filename='foo', extract=True,
-                         compress=False, dest_file=None)
+    expected = Namespace(filenames=['foo'], extract=True,
+                         compress=False, dest_file=None,
+                         dest_dir=None, recursive=False, workers=1,
+                         max_memory=None, jobs=1,
+                         index=False, max_code_length=None,
+                         binary=False, block_size=None, adaptive=False,
+                         train=False, table=None, cache=None,
+                         cache_size=CACHE_SIZE, stats=False, profile=False)
     assert tbe == expected
 
 
@@ -44,7 +56,7 @@ def test_version(argparser):
 def test_output_name(argparser, opt):
     command = argparser.parse_args((opt, '-d', 'foo', 'bar'))
     assert command.dest_file == 'foo'
-    assert command.filename == 'bar'
+    assert command.filenames == ['bar']
     assert (command.compress ^ command.extract) is True
 
 
@@ -55,7 +67,23 @@ def test_parse_compress_as_dict(opt):
         'compress': True,
         'extract': False,
         'dest_file': None,
-        'filename': 'foo',
+        'filenames': ['foo'],
+        'dest_dir': None,
+        'recursive': False,
+        'workers': 1,
+        'max_memory': None,
+        'jobs': 1,
+        'index': False,
+        'max_code_length': None,
+        'binary': False,
+        'block_size': None,
+        'adaptive': False,
+        'train': False,
+        'table': None,
+        'cache': None,
+        'cache_size': CACHE_SIZE,
+        'stats': False,
+        'profile': False,
     }
     assert result == expected
 
@@ -67,7 +95,23 @@ def test_parse_extract_as_dict(opt):
         'compress': False,
         'extract': True,
         'dest_file': None,
-        'filename': 'foo',
+        'filenames': ['foo'],
+        'dest_dir': None,
+        'recursive': False,
+        'workers': 1,
+        'max_memory': None,
+        'jobs': 1,
+        'index': False,
+        'max_code_length': None,
+        'binary': False,
+        'block_size': None,
+        'adaptive': False,
+        'train': False,
+        'table': None,
+        'cache': None,
+        'cache_size': CACHE_SIZE,
+        'stats': False,
+        'profile': False,
     }
     assert result == expected
 
@@ -78,6 +122,100 @@ def test_parse_with_filename_as_dict():
         'compress': False,
         'extract': True,
         'dest_file': 'foo',
-        'filename': 'bar',
+        'filenames': ['bar'],
+        'dest_dir': None,
+        'recursive': False,
+        'workers': 1,
+        'max_memory': None,
+        'jobs': 1,
+        'index': False,
+        'max_code_length': None,
+        'binary': False,
+        'block_size': None,
+        'adaptive': False,
+        'train': False,
+        'table': None,
+        'cache': None,
+        'cache_size': CACHE_SIZE,
+        'stats': False,
+        'profile': False,
     }
     assert result == expected
+
+
+@pytest.mark.parametrize('opt', ('-m', '--max-memory'))
+def test_max_memory(argparser, opt):
+    command = argparser.parse_args(('-c', opt, '64M', 'foo'))
+    assert command.max_memory == 64 * 1024 * 1024
+
+
+def test_invalid_max_memory(argparser):
+    with pytest.raises(SystemExit):
+        argparser.parse_args(('-c', '-m', 'lots', 'foo'))
+
+
+@pytest.mark.parametrize('opt', ('-j', '--jobs'))
+def test_jobs(argparser, opt):
+    command = argparser.parse_args(('-c', opt, '4', 'foo'))
+    assert command.jobs == 4
+
+
+@pytest.mark.parametrize('opt', ('-i', '--index'))
+def test_index(argparser, opt):
+    command = argparser.parse_args(('-c', opt, 'foo'))
+    assert command.index is True
+
+
+@pytest.mark.parametrize('opt', ('-l', '--max-code-length'))
+def test_max_code_length(argparser, opt):
+    command = argparser.parse_args(('-c', opt, '12', 'foo'))
+    assert command.max_code_length == 12
+
+
+@pytest.mark.parametrize('opt', ('-b', '--binary'))
+def test_binary(argparser, opt):
+    command = argparser.parse_args(('-c', opt, 'foo'))
+    assert command.binary is True
+
+
+@pytest.mark.parametrize('value,expected', (('64K', 65536), ('4096', 4096), ('auto', None)))
+def test_block_size(argparser, value, expected):
+    command = argparser.parse_args(('-c', '-s', value, 'foo'))
+    assert command.block_size == expected
+
+
+@pytest.mark.parametrize('opt', ('-a', '--adaptive'))
+def test_adaptive(argparser, opt):
+    command = argparser.parse_args(('-c', opt, 'foo'))
+    assert command.adaptive is True
+
+
+@pytest.mark.parametrize('opt', ('-t', '--table'))
+def test_table(argparser, opt):
+    command = argparser.parse_args(('-x', opt, 'records.pyct', 'foo'))
+    assert command.table == 'records.pyct'
+
+
+def test_train(argparser):
+    command = argparser.parse_args(('--train', '-t', 'records.pyct', 'foo'))
+    assert command.train is True
+    assert command.compress is False
+    assert command.extract is False
+
+
+def test_several_files(argparser):
+    command = argparser.parse_args(('-c', 'foo', 'bar', '*.log'))
+    assert command.filenames == ['foo', 'bar', '*.log']
+
+
+def test_batch_options(argparser):
+    command = argparser.parse_args(('-c', '-r', '--dest-dir', 'out', '-w', '4', 'logs'))
+    assert command.recursive is True
+    assert command.dest_dir == 'out'
+    assert command.workers == 4
+
+
+def test_cache(argparser):
+    command = argparser.parse_args(('-c', '--cache', '/tmp/cache', '--cache-size', '64M', 'foo'))
+    assert command.cache == '/tmp/cache'
+    assert command.cache_size == 64 * 1024 * 1024
@@ -0,0 +1,89 @@
+"""Tests for `compressor.container`."""
+
+import io
+
+import pytest
+
+from compressor.constants import BUFF_SIZE, MAGIC
+from compressor.container import (
+    Header,
+    TablePlan,
+    _retrieve_header,
+    _save_header,
+    canonical_codes,
+    retrieve_table,
+    retrieve_table_plan,
+    save_table,
+    save_table_plan,
+)
+from compressor.util import pack
+
+
+def test_canonical_codes():
+    lengths = {"d": 3, "a": 2, "c": 3, "b": 2, "e": 2}
+    expected = {"a": b"00", "b": b"01", "e": b"10", "c": b"110", "d": b"111"}
+    assert canonical_codes(lengths) == expected
+
+
+def test_canonical_code_single_char():
+    assert canonical_codes({"a": 0}) == {"a": b""}
+
+
+@pytest.mark.parametrize("table", (
+    {"a": b"0", "b": b"10", "c": b"11"},
+    {"ñ": b"00", "€": b"01", "x": b"1"},
+    {},
+))
+def test_save_and_retrieve_table(table):
+    dest_file = io.BytesIO()
+    save_table(dest_file, table)
+    dest_file.seek(0)
+
+    assert retrieve_table(dest_file) == canonical_codes({c: len(code) for c, code in table.items()})
+
+
+def test_save_and_retrieve_binary_table():
+    table = {0: b"0", 10: b"10", 255: b"11"}
+    dest_file = io.BytesIO()
+    save_table(dest_file, table, binary=True)
+    dest_file.seek(0)
+
+    assert retrieve_table(dest_file, binary=True) == table
+
+
+def test_save_and_retrieve_table_plan():
+    tables = [{"a": b"0", "b": b"1"}, canonical_codes({"x": 1, "y": 2, "z": 2})]
+    plan = TablePlan(tables, [0, 1, 1, 0], group_size=16)
+    dest_file = io.BytesIO()
+    save_table_plan(dest_file, plan)
+    dest_file.seek(0)
+
+    retrieved = retrieve_table_plan(dest_file)
+    assert retrieved.tables == tables
+    assert list(retrieved.table_ids) == [0, 1, 1, 0]
+    assert retrieved.group_size == 16
+    assert dest_file.read() == b""
+
+
+def test_save_and_retrieve_header():
+    compfile = io.BytesIO()
+    _save_header(compfile, 1234, flags=1, block_size=4096)
+    compfile.seek(0)
+
+    assert _retrieve_header(compfile) == Header(2, 1, 1234, 4096)
+
+
+def test_retrieve_header_version_1():
+    compfile = io.BytesIO(MAGIC + pack("BBQ", 1, 0, 1234))
+    assert _retrieve_header(compfile) == Header(1, 0, 1234, BUFF_SIZE)
+
+
+def test_retrieve_header_legacy():
+    compfile = io.BytesIO(pack("L", 1234) + b"table")
+    assert _retrieve_header(compfile) == Header(0, 0, 1234, BUFF_SIZE)
+    assert compfile.read() == b"table"
+
+
+def test_retrieve_header_unsupported_version():
+    with pytest.raises(ValueError):
+        _retrieve_header(io.BytesIO(MAGIC + pack("BBQI", 99, 0, 1234, 1024)))
@@ -2,8 +2,23 @@
 
 import itertools
 import operator
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-from compressor.core import CharNode, process_frequencies
+import pytest
+
+from compressor.constants import MAX_BLOCK_SIZE, MIN_BLOCK_SIZE
+from compressor.core import (
+    CharNode,
+    auto_block_size,
+    code_lengths,
+    create_tree_code,
+    encode_block,
+    memoized_code_lengths,
+    plain_ascii_frequencies,
+    process_frequencies,
+)
+from compressor.util import unpack
 
 
 def test_charnode_hashable():
@@ -23,3 +38,105 @@ def test_process_frequencies():
 def test_process_empty_frequencies():
     """For '' ->  []."""
     assert process_frequencies("") == []
+
+
+def test_encode_block():
+    """Sentinel bit, the codes, and the 0-padding to complete the byte."""
+    block = encode_block("ab", {"a": (0, 1), "b": (1, 1)})
+
+    assert unpack("II", block[:8]) == (1, 2)
+    assert block[8:] == bytes((0b10100000,))
+
+
+def test_encode_block_aligned():
+    """When the bits fill the last byte, a whole byte of padding is added."""
+    block = encode_block("abc", {"a": (0b01, 2), "b": (0b001, 3), "c": (0b11, 2)})
+
+    assert unpack("II", block[:8]) == (2, 3)
+    assert block[8:] == bytes((0b10100111, 0))
+
+
+def test_code_lengths():
+    tree = CharNode("a", 5) + (CharNode("b", 2) + CharNode("c", 2))
+    assert code_lengths(tree) == {"a": 1, "b": 2, "c": 2}
+
+
+def test_create_tree_code_large_alphabet():
+    """A tree for many symbols is built without joining their values, and
+    gives a complete code (Kraft's sum is 1).
+    """
+    charset = [CharNode(chr(0x4E00 + number), 1 + number % 97) for number in range(50_000)]
+    tree = create_tree_code(charset)
+    lengths = code_lengths(tree)
+
+    assert tree._value is None  # pylint: disable=protected-access
+    assert tree.freq == sum(node.freq for node in charset)
+    assert len(lengths) == len(charset)
+    assert sum(2 ** -length for length in lengths.values()) == 1
+
+
+def test_create_tree_code_keeps_charset():
+    charset = [CharNode("a", 3), CharNode("b", 1), CharNode("c", 2)]
+    original = list(charset)
+    tree = create_tree_code(charset)
+
+    assert charset == original
+    assert code_lengths(tree) == {"a": 1, "b": 2, "c": 2}
+
+
+def test_memoized_code_lengths(monkeypatch):
+    built, build = [], create_tree_code
+    monkeypatch.setattr("compressor.core._lengths_memo", OrderedDict())
+    monkeypatch.setattr("compressor.core.create_tree_code", lambda charset: built.append(charset) or build(charset))
+    charset = [CharNode("x", 5), CharNode("y", 2), CharNode("z", 2)]
+
+    lengths = memoized_code_lengths(charset)
+    assert memoized_code_lengths(charset[::-1]) == lengths == {"x": 1, "y": 2, "z": 2}
+    assert len(built) == 1
+    memoized_code_lengths([CharNode("x", 5), CharNode("y", 2), CharNode("z", 3)])
+    assert len(built) == 2
+
+
+def test_memoized_code_lengths_threads(monkeypatch):
+    memo = OrderedDict()
+    monkeypatch.setattr("compressor.core._lengths_memo", memo)
+    monkeypatch.setattr("compressor.core.TABLE_MEMO_SIZE", 8)
+
+    def lengths(number):
+        return memoized_code_lengths([CharNode("x", number % 20 + 1), CharNode("y", 2), CharNode("z", 2)])
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lengths, range(400)))
+    assert all(set(result) == {"x", "y", "z"} for result in results)
+    assert len(memo) == 8
+
+
+@pytest.mark.parametrize("length,jobs,expected", (
+    (0, 1, MIN_BLOCK_SIZE),
+    (100, 1, MIN_BLOCK_SIZE),
+    (10 * 1024 * 1024, 1, 65536),
+    (10 * 1024 * 1024, 16, 4096),
+    (10 ** 12, 16, MAX_BLOCK_SIZE),
+))
+def test_auto_block_size(length, jobs, expected):
+    assert auto_block_size(length, jobs) == expected
+
+
+@pytest.mark.parametrize("pure_python", (True, False))
+def test_plain_ascii_frequencies(pure_python, monkeypatch):
+    if pure_python:
+        monkeypatch.setattr("compressor.vectorized.AVAILABLE", False)
+    freqs = plain_ascii_frequencies([memoryview(b"plain "), b"text\n"])
+
+    expected = {ord(char): freq for char, freq in Counter("plain text\n").items()}
+    assert {node.value: node.freq for node in freqs} == expected
+    assert plain_ascii_frequencies([]) == []
+
+
+@pytest.mark.parametrize("other", (b"windows\r\n", "café".encode("utf-8")))
+def test_plain_ascii_frequencies_stop(other):
+    """Counting stops on the first chunk that isn't plain ASCII."""
+    chunks = iter((b"plain", other, b"never read"))
+
+    assert plain_ascii_frequencies(chunks) is None
+    assert list(chunks) == [b"never read"]
@@ -0,0 +1,94 @@
+"""Tests for the table-driven decoder."""
+import io
+
+import pytest
+
+from compressor.core import (
+    create_tree_code,
+    encoding_codes,
+    parse_tree_code,
+    process_frequencies,
+    process_line_compression,
+)
+from compressor.decoder import BlockDecoders, DecodeTable
+from compressor.util import unpack
+
+
+def _compress_block(text, table):
+    output = io.BytesIO()
+    process_line_compression(text, output, encoding_codes(table))
+    raw = output.getvalue()
+    block_size, block_length = unpack("II", raw[:8])
+    return raw[8:], block_length
+
+
+def _decoding_table(table):
+    return {code.decode(): char for char, code in table.items()}
+
+
+@pytest.mark.parametrize("lookup_bits", (1, 2, 3, 10, 12))
+def test_decode_roundtrip(data_file, lookup_bits):
+    text = data_file[:1024]
+    table = parse_tree_code(create_tree_code(process_frequencies(data_file)))
+    block, block_length = _compress_block(text, table)
+
+    decoder = DecodeTable(_decoding_table(table), lookup_bits=lookup_bits)
+
+    assert decoder.decode(block, block_length) == text
+
+
+def test_lookup_bits_bounded_by_longest_code():
+    decoder = DecodeTable({"0": "a", "10": "b", "11": "c"}, lookup_bits=10)
+    assert decoder.lookup_bits == 2
+    assert decoder.max_length == 2
+
+
+def test_decode_long_codes():
+    """Codes longer than the lookup window are resolved as well."""
+    decoder = DecodeTable({"0": "a", "10": "b", "110": "c", "111": "d"}, lookup_bits=1)
+    # sentinel + 111 110 10 0 + padding
+    block = bytes((0b11111101, 0b00000000))
+    assert decoder.decode(block, 4) == "dcba"
+
+
+def test_decode_empty_block():
+    assert DecodeTable({"0": "a", "1": "b"}).decode(b"\x80", 0) == ""
+
+
+def test_decode_invalid_code():
+    decoder = DecodeTable({"0": "a", "100": "b"}, lookup_bits=1)
+    with pytest.raises(ValueError):
+        decoder.decode(bytes((0b11110000,)), 1)
+
+
+def test_decode_binary():
+    decoder = DecodeTable({"0": 0, "10": 255, "11": 10}, binary=True)
+    # sentinel + 11 10 0 + padding
+    assert decoder.decode(bytes((0b11110000,)), 3) == b"\n\xff\x00"
+    assert decoder.decode(b"\x80", 0) == b""
+
+
+def test_block_decoders_single_table():
+    decoders = BlockDecoders([{"0": "a", "1": "b"}])
+    assert decoders[0] is decoders[100]
+    assert decoders[7].decode(bytes((0b10110000,)), 3) == "abb"
+
+
+def test_block_decoders_by_group():
+    tables = [{"0": "a", "1": "b"}, {"0": "x", "1": "y"}]
+    decoders = BlockDecoders(tables, table_ids=[0, 1, 0], group_size=2)
+
+    assert [decoders.table_id(number) for number in range(6)] == [0, 0, 1, 1, 0, 0]
+    assert decoders[2].decode(bytes((0b11000000,)), 2) == "yx"
+    # each table is decoded once, and shared by all of its groups
+    assert decoders[0] is decoders[5]
+    assert decoders[0] is not decoders[3]
+
+
+@pytest.mark.parametrize(
+    "binary,pieces,expected", ((False, ("ab", "", "c"), "abc"), (True, (b"\x00", b"\xff"), b"\x00\xff"))
+)
+def test_block_decoders_join(binary, pieces, expected):
+    decoders = BlockDecoders([{}], binary=binary)
+    assert decoders.join(iter(pieces)) == expected
+    assert decoders.join([]) == decoders.empty
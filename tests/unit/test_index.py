@@ -0,0 +1,72 @@
+"""Tests for the index of the blocks of a compressed file."""
+import io
+
+import pytest
+
+from compressor.index import BlockIndex
+from compressor.util import pack
+
+
+def _sample_index():
+    index = BlockIndex()
+    index.append(12, 108, 100)
+    index.append(120, 58, 100)
+    index.append(178, 20, 30)
+    return index
+
+
+def test_index_positions():
+    index = _sample_index()
+
+    assert len(index) == 3
+    assert list(index.positions) == [0, 100, 200]
+    assert index.length == 230
+
+
+@pytest.mark.parametrize("position,block", ((0, 0), (99, 0), (100, 1), (229, 2)))
+def test_find_block(position, block):
+    assert _sample_index().find(position) == block
+
+
+@pytest.mark.parametrize("position", (-1, 230))
+def test_find_out_of_range(position):
+    with pytest.raises(IndexError):
+        _sample_index().find(position)
+
+
+def test_save_and_load():
+    index = _sample_index()
+    compfile = io.BytesIO()
+    compfile.write(b"\0" * 178)
+    compfile.write(pack("II", 12, 30) + b"\0" * 12)
+    index.save(compfile)
+    compfile.seek(5)
+
+    loaded = BlockIndex.load(compfile)
+
+    assert compfile.tell() == 5
+    assert loaded.offsets == index.offsets
+    assert loaded.sizes == index.sizes
+    assert loaded.positions == index.positions
+    assert loaded.length == index.length
+
+
+@pytest.mark.parametrize("content", (b"", b"no index on this file"))
+def test_load_without_index(content):
+    assert BlockIndex.load(io.BytesIO(content)) is None
+
+
+def test_scan_blocks():
+    compfile = io.BytesIO()
+    compfile.write(b"meta")
+    compfile.write(pack("II", 2, 10) + b"ab")
+    compfile.write(pack("II", 1, 5) + b"c")
+    compfile.write(b"trailing data")
+    compfile.seek(4)
+
+    index = BlockIndex.scan(compfile, checksum=15)
+
+    assert compfile.tell() == 4
+    assert list(index.offsets) == [4, 14]
+    assert list(index.sizes) == [10, 9]
+    assert list(index.positions) == [0, 10]
@@ -1,9 +1,19 @@
 """Unit tests the core functions"""
+import tempfile
+import tracemalloc
 from collections import Counter, deque
+from fractions import Fraction
 
+import pytest
+
+from compressor.char_node import CharNode
 from compressor.core import (
+    code_lengths,
     create_tree_code,
+    encoded_size,
+    limited_code_lengths,
     parse_tree_code,
+    process_file_frequencies,
     process_frequencies,
 )
 
@@ -35,3 +45,73 @@ def test_preffix_free(data_file):
     for code_to_check in codes:
         prefix = {c for c in codes if c.startswith(code_to_check)}
         assert prefix == {code_to_check}
+
+
+def test_stream_file_frequencies(data_file):
+    with tempfile.NamedTemporaryFile("w+", encoding="utf-8") as source:
+        source.write(data_file)
+        source.flush()
+        streamed = process_file_frequencies(source.name, chunk_size=7)
+
+    assert set(streamed) == set(process_frequencies(data_file))
+
+
+def test_stream_file_frequencies_bounded_memory():
+    """The peak of memory does not depend on the size of the file."""
+    file_size = 2 * 1024 * 1024
+    with tempfile.NamedTemporaryFile("w+", encoding="utf-8") as source:
+        line = "".join(map(chr, range(32, 127))) + "\n"
+        for _ in range(file_size // len(line)):
+            source.write(line)
+        source.flush()
+
+        tracemalloc.start()
+        try:
+            process_file_frequencies(source.name, chunk_size=16 * 1024)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert peak < file_size // 4
+
+
+def _fibonacci_charset(size):
+    freqs = [1, 1]
+    while len(freqs) < size:
+        freqs.append(freqs[-1] + freqs[-2])
+    return [CharNode(chr(ord("a") + i), freq) for i, freq in enumerate(freqs)]
+
+
+def _kraft_sum(lengths):
+    return sum(Fraction(1, 2 ** length) for length in lengths.values())
+
+
+@pytest.mark.parametrize("max_length", (5, 6, 8, 12))
+def test_limited_code_lengths(max_length):
+    charset = _fibonacci_charset(20)
+    assert max(code_lengths(create_tree_code(list(charset))).values()) == 19
+
+    lengths = limited_code_lengths(charset, max_length)
+
+    assert max(lengths.values()) == max_length
+    assert _kraft_sum(lengths) == 1
+
+
+def test_limited_code_lengths_optimal(data_file):
+    """With a limit that is not reached, the size is the same as the one of
+    the Huffman code."""
+    charset = process_frequencies(data_file)
+    optimal = code_lengths(create_tree_code(list(charset)))
+
+    limited = limited_code_lengths(charset, max(optimal.values()))
+
+    assert encoded_size(charset, limited) == encoded_size(charset, optimal)
+
+
+def test_limited_code_lengths_single_char():
+    assert limited_code_lengths([CharNode("a", 10)], 4) == {"a": 0}
+
+
+def test_limited_code_lengths_too_short():
+    with pytest.raises(ValueError):
+        limited_code_lengths(_fibonacci_charset(9), 3)
@@ -0,0 +1,70 @@
+"""Tests for the shared tables."""
+import pytest
+
+from compressor.constants import TABLE_MAGIC
+from compressor.container import canonical_codes
+from compressor.shared import load_table, train_table
+
+
+@pytest.fixture
+def samples(tmp_path):
+    names = []
+    for number, content in enumerate(('{"id": 1, "name": "foo"}\n', '{"id": 22, "name": "bar"}\n')):
+        sample = tmp_path / f"sample{number}"
+        sample.write_text(content, encoding="utf-8")
+        names.append(str(sample))
+    return names
+
+
+def test_train_and_load_table(samples, tmp_path):
+    dest = str(tmp_path / "table")
+    shared = train_table(samples, dest)
+
+    assert set(shared.table) == set('{"id": 1, "name": "foo"}\n22bar')
+    assert shared.table == canonical_codes({char: len(code) for char, code in shared.table.items()})
+    assert not shared.binary
+    assert load_table(dest) == shared
+
+
+def test_table_id_depends_on_the_table(samples, tmp_path):
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+
+    assert train_table(samples, first).table_id == train_table(samples, second).table_id
+    assert train_table(samples[:1], second).table_id != train_table(samples, first).table_id
+
+
+def test_table_id_independent_of_the_order(samples, tmp_path):
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+    assert train_table(samples, first).table_id == train_table(samples[::-1], second).table_id
+
+
+def test_binary_table_has_all_bytes(samples, tmp_path):
+    shared = train_table(samples, str(tmp_path / "table"), binary=True)
+    assert shared.binary
+    assert set(shared.table) == set(range(256))
+
+
+def test_train_max_code_length(samples, tmp_path):
+    shared = train_table(samples, str(tmp_path / "table"), binary=True, max_code_length=9)
+    assert max(map(len, shared.table.values())) == 9
+
+
+def test_train_without_content(tmp_path):
+    empty = tmp_path / "empty"
+    empty.touch()
+    with pytest.raises(ValueError):
+        train_table([str(empty)], str(tmp_path / "table"))
+
+
+def test_load_invalid_table(tmp_path):
+    invalid = tmp_path / "table"
+    invalid.write_bytes(b"not a table")
+    with pytest.raises(ValueError):
+        load_table(str(invalid))
+
+
+def test_load_unsupported_version(tmp_path):
+    future = tmp_path / "table"
+    future.write_bytes(TABLE_MAGIC + bytes((99, 0)) + bytes(8))
+    with pytest.raises(ValueError):
+        load_table(str(future))
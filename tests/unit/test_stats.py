@@ -0,0 +1,110 @@
+"""Tests for the instrumentation of the stages."""
+import contextvars
+import json
+import math
+import threading
+
+import pytest
+
+from compressor import stats
+from compressor.stats import Observer, Stats, collect_stats
+
+
+class Recorder(Observer):
+    def __init__(self):
+        self.events = []
+
+    def stage(self, name, wall, cpu):
+        self.events.append(("stage", name))
+
+    def count(self, name, value):
+        self.events.append(("count", name, value))
+
+
+@pytest.fixture
+def recorder():
+    observer = Recorder()
+    stats.add_observer(observer)
+    yield observer
+    stats.remove_observer(observer)
+
+
+def test_disabled():
+    assert not stats.enabled()
+    with stats.timed("encode") as timer:
+        assert timer is None
+    stats.count("blocks", 3)
+
+
+def test_observer(recorder):
+    assert stats.enabled()
+    with stats.timed("encode"):
+        stats.count("blocks", 3)
+    assert list(stats.timed_iter("read", "ab")) == ["a", "b"]
+    assert stats.timed_calls("write", len)("abc") == 3
+    assert recorder.events == [
+        ("count", "blocks", 3),
+        ("stage", "encode"),
+        ("stage", "read"),
+        ("stage", "read"),
+        ("stage", "read"),
+        ("stage", "write"),
+    ]
+
+
+def test_stats_aggregate():
+    with collect_stats() as collected:
+        for _ in range(3):
+            with stats.timed("codes"):
+                pass
+        stats.count("bytes_in", 100)
+        stats.count("bytes_out", 60)
+    stats.count("bytes_in", 100)  # not collected anymore
+
+    measures = collected.as_dict()
+    assert measures["stages"]["codes"]["calls"] == 3
+    assert measures["counters"] == {"bytes_in": 100, "bytes_out": 60}
+    assert measures["ratio"] == 0.6
+    assert measures["peak_memory"] > 0
+    assert json.loads(collected.to_json())["stages"]["codes"]["calls"] == 3
+
+
+def test_code_statistics():
+    with collect_stats() as collected:
+        stats.code_statistics({"a": 2, "b": 1, "c": 1}, {"a": 1, "b": 2, "c": 2})
+    measures = collected.as_dict()
+    assert measures["counters"]["symbols"] == 4
+    assert measures["mean_code_length"] == 1.5
+    assert math.isclose(measures["entropy"], 1.5)
+
+
+def test_merge(recorder):
+    other = Stats()
+    other.stage("encode", 1.0, 0.5)
+    other.stage("encode", 1.0, 0.5)
+    other.count("blocks", 4)
+
+    with collect_stats() as collected:
+        stats.merge(other.as_dict())
+        stats.merge(other.as_dict())
+    assert collected.stages["encode"] == {"wall": 4.0, "cpu": 2.0, "calls": 4}
+    assert collected.counters["blocks"] == 8
+    assert recorder.events.count(("count", "blocks", 4)) == 2
+
+
+def test_observers_per_context(recorder):
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(stats.enabled()))
+    thread.start()
+    thread.join()
+    assert seen == [False]  # other threads don't have the observers
+
+    def collect():
+        with collect_stats() as collected:
+            stats.count("blocks", 2)
+        return collected
+
+    collected = contextvars.copy_context().run(collect)
+    assert collected.counters["blocks"] == 2
+    assert recorder.events == [("count", "blocks", 2)]  # the copy has them
+    assert stats.enabled()
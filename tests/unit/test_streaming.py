@@ -0,0 +1,135 @@
+"""Tests for the incremental compression."""
+import pytest
+
+from compressor.lib import compress, decompress, extract_file, extract_range, train_table
+from compressor.streaming import Compressor, Decompressor
+
+
+def _chunks(content, size):
+    return [content[start : start + size] for start in range(0, len(content), size)]
+
+
+def _compress(content, chunk_size=37, **options):
+    compressor = Compressor(**options)
+    output = b"".join(compressor.compress(chunk) for chunk in _chunks(content, chunk_size))
+    return output + compressor.flush()
+
+
+def _decompress(blob, chunk_size=13, **options):
+    decompressor = Decompressor(**options)
+    content = [decompressor.decompress(chunk) for chunk in _chunks(blob, chunk_size)]
+    assert decompressor.eof
+    return content
+
+
+def test_roundtrip(data_file):
+    blob = _compress(data_file, block_size=64, sample_size=256)
+
+    assert decompress(blob) == data_file
+    assert "".join(_decompress(blob)) == data_file
+
+
+def test_roundtrip_binary():
+    content = bytes(range(256)) * 20
+    blob = _compress(memoryview(content), binary=True, block_size=100, sample_size=50)
+
+    assert decompress(blob) == content
+    assert b"".join(_decompress(blob, binary=True)) == content
+
+
+def test_new_table_for_unseen_characters():
+    content = "ab" * 500 + "xyz" * 200
+    compressor = Compressor(block_size=100, sample_size=100)
+    blob = compressor.compress(content) + compressor.flush()
+
+    assert set(compressor._table) == set("abxyz")
+    assert decompress(blob) == content
+
+
+def test_output_by_blocks():
+    compressor = Compressor(block_size=10, sample_size=20)
+    assert compressor.compress("a" * 15).startswith(b"PYCZ")  # only the header, while sampling
+    assert compressor.compress("a" * 4) == b""
+    assert compressor.compress("b" * 10)
+    assert compressor._pending_length == 9
+
+
+def test_flush_without_finishing():
+    compressor, decompressor = Compressor(sample_size=1000), Decompressor()
+
+    assert decompressor.decompress(compressor.compress("first")) == ""
+    assert decompressor.decompress(compressor.flush(finish=False)) == "first"
+    assert decompressor.decompress(compressor.compress(" second") + compressor.flush()) == " second"
+    assert decompressor.eof
+
+
+def test_empty_stream():
+    compressor = Compressor(binary=True)
+    assert decompress(compressor.flush()) == b""
+
+
+def test_shared_table(tmp_path):
+    sample = tmp_path / "sample"
+    sample.write_text("abcdefgh", encoding="utf-8")
+    shared = train_table([str(sample)], str(tmp_path / "table"))
+    blob = _compress("deadbeef" * 100, table=shared, block_size=64)
+
+    assert "".join(_decompress(blob, table=shared)) == "deadbeef" * 100
+    with pytest.raises(ValueError):
+        _compress("xyz", table=shared)
+    with pytest.raises(ValueError):
+        Compressor(binary=True, table=shared)
+
+
+def test_extract_streamed_file(tmp_path):
+    content = "streamed\ncontent\n" * 300
+    target, extracted = tmp_path / "compressed", tmp_path / "extracted"
+    target.write_bytes(_compress(content, block_size=128))
+
+    extract_file(str(target), str(extracted), jobs=2)
+
+    assert extracted.read_text(encoding="utf-8") == content
+    with pytest.raises(ValueError):
+        extract_range(str(target), 0, 10)
+
+
+@pytest.mark.parametrize("content,binary", (("text, of some blocks", False), (b"\x00\xff" * 20, True)))
+def test_output_type_before_the_header(content, binary):
+    """The output has the same type from the first byte (before the header
+    tells the kind of content).
+    """
+    blob = _compress(content, binary=binary, block_size=8, sample_size=8)
+    pieces = _decompress(blob, chunk_size=1, binary=binary)
+
+    assert {type(piece) for piece in pieces} == {type(content)}
+    assert content[:0].join(pieces) == content
+
+
+def test_expected_binary():
+    with pytest.raises(ValueError):
+        Decompressor(binary=True).decompress(_compress("text"))
+    with pytest.raises(ValueError):
+        Decompressor().decompress(_compress(b"bytes", binary=True))
+
+
+def test_unused_data():
+    decompressor = Decompressor()
+    assert decompressor.decompress(_compress("text") + b"more") == "text"
+    assert decompressor.decompress(b" data") == ""
+    assert decompressor.unused_data == b"more data"
+
+
+def test_truncated_stream():
+    with pytest.raises(ValueError):
+        decompress(_compress("some text")[:-8])
+
+
+def test_invalid_content():
+    compressor = Compressor()
+    with pytest.raises(TypeError):
+        compressor.compress(b"bytes")
+    compressor.flush()
+    with pytest.raises(ValueError):
+        compressor.compress("after the end")
+    with pytest.raises(ValueError):
+        Decompressor().decompress(compress("not streamed"))
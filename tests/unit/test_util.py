@@ -1,9 +1,13 @@
 """Tests for the set of functions defined in compressor.functions"""
+import io
 import sys
 import tempfile
 
+import pytest
+
 from compressor.util import (default_filename, endianess_prefix, pack,
-                             tobinary, unpack, StreamFile)
+                             pack_into, parse_size, tobinary, unpack,
+                             MappedFile, MemoryStream, StreamFile)
 
 
 def test_endianess_prefix_bigendinan(monkeypatch):
@@ -34,6 +38,12 @@ def test_packing(monkeypatch):
     assert data == 42
 
 
+def test_packing_into_buffer():
+    buffer = bytearray(8)
+    pack_into('II', buffer, 0, 4, 2)
+    assert unpack('II', buffer) == (4, 2)
+
+
 def test_default_filename_base_file():
     assert default_filename('file') == 'file.comp'
 
@@ -88,3 +98,71 @@ def test_streamed_file_closed():
             list(buffered)
 
         assert buffered._data_source.closed
+
+
+@pytest.mark.parametrize('size,expected', (
+    ('100', 100),
+    ('4K', 4096),
+    ('64M', 64 * 1024 ** 2),
+    ('2g', 2 * 1024 ** 3),
+    ('1MB', 1024 ** 2),
+))
+def test_parse_size(size, expected):
+    assert parse_size(size) == expected
+
+
+@pytest.mark.parametrize('size', ('', 'M', '-1K', '0', 'big'))
+def test_parse_invalid_size(size):
+    with pytest.raises(ValueError):
+        parse_size(size)
+
+
+def test_stream_binary_file_chunks():
+    with tempfile.NamedTemporaryFile() as data:
+        data.write(b"\x00\xff\r\n")
+        data.flush()
+
+        with StreamFile(data.name, chunk_size=2, binary=True) as buffered:
+            composed = list(buffered)
+
+    assert composed == [b"\x00\xff", b"\r\n"]
+
+
+def test_stream_file_object():
+    source = io.BytesIO(b"skip-abcdef")
+    source.read(5)
+
+    for _ in range(2):  # the position is restored afterwards
+        with StreamFile(source, chunk_size=4) as buffered:
+            assert list(buffered) == [b"abcd", b"ef"]
+    assert source.tell() == 5
+    assert not source.closed
+
+
+def test_memory_stream():
+    content = memoryview(b"abcdefg")
+    with MemoryStream(content, chunk_size=3) as buffered:
+        chunks = list(buffered)
+
+    assert [bytes(chunk) for chunk in chunks] == [b"abc", b"def", b"g"]
+    assert all(chunk.obj is content.obj for chunk in chunks)
+    assert list(MemoryStream("abcde", 2)) == ["ab", "cd", "e"]
+
+
+def test_mapped_file_chunks():
+    with tempfile.NamedTemporaryFile() as data:
+        data.write(b"abcdefg")
+        data.flush()
+
+        with MappedFile(data.name, chunk_size=3) as mapped:
+            chunks = list(mapped)
+            assert [bytes(chunk) for chunk in chunks] == [b"abc", b"def", b"g"]
+            assert all(isinstance(chunk, memoryview) for chunk in chunks)
+        # the chunks can outlive the mapping
+        assert bytes(chunks[0]) == b"abc"
+
+
+def test_mapped_empty_file():
+    with tempfile.NamedTemporaryFile() as data:
+        with MappedFile(data.name, chunk_size=3) as mapped:
+            assert list(mapped) == []
@@ -0,0 +1,105 @@
+"""Tests for the NumPy backend, which must match the pure-Python functions."""
+import pickle
+from collections import Counter
+
+import pytest
+
+from compressor.container import canonical_codes
+from compressor.core import (
+    code_lengths,
+    counts_code_lengths,
+    create_tree_code,
+    encode_block,
+    encoding_codes,
+    process_frequencies,
+)
+from compressor.vectorized import VectorEncoder, count_symbols
+
+np = pytest.importorskip("numpy")
+
+
+def _codes_for(content):
+    return encoding_codes(canonical_codes(code_lengths(create_tree_code(process_frequencies(content)))))
+
+
+def test_count_symbols(data_file):
+    counts = count_symbols(data_file)
+
+    assert counts == Counter(data_file)
+    # listed by value, instead of by first appearance, for the same code
+    assert counts_code_lengths(counts) == counts_code_lengths(Counter(data_file))
+
+
+def test_count_bytes():
+    content = bytes(range(256)) + b"\x00\xff\x00"
+    assert count_symbols(content) == Counter(content)
+
+
+def test_count_empty():
+    assert count_symbols("") == {}
+
+
+@pytest.mark.parametrize("content", (
+    "a",
+    "aaaaaaa",
+    "compresión ñandú €€€ 日本語",
+    "".join(chr(ord("a") + i) * 2 ** i for i in range(18)),
+))
+def test_encode_same_as_python(content):
+    codes = _codes_for(content)
+    assert VectorEncoder(codes).encode(content) == encode_block(content, codes)
+
+
+def test_encode_data_files(data_file):
+    codes = _codes_for(data_file)
+    encoder = VectorEncoder(codes)
+    for start in range(0, len(data_file), 1024):
+        chunk = data_file[start : start + 1024]
+        assert encoder.encode(chunk) == encode_block(chunk, codes)
+
+
+def test_encode_bytes():
+    content = bytes(range(256)) * 3 + b"skewed" * 100
+    codes = _codes_for(content)
+    assert VectorEncoder(codes).encode(content) == encode_block(content, codes)
+
+
+@pytest.mark.parametrize("content", ("abc", "abcd", "`", b"\x00\x01", b"\x03"))
+def test_encode_missing_symbol(content):
+    """Symbols without a code are rejected, like by ``encode_block``."""
+    codes = _codes_for("ac" if isinstance(content, str) else b"\x00\x02")
+    with pytest.raises(KeyError):
+        encode_block(content, codes)
+    with pytest.raises(KeyError):
+        VectorEncoder(codes).encode(content)
+
+
+def test_encode_high_code_points():
+    content = "a\U0010fffd" * 10 + "a"
+    encoder = VectorEncoder(_codes_for(content))
+
+    assert encoder.points.nbytes + encoder.aligned.nbytes + encoder.lengths.nbytes < 100
+    assert encoder.encode(content) == encode_block(content, _codes_for(content))
+
+
+def test_encode_long_codes():
+    """Codes too long for merging them by pairs (up to 40 bits)."""
+    lengths = dict(zip("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNO", [*range(1, 41), 40]))
+    codes = encoding_codes(canonical_codes(lengths))
+    content = "".join(lengths) * 3 + "a"
+    assert VectorEncoder(codes).encode(content) == encode_block(content, codes)
+
+
+def test_encode_after_pickling(data_file):
+    codes = _codes_for(data_file)
+    encoder = VectorEncoder(codes)
+    encoder.encode(data_file[:10])
+    copy = pickle.loads(pickle.dumps(encoder))
+
+    assert copy._dense is None  # pylint: disable=protected-access  # built again on the worker
+    assert copy.encode(data_file[:1024]) == encode_block(data_file[:1024], codes)
+
+
+def test_supports_only_short_codes():
+    assert VectorEncoder.supports({"a": (0, 1), "b": (1, 63)})
+    assert not VectorEncoder.supports({"a": (0, 1), "b": (1, 64)})